@@ -11,6 +11,7 @@ setup(
     name="geogig-py",
     version="1.1-SNAPSHOT",
     install_requires=['py4j>=0.8', 'requests>=2.2.1'],
+    extras_require={'numpy': ['numpy'], 'ogr': ['GDAL']},
     author="Victor Olaya",
     author_email="volaya@boundlessgeo.com",
     description="Python bindings for GeoGig",
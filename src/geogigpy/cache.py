@@ -0,0 +1,95 @@
+# coding: utf-8
+
+import threading
+from collections import OrderedDict
+
+from geogigpy.utils import SHA_MATCHER
+
+# Default maximum size of the cached output, in characters
+DEFAULT_CACHE_SIZE = 16 * 1024 * 1024
+
+# Commands whose output depends only on the objects they are passed
+IMMUTABLE_COMMANDS = ["show", "ls-tree", "diff-tree", "cat"]
+
+
+def iscacheable(commands):
+    """
+    Returns true if the passed command only reads objects addressed by their
+    SHA-1, so its output can never change.
+    Object references can be followed by a path (<sha>:path), and paths
+    passed after a '--' separator are also accepted
+    """
+    if not commands or commands[0] not in IMMUTABLE_COMMANDS:
+        return False
+    refs = 0
+    for arg in commands[1:]:
+        if arg == "--":
+            break
+        if arg.startswith("-"):
+            continue
+        if SHA_MATCHER.match(arg) is None \
+                or not (len(arg) == 40 or arg[40] == ":"):
+            return False
+        refs += 1
+    return refs > 0
+
+
+class ResultCache(object):
+    """
+    A LRU cache with the output of geogig commands, bounded by the total
+    size of the cached lines. It can be shared by several threads
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, commands):
+        """
+        Returns a tuple with the cached output lines of the passed command,
+        or None if it is not in the cache
+        """
+        key = tuple(commands)
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return lines
+
+    def put(self, commands, lines):
+        """
+        Adds the output lines of a command to the cache, evicting the least
+        recently used entries if needed
+        """
+        key = tuple(commands)
+        lines = tuple(lines)
+        size = _size(lines)
+        if size > self.maxsize:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= _size(self._entries.pop(key))
+            self._entries[key] = lines
+            self.size += size
+            while self.size > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= _size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _size(lines):
+    return sum(len(line) + 1 for line in lines)
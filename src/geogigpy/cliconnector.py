@@ -4,55 +4,108 @@ import subprocess
 import os
 import tempfile
 import logging
-from copy import deepcopy
 import datetime
-from collections import OrderedDict
+import time
+from collections import OrderedDict, deque
+from itertools import islice
 
 from geogigpy import geogig
 from geogigpy.feature import Feature
 from geogigpy.tree import Tree
 from geogigpy.commit import Commit
-from geogigpy.diff import Diffentry, ATTRIBUTE_DIFF_MODIFIED
+from geogigpy.diff import Diffentry, ATTRIBUTE_DIFF_MODIFIED, _diffattributes
 from geogigpy.connector import Connector
 from geogigpy.commitish import Commitish
 from geogigpy.geogigexception import GeoGigException, GeoGigConflictException,\
     UnconfiguredUserException
 from geogigpy.geometry import Geometry
+from geogigpy.cache import ResultCache, iscacheable, DEFAULT_CACHE_SIZE
+from geogigpy.metadata import RepositoryMetadata
+from geogigpy.utils import chunkargs
 
+# Number of output lines kept to describe a failed command
+ERROR_LINES = 200
 
-def _run(command, addcolor=True):
+# Number of features written to each file passed to the insert command
+DEFAULT_INSERT_BATCH_SIZE = 10000
+
+# Error raised by the show command when a ref does not point to any object
+MISSING_OBJECT_ERROR = "did not resolve to any object"
+
+# Characters that make a revision something else than a plain ref name
+_REVISION_OPERATORS = set("~^:@{}")
+
+def _run(command, addcolor=True, cwd=None):
+    return list(_iterrun(command, addcolor, cwd))
+
+
+def _iterrun(command, addcolor=True, cwd=None):
+    """
+    Runs a geogig command and yields its output lines as they are produced.
+    If the consumer stops iterating, the geogig process is terminated.
+    If the command fails, a GeoGigException with the last lines of its output
+    is raised once that output has been consumed
+    """
     command = ['geogig'] + command
     if addcolor:
         command.extend(["--color", "never"])
     commandstr = " ".join(command)
     if os.name != 'nt':
         command = commandstr
-    output = []
+    head = []
+    tail = deque(maxlen=ERROR_LINES)
     proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE,
                             stdin=subprocess.PIPE, stderr=subprocess.STDOUT,
-                            universal_newlines=True)
-    for line in iter(proc.stdout.readline, ""):
-        line = line.strip("\n")
-        output.append(line)
-    proc.wait()
+                            universal_newlines=True, cwd=cwd)
+    try:
+        for line in iter(proc.stdout.readline, ""):
+            line = line.strip("\n")
+            if len(head) < 5:
+                head.append(line)
+            tail.append(line)
+            yield line
+        proc.wait()
+    finally:
+        proc.stdout.close()
+        proc.stdin.close()
+        if proc.poll() is None:
+            proc.terminate()
+            proc.wait()
     returncode = proc.returncode
     if returncode:
-        logging.error("Error running " + commandstr + "\n" + " ".join(output))
-        raise GeoGigException(output)
-    logging.info("Executed " + commandstr + "\n" + " ".join(output[:5]))
-    return output
+        logging.error("Error running " + commandstr + "\n" + " ".join(tail))
+        raise GeoGigException("\n".join(tail))
+    logging.info("Executed " + commandstr + "\n" + " ".join(head))
 
 
 class CLIConnector(Connector):
     """
-    A connector that calls the CLI version of geogig and parses CLI output
+    A connector that calls the CLI version of geogig and parses CLI output.
+    Commands are run in the repository folder without changing the working
+    directory of the current process, so a connector can be safely used from
+    several threads at the same time.
+    The output of commands that only read objects addressed by their SHA-1
+    can never change, so it is kept in a cache of the passed size. A size of
+    0 disables it
     """
 
-    def __init__(self):
+    concurrent = True
+
+    def __init__(self, cachesize=DEFAULT_CACHE_SIZE):
         self.commandslog = []
+        self.cache = ResultCache(cachesize) if cachesize else None
+        self.metadata = None
+
+    @property
+    def cachesize(self):
+        return self.cache.maxsize if self.cache is not None else 0
+
+    def newsession(self):
+        return CLIConnector(self.cachesize)
 
     def setRepository(self, repo):
         self.repo = repo
+        self.metadata = RepositoryMetadata(repo.url)
 
     def createdat(self):
         dat_path = os.path.join(self.repo.url, ".geogig")
@@ -70,11 +123,43 @@ class CLIConnector(Connector):
         return output[0].split(":")[1].strip()
 
     def run(self, command):
-        os.chdir(self.repo.url)
+        return list(self.iterrun(command))
+
+    def iterrun(self, command):
+        """
+        Runs a command and returns an iterator over its output lines, which
+        are read as the command produces them
+        """
+        if self.cache is None or not iscacheable(command):
+            return self._iterexecute(command)
+        output = self.cache.get(command)
+        if output is not None:
+            return iter(output)
+        return self._itercaching(command)
+
+    def _itercaching(self, command):
+        lines = []
+        size = 0
+        for line in self._iterexecute(command):
+            if lines is not None:
+                size += len(line) + 1
+                if size > self.cache.maxsize:
+                    lines = None
+                else:
+                    lines.append(line)
+            yield line
+        if lines is not None:
+            self.cache.put(command, lines)
+
+    def _iterexecute(self, command):
         self.commandslog.append(" ".join(command))
-        return _run(command)
+        return _iterrun(command, cwd=self.repo.url)
 
     def revparse(self, rev):
+        if self.metadata is not None and not _REVISION_OPERATORS & set(rev):
+            id = self.metadata.ref(rev)
+            if id is not None:
+                return id
         commands = ['rev-parse', rev]
         output = self.run(commands)
         id = output[0].strip()
@@ -121,7 +206,9 @@ class CLIConnector(Connector):
             raise GeoGigException(msg)
 
     def children(self, ref=geogig.HEAD, path=None, recursive=False):
-        children = []
+        return list(self.iterchildren(ref, path, recursive))
+
+    def iterchildren(self, ref=geogig.HEAD, path=None, recursive=False):
         if path is None:
             fullref = ref
         else:
@@ -129,19 +216,50 @@ class CLIConnector(Connector):
         commands = ['ls-tree', fullref, "-v"]
         if recursive:
             commands.append("-r")
-        output = self.run(commands)
-        for line in output:
+        for line in self.iterrun(commands):
             if line != '':
                 tokens = line.split(" ")
+                if len(tokens) < 4:
+                    continue
                 if tokens[1] == "feature":
-                    children.append(Feature(self.repo, ref, tokens[3]))
+                    yield Feature(self.repo, ref, tokens[3])
                 elif tokens[1] == "tree":
                     try:
                         size = int(tokens[5])
                     except:
                         size = None
-                    children.append(Tree(self.repo, ref, tokens[3], size))
-        return children
+                    yield Tree(self.repo, ref, tokens[3], size)
+
+    def iterfeatureids(self, ref=geogig.HEAD, path=None):
+        """
+        Yields tuples of (path, object id) for all the features under the
+        passed ref and path, recursively
+        """
+        fullref = ref if path is None else ref + ':' + path
+        for line in self.iterrun(['ls-tree', fullref, "-v", "-r"]):
+            tokens = line.split(" ")
+            if len(tokens) >= 4 and tokens[1] == "feature":
+                yield tokens[3], tokens[2]
+
+    def treeid(self, ref, path):
+        """
+        Returns the object id of the tree at the passed ref and path, or
+        None if it does not exist
+        """
+        path = path.strip("/")
+        parent, sep, name = path.rpartition("/")
+        fullref = ref if not parent else ref + ':' + parent
+        try:
+            for line in self.run(['ls-tree', fullref, "-v"]):
+                tokens = line.split(" ")
+                if (len(tokens) >= 4 and tokens[1] == "tree"
+                        and tokens[3].strip("/") in [path, name]):
+                    return tokens[2]
+        except GeoGigException:
+            if parent:
+                return None  # the parent tree does not exist either
+            raise
+        return None
 
     def commitFromString(self, lines):
         message = False
@@ -194,7 +312,14 @@ class CLIConnector(Connector):
         commands = ["remote", "rm", name]
         self.run(commands)
 
+    def fetch(self, remote):
+        self.run(["fetch", remote])
+
     def remotes(self):
+        if self.metadata is not None:
+            remotes = self.metadata.remotes()
+            if remotes is not None:
+                return remotes
         commands = ["remote", "list", "-v"]
         output = self.run(commands)
         remotes = {}
@@ -208,7 +333,10 @@ class CLIConnector(Connector):
 
     def log(self, tip, sincecommit=None, until=None, since=None, path=None,
             n=None):
-        commits = []
+        return list(self.iterlog(tip, sincecommit, until, since, path, n))
+
+    def iterlog(self, tip, sincecommit=None, until=None, since=None,
+                path=None, n=None):
         param = tip if sincecommit is None else (sincecommit + ".." + tip)
         commands = ['rev-list', param]
         if path:
@@ -223,28 +351,26 @@ class CLIConnector(Connector):
             commands.extend(["--since", since])
         if n is not None:
             commands.extend(["-n", str(n)])
+        commitlines = []
         try:
-            output = self.run(commands)
+            for line in self.iterrun(commands):
+                if line == '':
+                    commit = self.commitFromString(commitlines)
+                    if commit is not None:
+                        yield commit
+                        commitlines = []
+                else:
+                    commitlines.append(line)
         except GeoGigException as e:
             if "HEAD does not resolve" in e.args[0]:  # empty repo
-                return []
+                return
             else:
                 raise e
-        commitlines = []
-        for line in output:
-            if line == '':
-                commit = self.commitFromString(commitlines)
-                if commit is not None:
-                    commits.append(commit)
-                    commitlines = []
-            else:
-                commitlines.append(line)
 
         if commitlines:
             commit = self.commitFromString(commitlines)
             if commit is not None:
-                commits.append(commit)
-        return commits
+                yield commit
 
     def conflicts(self):
         conflictsfile = os.path.join(self.repo.url, ".geogig", "conflicts")
@@ -275,15 +401,17 @@ class CLIConnector(Connector):
         else:
             raise GeoGigException("Unknown option:" + version)
         commands.append("-p")
-        commands.extend(paths)
-        self.run(commands)
+        for chunk in chunkargs(paths, commands):
+            self.run(commands + chunk)
         self.add(paths)
 
     def checkout(self, ref, paths=None, force=False):
         commands = ['checkout', ref]
         if paths is not None and len(paths) > 0:
             commands.append("-p")
-            commands.extend(paths)
+            for chunk in chunkargs(paths, commands):
+                self.run(commands + chunk)
+            return
         elif force:
             commands.append("--force")
         self.run(commands)
@@ -296,6 +424,10 @@ class CLIConnector(Connector):
             self.run(command)
 
     def _refs(self, prefix):
+        if self.metadata is not None:
+            refs = self.metadata.refs(prefix)
+            if refs is not None:
+                return refs
         refs = {}
         output = self.run(['show-ref'])
         for line in output:
@@ -310,6 +442,9 @@ class CLIConnector(Connector):
     def tags(self):
         return self._refs("refs/tags/")
 
+    def remotebranches(self):
+        return self._refs("refs/remotes/")
+
     def createbranch(self, ref, name, force=False, checkout=False):
         commands = ['branch', name, ref]
         if force:
@@ -333,8 +468,8 @@ class CLIConnector(Connector):
 
     def add(self, paths=()):
         if paths:
-            for path in paths:
-                self.run(['add', path])
+            for chunk in chunkargs(paths, ['add']):
+                self.run(['add'] + chunk)
         else:
             self.run(['add'])
 
@@ -360,15 +495,15 @@ class CLIConnector(Connector):
                          newcommitref, oldref, newref, path)
 
     def diff(self, refa, refb, path=None):
-        diffs = []
+        return list(self.iterdiff(refa, refb, path))
+
+    def iterdiff(self, refa, refb, path=None):
         commands = ['diff-tree', refa, refb]
         if path is not None:
             commands.extend(["--", path])
-        output = self.run(commands)
-        for line in output:
+        for line in self.iterrun(commands):
             if line != '':
-                diffs.append(self.diffentryFromString(refa, refb, line))
-        return diffs
+                yield self.diffentryFromString(refa, refb, line)
 
     def difftreestats(self, refa, refb):
         output = self.run(['diff-tree', refa, refb, "--tree-stats"])
@@ -380,71 +515,74 @@ class CLIConnector(Connector):
         return stats
 
     def treediff(self, path, refa, refb):
-        attribs = None
-        try:
-            ftypea = self.featuretype(refa, path)
-        except GeoGigException:
-            ftypea = {}
-        try:
-            ftypeb = self.featuretype(refb, path)
-        except GeoGigException:
-            ftypeb = {}
-        attribs = deepcopy(ftypea)
-        # we assume that there are no repeated attrib names with different type
-        attribs.update(ftypeb)
-
-        commands = ['diff-tree', refa, refb, "--", path, "--describe"]
-        lines = self.run(commands)
+        attribs = self.difftypes(path, refa, refb)
         features = []
-        difflines = []
-        i = 0
-        previousLine = None
-        while i < len(lines):
-            line = lines[i]
-            if line == '':
-                if difflines:
-                    changes = self.difffromstring(difflines, attribs)
-                    features.append(changes)
-                    difflines = []
-            else:
-                if difflines:
-                    difflines.append(line)
-                    tokens = line.split(" ")
-                    i += 1
-                    difflines.append(lines[i])
-                    if tokens[0] == ATTRIBUTE_DIFF_MODIFIED:
-                        i += 1
-                        difflines.append(lines[i])
-                else:
-                    difflines.append(line)
-            i += 1
-
-        if difflines:
-            changes = self.difffromstring(difflines, attribs)
-            features.append(changes)
+        for featurepath, changes in self.iterdescribe(path, refa, refb):
+            features.append(self.difffromchanges(changes, attribs))
         return attribs, features
 
-    def difffromstring(self, lines, attribs):
-        i = 1
-        changes = {}
-        while i < len(lines):
-            tokens = lines[i].split(" ")
-            attribute = tokens[1]
-            changeType = tokens[0]
-            i += 1
+    def difftypes(self, path, refa, refb):
+        """
+        Returns the types of the attributes of a tree in two refs, merged
+        in a single dict. Refs are resolved to commit ids when possible, so
+        feature types can be taken from the command cache
+        """
+        attribs = OrderedDict()
+        for ref in [refa, refb]:
+            if ref not in [geogig.WORK_HEAD, geogig.STAGE_HEAD]:
+                try:
+                    ref = self.revparse(ref)
+                except GeoGigException:
+                    pass
+            try:
+                ftype = self.featuretype(ref, path)
+            except GeoGigException:
+                continue
+            # we assume that there are no repeated attrib names with
+            # different type
+            attribs.update(ftype)
+        return attribs
+
+    def iterdescribe(self, path, refa, refb):
+        """
+        Yields a tuple of (path, changes) for each feature changed in a tree
+        between two refs, as the output of diff-tree is read. Changes are a
+        list of unparsed (change type, attribute, value, new value) tuples.
+        New value is only set for modified attributes
+        """
+        commands = ['diff-tree', refa, refb, "--", path, "--describe"]
+        lines = self.iterrun(commands)
+        featurepath = None
+        changes = []
+        for line in lines:
+            if featurepath is None:
+                if line != '':
+                    featurepath = line
+            elif line == '':
+                yield featurepath, changes
+                featurepath = None
+                changes = []
+            else:
+                tokens = line.split(" ")
+                value = next(lines, '')
+                value2 = None
+                if tokens[0] == ATTRIBUTE_DIFF_MODIFIED:
+                    value2 = next(lines, '')
+                changes.append((tokens[0], tokens[1], value, value2))
+        if featurepath is not None:
+            yield featurepath, changes
+
+    def difffromchanges(self, changes, attribs):
+        parsed = {}
+        for changeType, attribute, value, value2 in changes:
+            attribtype = attribs[attribute]
+            value = self.valuefromstring(value, attribtype)
             if changeType == ATTRIBUTE_DIFF_MODIFIED:
-                value = self.valuefromstring(lines[i], attribs[attribute])
-                i += 1
-                value2 = self.valuefromstring(lines[i], attribs[attribute])
-                changes[attribute] = (changeType, value, value2)
+                value2 = self.valuefromstring(value2, attribtype)
+                parsed[attribute] = (changeType, value, value2)
             else:
-                value = self.valuefromstring(lines[i], attribs[attribute])
-                changes[attribute] = (changeType, value)
-            i += 1
-        orderedchanges = []
-        for attrib in attribs:
-            orderedchanges.append(changes[attrib])
-        return orderedchanges
+                parsed[attribute] = (changeType, value)
+        return [parsed[attrib] for attrib in attribs]
 
     def importosm(self, osmfile, add=False, mappingfile=None):
         commands = ["osm", "import", osmfile]
@@ -539,11 +677,14 @@ class CLIConnector(Connector):
             commands.append("--force-featuretype")
         self.run(commands)
 
-    def importsl(self, database, table, add=False, dest=None):
+    def importsl(self, database, table, add=False, dest=None,
+                 idAttribute=None):
         commands = ["sl", "import", "--database", database]
         if dest is not None:
             commands.extend(["--dest", dest])
         commands.extend(["--table", table])
+        if idAttribute is not None:
+            commands.extend(["--fid-attrib", idAttribute])
         if add:
             commands.append("--add")
         self.run(commands)
@@ -591,8 +732,8 @@ class CLIConnector(Connector):
 
     def featuredata(self, ref, path):
         refandpath = ref + ":" + path
-        output = self.run(["show", "--raw", refandpath])
-        return self.parseattribs(output[2:])
+        output = self.iterrun(["show", "--raw", refandpath])
+        return self.parseattribs(islice(output, 2, None))
 
     def cat(self, reference):
         return "\n".join(self.run(["cat", reference]))
@@ -633,30 +774,51 @@ class CLIConnector(Connector):
 
     def featuresdata(self, refs):
         features = {}
+        for ref, lines in self.iterfeaturesraw(refs):
+            features[ref] = self.parseattribs(lines)
+        return features
+
+    def iterfeaturesraw(self, refs):
+        """
+        Yields tuples of (ref, lines) for the passed feature refs, with lines
+        being the unparsed attribute lines of the feature, as a sequence of
+        name, type and value lines
+        """
+        for ref, objectid, lines in self.iterfeatureobjects(refs):
+            yield ref, lines
+
+    def iterfeatureobjects(self, refs):
+        """
+        Yields tuples of (ref, object id, lines) for the passed feature refs,
+        with lines as yielded by iterfeaturesraw
+        """
         commands = ["show", "--raw"]
-        commands.extend(refs)
-        output = self.run(commands)
-        iterator = iter(output)
-        lines = []
-        name = None
-        while True:
-            try:
-                line = next(iterator)
+        for chunk in chunkargs(refs, commands):
+            iterator = self.iterrun(commands + chunk)
+            lines = []
+            name = None
+            objectid = None
+            for line in iterator:
                 if line == "":
-                    features[name] = self.parseattribs(lines)
+                    yield name, objectid, lines
                     lines = []
                     name = None
+                elif name is None:
+                    name = line
+                    idline = next(iterator, "").split()
+                    objectid = idline[-1] if idline else None
                 else:
-                    if name is None:
-                        name = line
-                        next(iterator)  # consume id line
-                    else:
-                        lines.append(line)
-            except StopIteration:
-                break
-        if lines:
-            features[name] = self.parseattribs(lines)
-        return features
+                    lines.append(line)
+            if lines:
+                yield name, objectid, lines
+
+    def featureobjects(self, refs):
+        """
+        Returns a dict with the passed feature refs as keys and tuples of
+        (object id, lines) as values
+        """
+        return dict((ref, (objectid, lines)) for ref, objectid, lines
+                    in self.iterfeatureobjects(refs))
 
     def featuretype(self, ref, tree, ordered=True):
         show = self.show(ref + ":" + tree)
@@ -677,28 +839,45 @@ class CLIConnector(Connector):
             data2 = self.featuredata(ref2, path)
         except GeoGigException:
             data2 = None
-
-        if data is None:
-            if data2 is None:
-                return {}
-            else:
-                return dict(((k, (None, v[0])) for k, v in data2.items()))
-        elif data2 is None:
-            return dict(((k, (v[0], None)) for k, v in data.items()))
-
-        diffs = {}
-        for attr in data:
-            if attr in data2:
-                v = data[attr][0]
-                v2 = data2[attr][0]
-                equal = v == v2
-                if not equal:
-                    diffs[attr] = (data[attr][0], data2[attr][0])
-            else:
-                diffs[attr] = (data[attr][0], None)
-        for attr in data2:
-            if attr not in data:
-                diffs[attr] = (None, data2[attr][0])
+        return _diffattributes(data, data2)
+
+    def existingfeaturesdata(self, refs):
+        """
+        Returns the data of the passed feature refs, as featuresdata does,
+        skipping the ones that do not exist
+        """
+        return _fetchexisting(refs, self.featuresdata)
+
+    def existingfeatureobjects(self, refs):
+        """
+        Returns the object ids and unparsed lines of the passed feature refs,
+        as featureobjects does, skipping the ones that do not exist
+        """
+        return _fetchexisting(refs, self.featureobjects)
+
+    def featurediffs(self, ref, ref2, paths):
+        """
+        Returns the attribute changes of the passed feature paths between
+        two refs. The changed paths and their old and new object ids are
+        taken from diff-tree, so only the versions that exist are requested,
+        and unchanged features are not requested at all
+        """
+        paths = list(paths)
+        refs = []
+        commands = ["diff-tree", ref, ref2, "--"]
+        for chunk in chunkargs(paths, commands):
+            for line in self.iterrun(commands + chunk):
+                if line != '':
+                    entry = self.diffentryFromString(ref, ref2, line)
+                    if entry.oldref != geogig.NULL_ID:
+                        refs.append(ref + ":" + entry.path)
+                    if entry.newref != geogig.NULL_ID:
+                        refs.append(ref2 + ":" + entry.path)
+        data = self.existingfeaturesdata(refs)
+        diffs = OrderedDict()
+        for path in paths:
+            diffs[path] = _diffattributes(data.get(ref + ":" + path),
+                                          data.get(ref2 + ":" + path))
         return diffs
 
     def blame(self, path):
@@ -776,32 +955,46 @@ class CLIConnector(Connector):
                                       for k, v in initParams.items()]))
         self.run(commands)
 
-    def insertfeatures(self, features):
-        s = ""
-        for path, attrs in features.items():
-            s += path + "\n"
-            for attrName, attrValue in attrs.items():
-                if attrValue is not None:
-                    s += attrName + "\t" + _tostr(attrValue) + "\n"
-            s += "\n"
-        try:
-            f = tempfile.NamedTemporaryFile(delete=False)
-            f.write(s)
-            f.close()
-            commands = ["insert", "-f", f.name]
-            self.run(commands)
-        finally:
-            f.close()
+    def insertfeatures(self, features, batchsize=None):
+        """
+        Inserts features passed as a dict with paths as keys and attributes
+        as values, or as any iterable of (path, attributes) tuples.
+        Features are written to a spool file and inserted in batches of the
+        passed size, or DEFAULT_INSERT_BATCH_SIZE if it is None, so only one
+        batch is held by geogig at a time and the passed iterable is consumed
+        lazily. Returns the number of features inserted
+        """
+        if batchsize is None:
+            batchsize = DEFAULT_INSERT_BATCH_SIZE
+        elif batchsize < 1:
+            raise GeoGigException("Invalid insert batch size: %s" % batchsize)
+        if isinstance(features, dict):
+            features = features.items()
+        iterator = iter(features)
+        total = 0
+        start = time.time()
+        while True:
+            f = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False,
+                                            encoding="utf-8")
             try:
-                pass  # os.remove(f.name)
-            except:
-                pass
+                with f:
+                    count = _writefeatures(f, islice(iterator, batchsize))
+                if count:
+                    self.run(["insert", "-f", f.name])
+            finally:
+                os.remove(f.name)
+            total += count
+            if count < batchsize:
+                break
+        elapsed = time.time() - start
+        logging.info("Inserted %i features in %.2f s (%.0f features/s)"
+                     % (total, elapsed, total / elapsed if elapsed else 0))
+        return total
 
     def removepaths(self, paths, recursive=False):
-        paths.insert(0, "rm")
-        if recursive:
-            paths.append("-r")
-        self.run(paths)
+        commands = ["rm", "-r"] if recursive else ["rm"]
+        for chunk in chunkargs(paths, commands):
+            self.run(commands + chunk)
 
     def applypatch(self, patchfile):
         self.run(["apply", patchfile])
@@ -816,6 +1009,10 @@ class CLIConnector(Connector):
         self.run(commands)
 
     def getconfig(self, param):
+        if self.metadata is not None:
+            value = self.metadata.config(param)
+            if value is not None:
+                return value
         value = self.run(["config", "--get", param])
         value = value[0] if value else None
         return value
@@ -840,6 +1037,22 @@ class CLIConnector(Connector):
         self.run(commands)
 
 
+def _writefeatures(f, features):
+    """
+    Writes features to an open insert file, returning the number of features
+    written
+    """
+    count = 0
+    for path, attrs in features:
+        f.write(path + "\n")
+        for attrName, attrValue in attrs.items():
+            if attrValue is not None:
+                f.write(attrName + "\t" + _tostr(attrValue) + "\n")
+        f.write("\n")
+        count += 1
+    return count
+
+
 def _tostr(v):
     try:
         d = float(v)
@@ -848,3 +1061,34 @@ def _tostr(v):
         return str(d)
     except:
         return str(v)
+
+
+def _fetchexisting(refs, fetch):
+    """
+    Calls the passed function, which returns a dict with data for a list of
+    feature refs, in chunks of refs. A missing feature makes the whole
+    command fail, so failed chunks are split in halves and requested again
+    until the missing features are isolated, and they are skipped.
+    Any other error is raised
+    """
+    features = {}
+    pending = list(chunkargs(refs, ["show", "--raw"]))
+    while pending:
+        chunk = pending.pop()
+        try:
+            features.update(fetch(chunk))
+        except GeoGigException as e:
+            if not ismissingerror(e):
+                raise e
+            if len(chunk) > 1:
+                half = len(chunk) // 2
+                pending.extend([chunk[:half], chunk[half:]])
+    return features
+
+
+def ismissingerror(e):
+    """
+    Returns True if the passed GeoGigException was raised because a
+    requested object does not exist
+    """
+    return bool(e.args) and MISSING_OBJECT_ERROR in str(e.args[0])
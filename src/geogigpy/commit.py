@@ -14,6 +14,9 @@ class Commit(Commitish):
 
     """A geogig commit"""
 
+    __slots__ = ("commitid", "treeid", "_parents", "message", "authorname",
+                 "authordate", "committername", "committerdate")
+
     def __init__(self, repo, commitid, treeid, parents, message,
                  authorname, authordate, committername, committerdate):
         Commitish.__init__(self, repo, commitid)
@@ -35,6 +38,8 @@ class Commit(Commitish):
         """
         if ref == NULL_ID:
             return Commitish(repo, NULL_ID)
+        elif repo._commitgraph is not None and ref in repo._commitgraph:
+            return repo._commitgraph.commit(ref)
         else:
             if (repo.url, ref) not in Commit._commitcache:
                 id = repo.revparse(ref)
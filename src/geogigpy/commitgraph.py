@@ -0,0 +1,312 @@
+# coding: utf-8
+
+import datetime
+import heapq
+import json
+import os
+import re
+import threading
+
+from geogigpy import geogig
+from geogigpy.commit import Commit
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.utils import SHA_MATCHER
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_NAVIGATION = re.compile(r"([~^])(\d*)")
+
+(_TREE, _PARENTS, _MESSAGE, _AUTHOR, _AUTHORDATE,
+ _COMMITTER, _COMMITTERDATE) = range(7)
+
+
+class CommitGraph(object):
+    """
+    An in-memory index of the commits of a repository and the relations
+    between them.
+
+    Commits are added by walking the history from a given tip, and the walk
+    stops as soon as it reaches commits that are already known, so keeping
+    the graph up to date after new commits are created is cheap.
+    Each commit has a generation number (1 for root commits, and one more
+    than the largest one of its parents otherwise), which is used to prune
+    ancestry queries
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._data = {}
+        self._children = {}
+        self._generation = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, commitid):
+        return commitid in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        """Iterates over the ids of the commits in the graph"""
+        with self._lock:
+            return iter(list(self._data))
+
+    def add(self, tip):
+        """
+        Adds the passed commit id and all its ancestors to the graph.
+        Returns the number of commits that were added
+        """
+        with self._lock:
+            if tip in self._data or tip == geogig.NULL_ID:
+                return 0
+            pending = set([tip])
+            added = []
+            log = self.repo.connector.iterlog(tip)
+            try:
+                for commit in log:
+                    pending.discard(commit.commitid)
+                    if commit.commitid not in self._data:
+                        self._addcommit(commit)
+                        added.append(commit.commitid)
+                        pending.update(p for p in self._data[commit.commitid]
+                                       [_PARENTS] if p not in self._data)
+                    if not pending:
+                        break
+            finally:
+                log.close()
+            for commitid in added:
+                self.generation(commitid)
+            return len(added)
+
+    def _addcommit(self, commit):
+        parents = tuple(p for p in commit._parents if p != geogig.NULL_ID)
+        self._data[commit.commitid] = (commit.treeid, parents,
+                                       commit.message, commit.authorname,
+                                       commit.authordate, commit.committername,
+                                       commit.committerdate)
+        self._children.setdefault(commit.commitid, [])
+        for parent in parents:
+            self._children.setdefault(parent, []).append(commit.commitid)
+
+    def update(self, tips=None):
+        """
+        Adds the history of the passed commit ids to the graph.
+        If no tips are passed, the tips of all branches and the current HEAD
+        are used.
+        Returns the number of commits that were added
+        """
+        if tips is None:
+            tips = list(self.repo.branches.values())
+            try:
+                tips.append(self.repo.connector.revparse(geogig.HEAD))
+            except GeoGigException:
+                pass  # empty repo
+        return sum(self.add(tip) for tip in tips)
+
+    def commit(self, commitid):
+        """Returns a Commit object for the passed commit id"""
+        data = self._data[commitid]
+        return Commit(self.repo, commitid, data[_TREE],
+                      list(data[_PARENTS]) or None, data[_MESSAGE],
+                      data[_AUTHOR], data[_AUTHORDATE],
+                      data[_COMMITTER], data[_COMMITTERDATE])
+
+    def parents(self, commitid):
+        """Returns a list with the ids of the parents of a commit"""
+        return list(self._data[commitid][_PARENTS])
+
+    def children(self, commitid):
+        """Returns a list with the ids of the known children of a commit"""
+        return list(self._children.get(commitid, []))
+
+    def generation(self, commitid):
+        """Returns the generation number of a commit"""
+        stack = [commitid]
+        while stack:
+            current = stack[-1]
+            if current in self._generation:
+                stack.pop()
+                continue
+            parents = self._data[current][_PARENTS] \
+                if current in self._data else ()
+            missing = [p for p in parents if p not in self._generation
+                       and p in self._data]
+            if missing:
+                stack.extend(missing)
+            else:
+                self._generation[current] = 1 + max(
+                    [self._generation.get(p, 0) for p in parents] or [0])
+                stack.pop()
+        return self._generation[commitid]
+
+    def resolve(self, rev):
+        """
+        Resolves a revision that uses the ~n and ^n operators, such as
+        HEAD~2 or master^2~1, navigating the graph locally.
+        The base ref is resolved using the repository connector.
+        Raises a GeoGigException if the revision cannot be resolved
+        """
+        match = _NAVIGATION.search(rev)
+        base = rev if match is None else rev[:match.start()]
+        ops = rev[len(base):]
+        if _NAVIGATION.sub("", ops):
+            raise GeoGigException("Cannot resolve the provided reference")
+        if SHA_MATCHER.match(base) is None or len(base) != 40:
+            base = self.repo.connector.revparse(base)
+        with self._lock:
+            self.add(base)
+            commitid = base
+            for op, number in _NAVIGATION.findall(ops):
+                n = 1 if number == "" else int(number)
+                if op == "~":
+                    for i in range(n):
+                        commitid = self._parent(commitid, 1)
+                elif n > 0:
+                    commitid = self._parent(commitid, n)
+        return commitid
+
+    def _parent(self, commitid, n):
+        parents = self._data.get(commitid, (None, ()))[_PARENTS]
+        if len(parents) < n:
+            raise GeoGigException("Cannot resolve the provided reference")
+        return parents[n - 1]
+
+    def ancestors(self, commitid, mingeneration=0):
+        """
+        Returns a set with the ids of a commit and all its ancestors.
+        Ancestors with a generation number lower than the passed one are
+        not visited
+        """
+        seen = set()
+        stack = [commitid]
+        while stack:
+            current = stack.pop()
+            if current in seen or current not in self._data:
+                continue
+            if self.generation(current) < mingeneration:
+                continue
+            seen.add(current)
+            stack.extend(self._data[current][_PARENTS])
+        return seen
+
+    def iterancestors(self, commitid):
+        """
+        Iterates lazily over the ids of a commit and all its ancestors, from
+        the highest generation number to the lowest one, and from the most
+        recent committer date to the oldest one within a generation. Every
+        commit comes before all its ancestors
+        """
+        seen = set()
+        heap = []
+
+        def push(current):
+            if current not in seen and current in self._data:
+                seen.add(current)
+                date = _totimestamp(self._data[current][_COMMITTERDATE])
+                heapq.heappush(heap, (-self.generation(current),
+                                      -(date or 0), current))
+
+        push(commitid)
+        while heap:
+            current = heapq.heappop(heap)[2]
+            yield current
+            for parent in self._data[current][_PARENTS]:
+                push(parent)
+
+    def isancestor(self, ancestor, commitid):
+        """
+        Returns true if the first commit is reachable from the second one
+        """
+        return ancestor in self.ancestors(commitid,
+                                          self.generation(ancestor))
+
+    def commonancestor(self, commita, commitb):
+        """
+        Returns the id of the best common ancestor of two commits, or None
+        if they have no common history
+        """
+        with self._lock:
+            self.add(commita)
+            self.add(commitb)
+        common = self.ancestors(commita) & self.ancestors(commitb)
+        if not common:
+            return None
+        return max(common, key=lambda c: (self.generation(c),
+                                          self._data[c][_COMMITTERDATE]))
+
+    def aheadbehind(self, pairs):
+        """
+        Takes a list of (commitid, upstreamid) tuples and returns a list with
+        a tuple of (ahead, behind) commit counts for each of them.
+        All counts are computed in a single pass over the graph, labelling
+        each commit with a bitmap of the tips it is reachable from
+        """
+        tips = []
+        for pair in pairs:
+            for tip in pair:
+                if tip not in tips:
+                    tips.append(tip)
+        with self._lock:
+            for tip in tips:
+                self.add(tip)
+        bits = dict((tip, 1 << i) for i, tip in enumerate(tips))
+        reachable = set()
+        for tip in tips:
+            reachable |= self.ancestors(tip)
+        for commitid in sorted(reachable, key=self.generation, reverse=True):
+            mask = bits.get(commitid, 0)
+            for parent in self._data[commitid][_PARENTS]:
+                bits[parent] = bits.get(parent, 0) | mask
+        masks = {}
+        for commitid in reachable:
+            masks[bits[commitid]] = masks.get(bits[commitid], 0) + 1
+        counts = []
+        for tip, upstream in pairs:
+            bit, upbit = 1 << tips.index(tip), 1 << tips.index(upstream)
+            ahead = sum(n for mask, n in masks.items()
+                        if mask & bit and not mask & upbit)
+            behind = sum(n for mask, n in masks.items()
+                         if mask & upbit and not mask & bit)
+            counts.append((ahead, behind))
+        return counts
+
+    def save(self, filename):
+        """Saves the graph to a file, so it can be loaded later"""
+        commits = {}
+        with self._lock:
+            for commitid, data in self._data.items():
+                data = list(data)
+                data[_PARENTS] = list(data[_PARENTS])
+                data[_AUTHORDATE] = _totimestamp(data[_AUTHORDATE])
+                data[_COMMITTERDATE] = _totimestamp(data[_COMMITTERDATE])
+                commits[commitid] = data + [self.generation(commitid)]
+        tmpfile = filename + ".tmp"
+        with open(tmpfile, "w") as f:
+            json.dump({"commits": commits}, f)
+        os.rename(tmpfile, filename)
+
+    @staticmethod
+    def load(repo, filename):
+        """Returns a graph for the passed repo, read from a file"""
+        graph = CommitGraph(repo)
+        with open(filename) as f:
+            commits = json.load(f)["commits"]
+        for commitid, data in commits.items():
+            generation = data.pop()
+            data[_PARENTS] = tuple(data[_PARENTS])
+            data[_AUTHORDATE] = _fromtimestamp(data[_AUTHORDATE])
+            data[_COMMITTERDATE] = _fromtimestamp(data[_COMMITTERDATE])
+            graph._data[commitid] = tuple(data)
+            graph._generation[commitid] = generation
+            graph._children.setdefault(commitid, [])
+            for parent in data[_PARENTS]:
+                graph._children.setdefault(parent, []).append(commitid)
+        return graph
+
+
+def _totimestamp(d):
+    return None if d is None else (d - _EPOCH).total_seconds()
+
+
+def _fromtimestamp(t):
+    return None if t is None else _EPOCH + datetime.timedelta(seconds=t)
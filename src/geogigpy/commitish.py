@@ -12,6 +12,8 @@ class Commitish(object):
     and feature for the version it represents
     """
 
+    __slots__ = ("ref", "repo", "_diff", "_id")
+
     def __init__(self, repo, ref):
         self.ref = ref
         self.repo = repo
@@ -4,9 +4,21 @@
 class Connector(object):
     """Base class for connector"""
 
+    # True if commands run through several sessions of the connector can
+    # run at the same time, so parallel operations are worth using
+    concurrent = False
+
     def setRepository(self, repo):
         self.repo = repo
 
+    def newsession(self):
+        """
+        Returns a new connector of the same kind and with the same
+        configuration, that can be used from another thread without sharing
+        the state of this one
+        """
+        raise NotImplementedError
+
     def createdat(self):
         raise NotImplementedError
 
@@ -38,18 +50,33 @@ class Connector(object):
     def children(self, ref, path, recursive):
         raise NotImplementedError
 
+    def iterchildren(self, ref, path, recursive):
+        raise NotImplementedError
+
+    def iterfeatureids(self, ref, path):
+        raise NotImplementedError
+
+    def treeid(self, ref, path):
+        raise NotImplementedError
+
     def addremote(self, name, url, username=None, password=None):
         raise NotImplementedError
 
     def removeremote(self, name):
         raise NotImplementedError
 
+    def fetch(self, remote):
+        raise NotImplementedError
+
     def remotes(self):
         raise NotImplementedError
 
     def log(self, tip, sincecommit, until, since, path, n):
         raise NotImplementedError
 
+    def iterlog(self, tip, sincecommit, until, since, path, n):
+        raise NotImplementedError
+
     def conflicts(self):
         raise NotImplementedError
 
@@ -68,6 +95,9 @@ class Connector(object):
     def tags(self):
         raise NotImplementedError
 
+    def remotebranches(self):
+        raise NotImplementedError
+
     def createbranch(self, ref, name, force, checkout):
         raise NotImplementedError
 
@@ -89,9 +119,21 @@ class Connector(object):
     def diff(self, refa, refb, path):
         raise NotImplementedError
 
+    def iterdiff(self, refa, refb, path):
+        raise NotImplementedError
+
     def difftreestats(self, refa, refb):
         raise NotImplementedError
 
+    def treediff(self, path, refa, refb):
+        raise NotImplementedError
+
+    def iterdescribe(self, path, refa, refb):
+        raise NotImplementedError
+
+    def difftypes(self, path, refa, refb):
+        raise NotImplementedError
+
     def importosm(self, osmfile, add, mappingfile):
         raise NotImplementedError
 
@@ -117,7 +159,7 @@ class Connector(object):
                  add, dest, force, idAttribute):
         raise NotImplementedError
 
-    def importsl(self, database, table, add, dest):
+    def importsl(self, database, table, add, dest, idAttribute):
         raise NotImplementedError
 
     def exportpg(self, ref, path, table, database, user, password, schema,
@@ -142,12 +184,30 @@ class Connector(object):
     def featuresdata(self, refs):
         raise NotImplementedError
 
+    def iterfeaturesraw(self, refs):
+        raise NotImplementedError
+
     def featuretype(self, ref, tree):
         raise NotImplementedError
 
     def featurediff(self, ref, ref2, path):
         raise NotImplementedError
 
+    def featurediffs(self, ref, ref2, paths):
+        raise NotImplementedError
+
+    def existingfeaturesdata(self, refs):
+        raise NotImplementedError
+
+    def iterfeatureobjects(self, refs):
+        raise NotImplementedError
+
+    def featureobjects(self, refs):
+        raise NotImplementedError
+
+    def existingfeatureobjects(self, refs):
+        raise NotImplementedError
+
     def blame(self, path):
         raise NotImplementedError
 
@@ -172,7 +232,7 @@ class Connector(object):
     def init(self, initParams):
         raise NotImplementedError
 
-    def insertfeatures(self, features):
+    def insertfeatures(self, features, batchsize=None):
         raise NotImplementedError
 
     def removepaths(self, paths, recursive):
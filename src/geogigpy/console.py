@@ -0,0 +1,58 @@
+# coding: utf-8
+
+"""
+The console used by default by the shell connector, started with
+'python -m geogigpy.console' in the folder of a repository.
+
+It reads one geogig command per line from stdin, runs it with the geogig
+executable and prints its output. Lines starting with the frame prefix are
+answered by printing them back, followed by the exit status of the previous
+command, which is the framing protocol the shell connector expects.
+"""
+
+import logging
+import os
+import shlex
+import sys
+
+from geogigpy.cliconnector import _iterrun
+from geogigpy.geogigexception import GeoGigException
+
+FRAME_PREFIX = "#geogigpy-"
+
+
+def execute(line, out):
+    """
+    Runs a command line with geogig, writing its output to the passed
+    file. Returns the exit status of the command
+    """
+    # the command line is passed to the shell, quoted as the shell connector
+    # quotes it, except on Windows, where arguments are passed as a list
+    args = shlex.split(line) if os.name == 'nt' else [line]
+    written = False
+    try:
+        for outputline in _iterrun(args, addcolor=False):
+            out.write(outputline + "\n")
+            written = True
+    except GeoGigException as e:
+        if not written:
+            out.write(str(e) + "\n")
+        return 1
+    return 0
+
+
+def main():
+    # errors are reported in the output of each command, so they must not
+    # be logged to stderr, which the shell connector reads as output too
+    logging.getLogger().addHandler(logging.NullHandler())
+    status = 0
+    for line in iter(sys.stdin.readline, ""):
+        line = line.strip("\r\n")
+        if line.startswith(FRAME_PREFIX):
+            sys.stdout.write("%s %i\n" % (line, status))
+        elif line.strip():
+            status = execute(line, sys.stdout)
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
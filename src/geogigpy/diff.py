@@ -15,6 +15,9 @@ class Diffentry(object):
 
     """A difference between two references for a given path"""
 
+    __slots__ = ("repo", "path", "oldref", "newref", "oldcommitref",
+                 "newcommitref", "olddata", "newdata", "hasdata")
+
     def __init__(self, repo, oldcommitref, newcommitref, oldref, newref, path):
         self.repo = repo
         self.path = path
@@ -22,6 +25,19 @@ class Diffentry(object):
         self.newref = newref
         self.oldcommitref = oldcommitref
         self.newcommitref = newcommitref
+        self.olddata = None
+        self.newdata = None
+        self.hasdata = False
+
+    def setdata(self, olddata, newdata):
+        """
+        Sets the data of the old and new versions of the feature, as dicts
+        in the form returned by Repository.featuredata, or None if the
+        feature does not exist in that version
+        """
+        self.olddata = olddata
+        self.newdata = newdata
+        self.hasdata = True
 
     def oldobject(self):
         if self.oldref == NULL_ID:
@@ -36,6 +52,8 @@ class Diffentry(object):
             return Feature(self.repo, self.newcommitref, self.path)
 
     def featurediff(self):
+        if self.hasdata:
+            return _diffattributes(self.olddata, self.newdata)
         return self.repo.featurediff(self.oldcommitref,
                                      self.newcommitref,
                                      self.path)
@@ -56,3 +74,33 @@ class Diffentry(object):
         else:
             return "%s %s (%s --> %s)" % (TYPE_MODIFIED, self.path,
                                           self.oldref, self.newref)
+
+
+def _diffattributes(data, data2):
+    """
+    Returns a dict with the attributes that differ between two versions of
+    a feature, passed as feature data dicts, or None if the feature does
+    not exist in that version. Values are tuples of (oldvalue, newvalue)
+    """
+    if data is None:
+        if data2 is None:
+            return {}
+        else:
+            return dict(((k, (None, v[0])) for k, v in data2.items()))
+    elif data2 is None:
+        return dict(((k, (v[0], None)) for k, v in data.items()))
+
+    diffs = {}
+    for attr in data:
+        if attr in data2:
+            v = data[attr][0]
+            v2 = data2[attr][0]
+            equal = v == v2
+            if not equal:
+                diffs[attr] = (data[attr][0], data2[attr][0])
+        else:
+            diffs[attr] = (data[attr][0], None)
+    for attr in data2:
+        if attr not in data:
+            diffs[attr] = (None, data2[attr][0])
+    return diffs
@@ -5,7 +5,7 @@ import time
 
 from geogigpy import geogig
 from geogigpy.commit import Commit
-from geogigpy.repo import Repository
+from geogigpy.repo import Repository, EXPORT_PG
 
 
 def squash_latest(repo, n, message=None):
@@ -32,6 +32,8 @@ def squash(repo, refa, refb, message=None):
     If a message is passed, it uses it for the resulting commit.
     Otherwise, it uses the messages from the squashed commits
     """
+    # parents and ancestry are resolved locally from here on
+    repo.commitgraph()
     head = repo.head
 
     commita = Commit.fromref(repo, refa)
@@ -77,19 +79,16 @@ def blame(repo):
     Returns a dict with tree names ids as keys and the name of the last
     person to edit each tree as values
     """
-    authors = {}
-    for tree in repo.trees:
-        path = tree.path
-        log = repo.log(path)
-        authors[path] = log[0].authorname
-    return authors
+    return repo.treeauthors()
 
 
 def export_tp_pg(repo, host, user, password, port, database, schema="public"):
-    for tree in repo.trees:
-        path = tree.path
-        repo.exportpg(geogig.HEAD, path, path, database, user, password,
-                      schema, host, port)
+    results = repo.exportall(geogig.HEAD, database, format=EXPORT_PG,
+                             user=user, password=password, schema=schema,
+                             host=host, port=port)
+    for path, (elapsed, error) in results.items():
+        if error is not None:
+            raise error
 
 
 def getTempPath():
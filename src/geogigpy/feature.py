@@ -4,16 +4,26 @@ from collections import OrderedDict
 
 from geogigpy.geogigexception import GeoGigException
 from geogigpy.geometry import Geometry
+from geogigpy.schema import splitdata
 
 
 class Feature(object):
 
+    """
+    A feature at a given path and ref.
+    Once queried, its attributes are stored as a tuple of values, along with
+    a schema with their names and types shared by all features that have
+    the same feature type
+    """
+
+    __slots__ = ("repo", "ref", "path", "_schema", "_values")
+
     def __init__(self, repo, ref, path):
         self.repo = repo
         self.ref = ref
         self.path = path
-        self._attributes = None
-        self._featuretype = None
+        self._schema = None
+        self._values = None
 
     @property
     def attributes(self):
@@ -21,11 +31,24 @@ class Feature(object):
         Returns the attributes of the feature in a dict  with attributes
         names as keys and attribute values as values.
         Values are converted to appropriate types when possible, otherwise
-        they are stored as the string representation of the attribute
+        they are stored as the string representation of the attribute.
+        A new dict is returned each time
         '''
-        if self._attributes is None:
+        if self._values is None:
             self.query()
-        return self._attributes
+        return OrderedDict(zip(self._schema.names, self._values))
+
+    def value(self, name):
+        '''
+        Returns the value of a single attribute, without creating a dict
+        with all of them
+        '''
+        if self._values is None:
+            self.query()
+        try:
+            return self._values[self._schema.index[name]]
+        except KeyError:
+            raise GeoGigException("Feature has no attribute " + name)
 
     @property
     def attributesnogeom(self):
@@ -45,8 +68,9 @@ class Feature(object):
         If there is no geometry, an exception is raised.
         If there are several of them, the first one found is returned.
         '''
-        attrs = self.attributes
-        for v in list(attrs.values()):
+        if self._values is None:
+            self.query()
+        for v in self._values:
             if isinstance(v, Geometry):
                 return v
         raise GeoGigException("Feature has no geometry")
@@ -59,8 +83,9 @@ class Feature(object):
         If there is no geometry, an exception is raised.
         If there are several of them, the first one found is returned.
         '''
-        attrs = self.attributes
-        for k, v in attrs.items():
+        if self._values is None:
+            self.query()
+        for k, v in zip(self._schema.names, self._values):
             if isinstance(v, Geometry):
                 return k
         raise GeoGigException("Feature has no geometry")
@@ -72,9 +97,9 @@ class Feature(object):
         Values are converted to appropriate types when possible, otherwise
         they are stored as the string representation of the attribute
         '''
-        if self._featuretype is None:
+        if self._values is None:
             self.query()
-        return self._featuretype
+        return OrderedDict(zip(self._schema.names, self._schema.types))
 
     def diff(self, feature):
         if feature.path != self.path:
@@ -82,14 +107,15 @@ class Feature(object):
             raise GeoGigException(msg)
         return self.repo.featurediff(self.ref, feature.ref, self.path)
 
-    def query(self, ordered=True):
+    def query(self):
         data = self.repo.featuredata(self.ref, self.path)
         if len(data) == 0:
             msg = "Feature at the specified path does not exist"
             raise GeoGigException(msg)
-        dict_cls = OrderedDict if ordered else dict
-        self._attributes = dict_cls(((k, v[0]) for k, v in data.items()))
-        self._featuretype = dict_cls(((k, v[1]) for k, v in data.items()))
+        self._setdata(data)
+
+    def _setdata(self, data):
+        self._schema, self._values = splitdata(data)
 
     def exists(self):
         try:
@@ -108,9 +134,9 @@ class Feature(object):
 
     def versions(self):
         """
-        Returns all versions of this feature.
-        It returns a dict with Commit objects as keys,
-        and feature data for the corresponding commit as values.
+        Returns all versions of this feature, newest first.
+        It returns a list of tuples with Commit objects and
+        feature data for the corresponding commit.
         Feature data is another dict with attributes names as keys
         and tuples of (attribute_value, attribute_type_name) as values.
         Values are converted to appropriate types when possible,
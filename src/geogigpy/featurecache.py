@@ -0,0 +1,135 @@
+# coding: utf-8
+
+import sqlite3
+import threading
+import pickle
+import zlib
+
+from geogigpy import geogig
+from geogigpy.feature import Feature
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class FeatureCache(object):
+    """
+    A persistent cache of feature data stored in a single SQLite file.
+
+    Entries are keyed by the SHA-1 of a commit or tree and the path of the
+    feature, so they never become stale. The file can be shared by several
+    processes, which can read it concurrently while one of them writes
+    """
+
+    def __init__(self, filename, timeout=30):
+        self.filename = filename
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS features ("
+                         "ref TEXT NOT NULL, path TEXT NOT NULL, "
+                         "data BLOB NOT NULL, PRIMARY KEY (ref, path))")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def get(self, ref, path):
+        """
+        Returns the cached data of the feature at the passed path of the
+        commit or tree with the passed SHA-1, or None if it is not cached
+        """
+        row = self._connection().execute(
+            "SELECT data FROM features WHERE ref=? AND path=?",
+            (ref, path)).fetchone()
+        return None if row is None else _decode(row[0])
+
+    def getmany(self, ref, paths):
+        """
+        Returns a dict with paths as keys and feature data as values for
+        the passed paths that are cached
+        """
+        data = {}
+        conn = self._connection()
+        paths = list(paths)
+        for i in range(0, len(paths), DEFAULT_CHUNK_SIZE):
+            chunk = paths[i:i + DEFAULT_CHUNK_SIZE]
+            query = ("SELECT path, data FROM features WHERE ref=? "
+                     "AND path IN (%s)" % ",".join("?" * len(chunk)))
+            for path, blob in conn.execute(query, [ref] + chunk):
+                data[path] = _decode(blob)
+        return data
+
+    def put(self, ref, path, data):
+        """Stores the data of a feature"""
+        self.putmany(ref, {path: data})
+
+    def putmany(self, ref, features):
+        """
+        Stores the data of several features of the same commit or tree,
+        passed as a dict with paths as keys and feature data as values
+        """
+        conn = self._connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO features "
+                             "(ref, path, data) VALUES (?, ?, ?)",
+                             ((ref, path, _encode(data))
+                              for path, data in features.items()))
+
+    def warm(self, repo, ref=geogig.HEAD, path=None,
+             chunksize=DEFAULT_CHUNK_SIZE):
+        """
+        Fetches and stores the data of all the features under the passed
+        path for the passed ref, skipping those already cached.
+        Returns the number of features that were added to the cache
+        """
+        sha = repo.revparse(ref)
+        added = 0
+        paths = []
+        features = repo.iterchildren(sha, path, recursive=True)
+        for feature in features:
+            if not isinstance(feature, Feature):
+                continue
+            paths.append(feature.path)
+            if len(paths) == chunksize:
+                added += self._warmchunk(repo, sha, paths)
+                paths = []
+        if paths:
+            added += self._warmchunk(repo, sha, paths)
+        return added
+
+    def _warmchunk(self, repo, sha, paths):
+        cached = self.getmany(sha, paths)
+        missing = [p for p in paths if p not in cached]
+        if not missing:
+            return 0
+        refs = [sha + ":" + p for p in missing]
+        data = repo.connector.featuresdata(refs)
+        self.putmany(sha, dict((p, data[r]) for p, r in zip(missing, refs)
+                               if r in data))
+        return len(missing)
+
+    def clear(self):
+        """Removes all entries from the cache"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM features")
+
+    def close(self):
+        """Closes the connection used by the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _encode(data):
+    return sqlite3.Binary(zlib.compress(pickle.dumps(data, 2)))
+
+
+def _decode(blob):
+    return pickle.loads(zlib.decompress(blob))
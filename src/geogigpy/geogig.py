@@ -20,7 +20,7 @@ TYPE_FLOAT = "FLOAT"
 TYPE_DOUBLE = "DOUBLE"
 TYPE_POINT = "POINT"
 TYPE_LINESTRING = "LINESTRING"
-TYPE_POLYGON = "POINT"
+TYPE_POLYGON = "POLYGON"
 TYPE_MULTIPOINT = "MULTIPOINT"
 TYPE_MULTILINESTRING = "MULTILINESTRING"
 TYPE_MULTIPOLYGON = "MULTIPOLYGON"
@@ -23,6 +23,9 @@ class GeoGigServerConnector(Connector):
         Connector.__init__(self)
         self.credentials = credentials
 
+    def newsession(self):
+        return GeoGigServerConnector(self.credentials)
+
     def log(self, tip, sincecommit=None, until=None, since=None,
             path=None, n=None):
         if since is not None or path is not None:
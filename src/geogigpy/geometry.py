@@ -1,10 +1,51 @@
 # coding: utf-8
 
+from geogigpy.wkt import decode
+
+
 class Geometry(object):
 
+    """
+    A geometry, stored as WKT. It is decoded into coordinate arrays the
+    first time its coordinates or envelope are requested (requires numpy)
+    """
+
+    __slots__ = ("geom", "crs", "_arrays", "_envelope")
+
     def __init__(self, geom, crs):
         self.geom = geom
         self.crs = crs
+        self._arrays = None
+        self._envelope = None
+
+    def decode(self):
+        """Returns the decoded geometry as a GeometryArrays object"""
+        if self._arrays is None:
+            self._arrays = decode(self.geom)
+        return self._arrays
+
+    @property
+    def geomtype(self):
+        return self.geom.strip().split("(")[0].split()[0].upper()
+
+    @property
+    def coords(self):
+        """Returns a numpy array with a row for each vertex"""
+        return self.decode().coords
+
+    @property
+    def vertexcount(self):
+        return len(self.decode().coords)
+
+    @property
+    def envelope(self):
+        """
+        Returns the envelope of the geometry as a (minx, miny, maxx, maxy)
+        tuple, or None if it is empty
+        """
+        if self._envelope is None:
+            self._envelope = self.decode().extent()
+        return self._envelope
 
     def __str__(self):
         return self.geom
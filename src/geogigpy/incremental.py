@@ -0,0 +1,232 @@
+# coding: utf-8
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+try:
+    from osgeo import ogr
+except ImportError:
+    ogr = None
+
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.geometry import Geometry
+
+# Name of the file in the .geogig folder where the digests of the imported
+# source rows are stored
+DIGESTS_FILE = "importdigests.sqlite"
+
+# Number of digests written in each statement
+DEFAULT_CHUNK_SIZE = 500
+
+NULL = "[NULL]"
+
+
+def checkogr():
+    if ogr is None:
+        raise GeoGigException("GDAL/OGR is required for incremental imports")
+
+
+class SourceLayer(object):
+    """
+    A layer of a data source that OGR can read (a shapefile, GeoJSON file,
+    PostGIS or SpatiaLite table), read row by row to compute the digests used
+    by incremental imports.
+
+    Rows are identified by the value of the id attribute, which is the one
+    passed to geogig as the feature id when the source is imported, so the
+    feature for a row is at <dest>/<id>
+    """
+
+    def __init__(self, source, layer=None, idattribute=None, geomname=None):
+        """
+        source: the name of the data source, as passed to ogr.Open
+
+        layer: the name of the layer, or None to use the first one
+
+        idattribute: the attribute used as feature id
+
+        geomname: the name of the geometry attribute created by the geogig
+        import command. If not passed, the geometry column of the layer is
+        used
+        """
+        checkogr()
+        if idattribute is None:
+            raise GeoGigException("Incremental imports need an id attribute")
+        self.source = source
+        self.layer = layer
+        self.idattribute = idattribute
+        self.geomname = geomname
+
+    def _open(self):
+        datasource = ogr.Open(self.source)
+        if datasource is None:
+            raise GeoGigException("Cannot open data source " + self.source)
+        if self.layer is None:
+            layer = datasource.GetLayer(0)
+        else:
+            layer = datasource.GetLayerByName(self.layer)
+        if layer is None:
+            raise GeoGigException("Cannot find layer %s in %s"
+                                  % (self.layer, self.source))
+        # the layer is only valid while the data source is referenced
+        return datasource, layer
+
+    def _fields(self, layer):
+        defn = layer.GetLayerDefn()
+        fields = [(defn.GetFieldDefn(i).GetName(),
+                   defn.GetFieldDefn(i).GetTypeName())
+                  for i in range(defn.GetFieldCount())]
+        if self.idattribute not in [name for name, typename in fields]:
+            raise GeoGigException("Id attribute %s not found in %s"
+                                  % (self.idattribute, self.source))
+        return fields
+
+    def _geomname(self, layer):
+        return self.geomname or layer.GetGeometryColumn() or "geometry"
+
+    def schemadigest(self):
+        """
+        Returns a digest of the attribute names and types of the layer, so
+        changes in the feature type can be detected
+        """
+        datasource, layer = self._open()
+        fields = self._fields(layer)
+        fields.append((self._geomname(layer),
+                       ogr.GeometryTypeToName(layer.GetGeomType())))
+        return _digest(fields)
+
+    def __iter__(self):
+        """
+        Yields tuples of (id, attributes) for all the rows of the layer.
+        Attributes are in a dict with attribute names as keys, and geometries
+        as Geometry objects
+        """
+        datasource, layer = self._open()
+        names = [name for name, typename in self._fields(layer)]
+        geomname = self._geomname(layer)
+        crs = _crs(layer.GetSpatialRef())
+        for feature in layer:
+            attributes = OrderedDict()
+            for i, name in enumerate(names):
+                attributes[name] = feature.GetField(i)
+            geom = feature.GetGeometryRef()
+            attributes[geomname] = (None if geom is None
+                                    else Geometry(geom.ExportToWkt(), crs))
+            fid = attributes[self.idattribute]
+            if fid is None:
+                raise GeoGigException("Null id attribute in " + self.source)
+            yield str(fid), attributes
+
+
+def _crs(spatialref):
+    if spatialref is None:
+        return None
+    spatialref.AutoIdentifyEPSG()
+    code = spatialref.GetAuthorityCode(None)
+    return None if code is None else "EPSG:" + code
+
+
+def _digest(items):
+    h = hashlib.sha1()
+    for name, value in items:
+        value = NULL if value is None else str(value)
+        h.update((name + "\t" + value + "\n").encode("utf-8"))
+    return h.hexdigest()
+
+
+def rowdigest(attributes):
+    """
+    Returns a digest of the values of a row, passed as a dict with attribute
+    names as keys and attribute values as values. Null values are part of
+    the digest, so a value that becomes null changes it
+    """
+    return _digest(sorted(attributes.items()))
+
+
+class DigestStore(object):
+    """
+    The digests of the source rows imported into each tree by incremental
+    imports, stored in a single SQLite file.
+
+    Digests describe the source as it was in the last import, so the id
+    of the tree after that import is stored with them, and they must only
+    be used while the tree still has that id
+    """
+
+    def __init__(self, filename, timeout=30):
+        self.filename = filename
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS digests ("
+                         "dest TEXT NOT NULL, id TEXT NOT NULL, "
+                         "digest TEXT NOT NULL, PRIMARY KEY (dest, id))")
+            conn.execute("CREATE TABLE IF NOT EXISTS schemas ("
+                         "dest TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS trees ("
+                         "dest TEXT PRIMARY KEY, treeid TEXT NOT NULL)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def schema(self, dest):
+        """
+        Returns the digest of the feature type last imported into a tree, or
+        None if it has not been imported incrementally
+        """
+        row = self._connection().execute(
+            "SELECT digest FROM schemas WHERE dest=?", (dest,)).fetchone()
+        return None if row is None else row[0]
+
+    def treeid(self, dest):
+        """
+        Returns the id of the tree after it was last imported incrementally,
+        or None if it is not known
+        """
+        row = self._connection().execute(
+            "SELECT treeid FROM trees WHERE dest=?", (dest,)).fetchone()
+        return None if row is None else row[0]
+
+    def digests(self, dest):
+        """
+        Returns a dict with the ids of the rows last imported into a tree as
+        keys and their digests as values
+        """
+        return dict(self._connection().execute(
+            "SELECT id, digest FROM digests WHERE dest=?", (dest,)))
+
+    def replace(self, dest, schema, digests, treeid=None):
+        """
+        Replaces the digests stored for a tree, and the id of the tree they
+        describe
+        """
+        conn = self._connection()
+        items = list(digests.items())
+        with conn:
+            conn.execute("DELETE FROM digests WHERE dest=?", (dest,))
+            for i in range(0, len(items), DEFAULT_CHUNK_SIZE):
+                conn.executemany("INSERT INTO digests (dest, id, digest) "
+                                 "VALUES (?, ?, ?)",
+                                 ((dest, fid, digest) for fid, digest
+                                  in items[i:i + DEFAULT_CHUNK_SIZE]))
+            conn.execute("INSERT OR REPLACE INTO schemas (dest, digest) "
+                         "VALUES (?, ?)", (dest, schema))
+            conn.execute("DELETE FROM trees WHERE dest=?", (dest,))
+            if treeid is not None:
+                conn.execute("INSERT INTO trees (dest, treeid) VALUES (?, ?)",
+                             (dest, treeid))
+
+    def remove(self, dest):
+        """Removes the digests stored for a tree"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM digests WHERE dest=?", (dest,))
+            conn.execute("DELETE FROM schemas WHERE dest=?", (dest,))
+            conn.execute("DELETE FROM trees WHERE dest=?", (dest,))
@@ -0,0 +1,172 @@
+# coding: utf-8
+
+import os
+import re
+import threading
+
+from geogigpy.utils import SHA_MATCHER
+
+HEADS = "refs/heads/"
+TAGS = "refs/tags/"
+REMOTES = "refs/remotes/"
+
+SYMREF_PREFIX = "ref:"
+
+GLOBAL_CONFIG = os.path.join(os.path.expanduser("~"), ".geogigconfig")
+
+_SECTION = re.compile(r'^\[\s*([^\]\s"]+)(?:\s+"([^"]*)")?\s*\]$')
+
+
+class RepositoryMetadata(object):
+    """
+    Reads refs and configuration values straight from the .geogig folder of
+    a repository, without running geogig.
+
+    Files are cached and only read again when they change on disk. Methods
+    return None when the requested information is not stored in plain files,
+    as happens with some storage backends, so callers can fall back to
+    running the corresponding geogig command
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.folder = os.path.join(url, ".geogig")
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _read(self, path):
+        """
+        Returns the content of a file, or None if it does not exist.
+        The content is cached and only read again if the stat of the
+        file changes
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino)
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            with open(path) as f:
+                content = f.read()
+        except (IOError, OSError):
+            return None
+        with self._lock:
+            self._files[path] = (key, content)
+        return content
+
+    @property
+    def hasrefs(self):
+        """Returns true if refs are stored as files in the repository folder"""
+        return os.path.isdir(os.path.join(self.folder, "refs"))
+
+    def _refvalue(self, name):
+        content = self._read(os.path.join(self.folder, *name.split("/")))
+        if content is None:
+            return None
+        return content.strip()
+
+    def ref(self, name):
+        """
+        Resolves a ref name (such as HEAD, a branch or tag name, or a full
+        name like refs/heads/master) to the SHA-1 it points to.
+        Returns None if it cannot be resolved from the repository files
+        """
+        if not self.hasrefs:
+            return None
+        candidates = [HEADS + name, TAGS + name, REMOTES + name,
+                      "refs/" + name]
+        if name.startswith("refs/"):
+            candidates = [name]
+        elif "/" not in name and name.isupper():
+            # HEAD, WORK_HEAD and the like live in the repository folder
+            candidates.insert(0, name)
+        for candidate in candidates:
+            value = self._refvalue(candidate)
+            seen = set()
+            while value is not None and value.startswith(SYMREF_PREFIX):
+                target = value[len(SYMREF_PREFIX):].strip()
+                if target in seen:
+                    return None
+                seen.add(target)
+                value = self._refvalue(target)
+            if value and SHA_MATCHER.match(value.split()[-1]):
+                return value.split()[-1]
+        return None
+
+    def refs(self, prefix):
+        """
+        Returns a dict with the names (without the passed prefix) and SHA-1s
+        of all refs under the passed prefix, such as refs/heads/
+        """
+        if not self.hasrefs:
+            return None
+        folder = os.path.join(self.folder, *prefix.strip("/").split("/"))
+        refs = {}
+        for root, dirs, files in os.walk(folder):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, folder).replace(os.sep, "/")
+                value = self.ref(prefix + name)
+                if value is not None:
+                    refs[name] = value
+        return refs
+
+    def branches(self):
+        return self.refs(HEADS)
+
+    def tags(self):
+        return self.refs(TAGS)
+
+    def _config(self, path):
+        content = self._read(path)
+        if content is None:
+            return None
+        values = {}
+        section = None
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line[0] in "#;":
+                continue
+            match = _SECTION.match(line)
+            if match is not None:
+                section = match.group(1)
+                if match.group(2) is not None:
+                    section += "." + match.group(2)
+                continue
+            if "=" not in line or section is None:
+                continue
+            key, value = line.split("=", 1)
+            value = value.strip()
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            values[section + "." + key.strip()] = value
+        return values
+
+    def config(self, param):
+        """
+        Returns the value of a config parameter, looking first in the
+        repository config and then in the global one.
+        Returns None if it is not found in any of them
+        """
+        for path in [os.path.join(self.folder, "config"), GLOBAL_CONFIG]:
+            values = self._config(path)
+            if values is not None and param in values:
+                return values[param]
+        return None
+
+    def remotes(self):
+        """
+        Returns a dict with remote names as keys and remote urls as values,
+        or None if the repository has no config file
+        """
+        values = self._config(os.path.join(self.folder, "config"))
+        if values is None:
+            return None
+        remotes = {}
+        for key, value in values.items():
+            if key.startswith("remote.") and key.endswith(".url"):
+                remotes[key[len("remote."):-len(".url")]] = value
+        return remotes
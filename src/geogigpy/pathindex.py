@@ -0,0 +1,129 @@
+# coding: utf-8
+
+import sqlite3
+import threading
+
+# Number of commits whose changes are stored in each database transaction
+DEFAULT_CHUNK_SIZE = 100
+
+
+class PathIndex(object):
+    """
+    A persistent index of the feature and tree paths changed by each commit
+    of a repository, stored in a single SQLite file.
+
+    It is built from the commits of a CommitGraph, comparing each commit
+    with its first parent using diff-tree, or listing all its features for
+    root commits. Commits that are already indexed are never compared
+    again, so keeping the index up to date after new commits are created
+    is cheap. Since commits cannot change, entries never become stale
+    """
+
+    def __init__(self, filename, timeout=30):
+        self.filename = filename
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._graphsize = None
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS commits ("
+                         "commitid TEXT PRIMARY KEY)")
+            conn.execute("CREATE TABLE IF NOT EXISTS paths ("
+                         "path TEXT NOT NULL, commitid TEXT NOT NULL, "
+                         "PRIMARY KEY (path, commitid))")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def __contains__(self, commitid):
+        return self._connection().execute(
+            "SELECT 1 FROM commits WHERE commitid=?",
+            (commitid,)).fetchone() is not None
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM commits").fetchone()[0]
+
+    def update(self, graph, chunksize=DEFAULT_CHUNK_SIZE):
+        """
+        Adds the changes of the commits in the passed CommitGraph that are
+        not indexed yet. Returns the number of commits that were added
+        """
+        with self._lock:
+            if self._graphsize == len(graph):
+                return 0
+            conn = self._connection()
+            indexed = set(row[0] for row in
+                          conn.execute("SELECT commitid FROM commits"))
+            missing = [c for c in graph if c not in indexed]
+            connector = graph.repo.connector
+            for i in range(0, len(missing), chunksize):
+                changes = []
+                for commitid in missing[i:i + chunksize]:
+                    changes.append((commitid, changedpaths(
+                        connector, commitid, graph.parents(commitid))))
+                with conn:
+                    for commitid, paths in changes:
+                        conn.executemany("INSERT OR IGNORE INTO paths "
+                                         "(path, commitid) VALUES (?, ?)",
+                                         ((p, commitid) for p in paths))
+                        conn.execute("INSERT OR IGNORE INTO commits "
+                                     "(commitid) VALUES (?)", (commitid,))
+            # graphs only grow, so the same size means nothing new
+            self._graphsize = len(graph)
+            return len(missing)
+
+    def commits(self, path):
+        """
+        Returns a set with the ids of the indexed commits that changed the
+        passed feature or tree path, or any of the passed list of paths
+        """
+        paths = path if isinstance(path, list) else [path]
+        conn = self._connection()
+        commits = set()
+        for p in paths:
+            commits.update(row[0] for row in conn.execute(
+                "SELECT commitid FROM paths WHERE path=?",
+                (p.strip("/"),)))
+        return commits
+
+    def paths(self, commitid):
+        """
+        Returns a sorted list with the feature and tree paths changed by
+        the passed commit
+        """
+        return [row[0] for row in self._connection().execute(
+            "SELECT path FROM paths WHERE commitid=? ORDER BY path",
+            (commitid,))]
+
+    def clear(self):
+        """Removes all entries from the index"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM paths")
+            conn.execute("DELETE FROM commits")
+        self._graphsize = None
+
+
+def changedpaths(connector, commitid, parents):
+    """
+    Returns a set with the paths of the features changed by a commit and
+    the paths of the trees that contain them
+    """
+    if parents:
+        features = [d.path for d in connector.iterdiff(parents[0], commitid)]
+    else:
+        features = [path for path, objectid
+                    in connector.iterfeatureids(commitid)]
+    paths = set()
+    for path in features:
+        tokens = path.split("/")
+        for i in range(1, len(tokens) + 1):
+            paths.add("/".join(tokens[:i]))
+    return paths
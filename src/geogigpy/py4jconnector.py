@@ -5,16 +5,24 @@ import os
 import time
 import gc
 import re
+import threading
+from collections import deque
 
 from py4j.java_gateway import JavaGateway, GatewayClient
 
 from geogigpy.geogigexception import GeoGigException
 from geogigpy.cliconnector import CLIConnector
+from geogigpy.cache import DEFAULT_CACHE_SIZE
 
 _proc = None
 _gateway = None
 _geogigPort = None
 
+# The gateway keeps the output of the last command until it is paged out,
+# so running a command and reading its output must not be interleaved
+_gatewayLock = threading.RLock()
+_activePages = None
+
 _logger = logging.getLogger("geogigpy")
 
 
@@ -37,12 +45,23 @@ def _connect():
 
 def _javaGateway():
     global _gateway
-    if _gateway is None:
-        _connect()
+    with _gatewayLock:
+        if _gateway is None:
+            _connect()
     return _gateway
 
 
 def _runGateway(_commands, url, addcolor=True):
+    return list(_iterRunGateway(_commands, url, addcolor))
+
+
+def _iterRunGateway(_commands, url, addcolor=True):
+    """
+    Runs a command in the gateway and yields its output lines as the output
+    pages are retrieved, so only one page is held in memory at a time.
+    Leading and trailing blank lines are removed, as in the full output
+    """
+    global _activePages
     commands = list(_commands)
     gc.collect()
     if addcolor:
@@ -50,32 +69,104 @@ def _runGateway(_commands, url, addcolor=True):
     command = " ".join(commands)
     command = command.replace("\r", "")
 
-    strclass = _javaGateway().jvm.String
-    array = _javaGateway().new_array(strclass, len(commands))
-    for i, c in enumerate(commands):
-        array[i] = c
-    start = time.clock()
-    returncode = _javaGateway().entry_point.runCommand(url, array)
-    end = time.clock()
-    diff = end - start
-    log_msg = "Executed " + hidePassword(command) \
-              + " in " + str(diff) + " millisecs"
-    _logger.debug(log_msg)
-    output = [""]
-    page = _javaGateway().entry_point.nextOutputPage()
-    while page is not None:
-        output.append(page)
-        page = _javaGateway().entry_point.nextOutputPage()
-    output = "".join(output)
-    output = output.strip("\r\n").splitlines()
-    output = [s.strip("\r\n") for s in output]
-    if returncode:
-        errormsg = "\n".join(output)
-        _logger.error("Error running command '%s': %s"
-                      % (hidePassword(command), errormsg))
-        raise GeoGigException("\n".join(output))
+    with _gatewayLock:
+        strclass = _javaGateway().jvm.String
+        array = _javaGateway().new_array(strclass, len(commands))
+        for i, c in enumerate(commands):
+            array[i] = c
+        if _activePages is not None:
+            _activePages.detach()
+        start = time.clock()
+        returncode = _javaGateway().entry_point.runCommand(url, array)
+        end = time.clock()
+        diff = end - start
+        log_msg = "Executed " + hidePassword(command) \
+                  + " in " + str(diff) + " millisecs"
+        _logger.debug(log_msg)
+        pages = _OutputPages()
+        _activePages = pages
+    try:
+        if returncode:
+            output = list(_pageLines(pages))
+            errormsg = "\n".join(output)
+            _logger.error("Error running command '%s': %s"
+                          % (hidePassword(command), errormsg))
+            raise GeoGigException("\n".join(output))
+        for line in _pageLines(pages):
+            yield line
+    finally:
+        pages.close()
+
+
+class _OutputPages(object):
+    """
+    The pending output pages of the last command run in the gateway.
+    If another command is run before they are consumed, the remaining pages
+    are detached from the gateway and kept in memory
+    """
 
-    return output
+    def __init__(self):
+        self._detached = None
+
+    def next(self):
+        global _activePages
+        with _gatewayLock:
+            if self._detached is not None:
+                return self._detached.popleft() if self._detached else None
+            page = _javaGateway().entry_point.nextOutputPage()
+            if page is None and _activePages is self:
+                _activePages = None
+            return page
+
+    def detach(self):
+        global _activePages
+        with _gatewayLock:
+            pages = deque()
+            page = _javaGateway().entry_point.nextOutputPage()
+            while page is not None:
+                pages.append(page)
+                page = _javaGateway().entry_point.nextOutputPage()
+            self._detached = pages
+            if _activePages is self:
+                _activePages = None
+
+    def close(self):
+        global _activePages
+        with _gatewayLock:
+            if _activePages is self:
+                page = _javaGateway().entry_point.nextOutputPage()
+                while page is not None:
+                    page = _javaGateway().entry_point.nextOutputPage()
+                _activePages = None
+            self._detached = None
+
+
+def _pageLines(pages):
+    pending = ""
+    blank = 0
+    started = False
+    page = pages.next()
+    while page is not None:
+        lines = (pending + page).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            line = line.strip("\r")
+            if not line:
+                blank += 1
+                continue
+            if started:
+                for i in range(blank):
+                    yield ""
+            started = True
+            blank = 0
+            yield line
+        page = pages.next()
+    pending = pending.strip("\r")
+    if pending:
+        if started:
+            for i in range(blank):
+                yield ""
+        yield pending
 
 
 def hidePassword(command):
@@ -124,10 +215,20 @@ class Py4JConnectionException(Exception):
 
 
 class Py4JCLIConnector(CLIConnector):
-    """A connector that uses a Py4J gateway server to connect to geogig"""
+    """
+    A connector that uses a Py4J gateway server to connect to geogig.
+    It can be used from several threads, but commands sent to the gateway
+    are run one at a time, even from different sessions, since all of them
+    share the same gateway
+    """
 
-    def __init__(self):
-        self.commandslog = []
+    concurrent = False
+
+    def __init__(self, cachesize=DEFAULT_CACHE_SIZE):
+        CLIConnector.__init__(self, cachesize)
+
+    def newsession(self):
+        return Py4JCLIConnector(self.cachesize)
 
     @staticmethod
     def clone(url, dest, username=None, password=None):
@@ -155,16 +256,16 @@ class Py4JCLIConnector(CLIConnector):
             commands = ['config', '--get', param]
             return _runGateway(commands, "dummy")
 
-    def run(self, commands):
+    def _iterexecute(self, commands):
         self.commandslog.append(" ".join(commands))
-        return _runGateway(commands, self.repo.url)
+        return _iterRunGateway(commands, self.repo.url)
 
     def setRepository(self, repo):
         """
         Sets the repository to use when later passing commands to this
         connector using the "run" method
         """
-        self.repo = repo
+        CLIConnector.setRepository(self, repo)
 
     def checkIsAlive(self):
         _connect()
@@ -3,7 +3,12 @@
 import tempfile
 import datetime
 import re
+import os
 import shutil
+import time
+import logging
+from collections import OrderedDict
+from itertools import islice
 
 from geogigpy.commitish import Commitish
 from geogigpy.tag import Tag
@@ -11,9 +16,19 @@ from geogigpy import geogig
 from geogigpy.geogigexception import GeoGigException
 from geogigpy.feature import Feature
 from geogigpy.tree import Tree
-from geogigpy.utils import mkdir
+from geogigpy.utils import mkdir, parallelmap, chunkargs, SHA_MATCHER
 from geogigpy.py4jconnector import Py4JCLIConnector
 from geogigpy.geogigserverconnector import GeoGigServerConnector
+from geogigpy.commitgraph import CommitGraph
+from geogigpy.pathindex import PathIndex
+from geogigpy.cliconnector import DEFAULT_INSERT_BATCH_SIZE
+from geogigpy.table import FeatureTable, checknumpy, numpy
+from geogigpy.spatialindex import SpatialIndex, cachedindex
+from geogigpy.transaction import EditTransaction
+from geogigpy.treediff import TreeDiffChunk, DEFAULT_DIFF_CHUNK_SIZE
+from geogigpy.diff import _diffattributes
+from geogigpy.incremental import SourceLayer, DigestStore, rowdigest,\
+    DIGESTS_FILE
 
 
 def _resolveref(ref):
@@ -32,14 +47,33 @@ def _resolveref(ref):
     else:
         return str(ref)
 
-SHA_MATCHER = re.compile(r"\b([a-f0-9]{40})\b")
+DEFAULT_WORKERS = 4
+
+# Number of commits whose feature versions are requested together by
+# iterversions
+DEFAULT_VERSIONS_CHUNK_SIZE = 1000
+
+EXPORT_SHP = "shp"
+EXPORT_SL = "sl"
+EXPORT_PG = "pg"
+EXPORT_FORMATS = [EXPORT_SHP, EXPORT_SL, EXPORT_PG]
+
+# File extensions imported by importall, and the import method for them
+IMPORT_EXTENSIONS = {".shp": "importshp",
+                     ".geojson": "importgeojson",
+                     ".json": "importgeojson"}
 
 
 class Repository(object):
 
     _logcache = None
+    _commitgraph = None
+    _pathindex = None
+    _lastmodified = None
+    _importdigests = None
 
-    def __init__(self, url, connector=None, init=False, initParams=None):
+    def __init__(self, url, connector=None, init=False, initParams=None,
+                 featurecache=None):
         """
         url: The url of the repository. Only file paths are supported so far.
         Remote repos are not supported
@@ -47,9 +81,13 @@ class Repository(object):
         connector: the connector to use to communicate with the repository
 
         init: True if the repository should be initialized
+
+        featurecache: an optional FeatureCache to keep feature data across
+        processes
         """
         self.url = url
         self.connector = Py4JCLIConnector() if connector is None else connector
+        self.featurecache = featurecache
         if init:
             try:
                 mkdir(url)
@@ -105,12 +143,77 @@ class Repository(object):
         return ''
 
     def revparse(self, rev):
-        """Returns the SHA-1 of a given element, represented as a string"""
+        """
+        Returns the SHA-1 of a given element, represented as a string.
+        If the commit graph of the repository has been built, revisions like
+        HEAD~2 are resolved with it, without calling geogig
+        """
         if SHA_MATCHER.match(rev) is not None:
             return rev
+        elif (self._commitgraph is not None and ":" not in rev
+                and ("~" in rev or "^" in rev)):
+            return self._commitgraph.resolve(rev)
         else:
             return self.connector.revparse(rev)
 
+    def commitgraph(self, filename=None):
+        """
+        Returns a CommitGraph with the history of all branches, which is
+        built the first time this method is called and updated with new
+        commits afterwards.
+        Once it exists, it is used to resolve parents, ~n/^n navigation and
+        common ancestors locally.
+        If a filename is passed, the graph is loaded from that file if it
+        exists, and saved to it whenever new commits are added
+        """
+        if self._commitgraph is None:
+            if filename is not None and os.path.exists(filename):
+                self._commitgraph = CommitGraph.load(self, filename)
+            else:
+                self._commitgraph = CommitGraph(self)
+        added = self._commitgraph.update()
+        if added and filename is not None:
+            self._commitgraph.save(filename)
+        return self._commitgraph
+
+    def pathindex(self, filename, graphfilename=None):
+        """
+        Returns a PathIndex with the paths changed by each commit of the
+        repository, stored in the passed file. The index is loaded from the
+        file if it exists, and the commits in the commit graph that are not
+        indexed yet are added to it.
+        Once it exists, the history of a path is taken from the index by log,
+        iterlog and versions, instead of walking the whole history with
+        geogig. graphfilename is passed to commitgraph
+        """
+        if self._pathindex is None or self._pathindex.filename != filename:
+            self._pathindex = PathIndex(filename)
+        self._pathindex.update(self.commitgraph(graphfilename))
+        return self._pathindex
+
+    def _indexedlog(self, tip, path, n):
+        """
+        Returns a list with the commits reachable from the passed tip that
+        changed a path, newest first, taken from the path index and the
+        commit graph. Returns None if they cannot be used for that tip
+        """
+        if self._pathindex is None or tip in [geogig.WORK_HEAD,
+                                              geogig.STAGE_HEAD]:
+            return None
+        graph = self._commitgraph
+        commitid = self.revparse(tip)
+        graph.add(commitid)
+        self._pathindex.update(graph)
+        candidates = self._pathindex.commits(path)
+        if not candidates:
+            return []
+        mingeneration = min(graph.generation(c) for c in candidates)
+        reachable = graph.ancestors(commitid, mingeneration)
+        commits = [graph.commit(c) for c in candidates & reachable]
+        commits.sort(key=lambda c: (graph.generation(c.commitid),
+                                    c.committerdate), reverse=True)
+        return commits if n is None else commits[:n]
+
     @property
     def head(self):
         """Returns a Commitish representing the current HEAD"""
@@ -187,6 +290,45 @@ class Repository(object):
             pull = len(log)
         return push, pull
 
+    def parallel(self, func, items, workers=DEFAULT_WORKERS):
+        """
+        Calls func(repo, item) for each of the passed items, using a pool of
+        threads, and returns a list with the results in the same order as
+        the items.
+        This is meant to fan out read-only queries, such as log, features or
+        featuredata calls. Commands are run concurrently by the CLI connector,
+        while the Py4J connector runs them one at a time in its gateway
+        """
+        return parallelmap(lambda item: func(self, item), items, workers)
+
+    def aheadbehind(self, remote=None):
+        """
+        Returns a dict with local branch names as keys and tuples with the
+        number of (ahead, behind) commits between each branch and its
+        tracking branch in the passed remote as values.
+        If no remote is passed, it uses "origin" if it exists, otherwise the
+        first remote available.
+        Tracking branches are compared as last fetched, without connecting
+        to the remote. Branches without a tracking branch are not included.
+        Counts for all branches are computed in one pass over the commit graph
+        """
+        if remote is None:
+            remotes = self.remotes
+            if not remotes:
+                raise GeoGigException("No remotes defined")
+            remote = geogig.ORIGIN if geogig.ORIGIN in remotes \
+                else sorted(remotes.keys())[0]
+        remotebranches = self.connector.remotebranches()
+        pairs = []
+        names = []
+        for name, commitid in self.branches.items():
+            tracking = remotebranches.get(remote + "/" + name)
+            if tracking is not None:
+                names.append(name)
+                pairs.append((commitid, tracking))
+        counts = self.commitgraph().aheadbehind(pairs)
+        return dict(zip(names, counts))
+
     def mergemessage(self):
         """
         Return the merge message if the repo is in a merge operation stopped
@@ -207,6 +349,11 @@ class Repository(object):
         A maximum number of commits can be set using the n parameter
         """
         tip = tip or geogig.HEAD
+        if (path is not None and sincecommit is None and until is None
+                and since is None):
+            commits = self._indexedlog(_resolveref(tip), path, n)
+            if commits is not None:
+                return commits
         b = (path is not None
              or tip != geogig.HEAD
              or n is not None
@@ -227,6 +374,26 @@ class Repository(object):
                                                 path, n)
         return self._logcache
 
+    def iterlog(self, tip=None, sincecommit=None,
+                until=None, since=None, path=None, n=None):
+        """
+        Returns an iterator over the same Commit objects that the log method
+        returns. Commits are parsed as geogig outputs them, so the history is
+        never held in memory, and the geogig process is stopped as soon as
+        the iterator is discarded
+        """
+        tip = tip or geogig.HEAD
+        if (path is not None and sincecommit is None and until is None
+                and since is None):
+            commits = self._indexedlog(_resolveref(tip), path, n)
+            if commits is not None:
+                return iter(commits)
+        return self.connector.iterlog(_resolveref(tip),
+                                      _resolveref(sincecommit),
+                                      _resolveref(until),
+                                      _resolveref(since),
+                                      path, n)
+
     def commitatdate(self, t):
         """
         Returns a Commit corresponding to a given instant, which is passed as
@@ -253,13 +420,74 @@ class Repository(object):
         return [e for e in self.children(ref, path, recursive)
                 if isinstance(e, Tree)]
 
-    def features(self, ref=geogig.HEAD, path=None, recursive=False):
+    def features(self, ref=geogig.HEAD, path=None, recursive=False,
+                 hydrate=False, bbox=None):
         """
         Returns a set of Feature objects with all the features for the passed
-        ref and path
-        """
-        return [e for e in self.children(ref, path, recursive)
-                if isinstance(e, Feature)]
+        ref and path.
+        If a (minx, miny, maxx, maxy) bbox is passed, only the features in
+        the path whose envelope intersects it are returned, using the spatial
+        index of the tree. The recursive parameter is ignored in that case.
+        If hydrate is True, the attributes of all features are fetched in
+        batches before returning them
+        """
+        if bbox is not None:
+            index = self.spatialindex(ref, path)
+            features = [Feature(self, ref, p) for p in index.pathsin(bbox)]
+        else:
+            features = [e for e in self.children(ref, path, recursive)
+                        if isinstance(e, Feature)]
+        if hydrate:
+            self.prefetch(features)
+        return features
+
+    def prefetch(self, features, chunksize=None, workers=1):
+        """
+        Fetches the attributes of the passed Feature objects that have not
+        been queried yet, requesting them in chunks as large as the command
+        line allows, or of the passed size, instead of one feature at a time,
+        and stores them in the features.
+        Chunks can be requested in parallel using several workers.
+        Features that do not exist are left untouched.
+        Returns the passed list of features
+        """
+        byref = {}
+        for feature in features:
+            if feature._values is None:
+                byref.setdefault(_resolveref(feature.ref), []).append(feature)
+        chunks = []
+        for ref, reffeatures in byref.items():
+            if self.featurecache is not None:
+                sha = self.revparse(ref)
+                cached = self.featurecache.getmany(
+                    sha, [f.path for f in reffeatures])
+                for feature in reffeatures:
+                    if feature.path in cached:
+                        feature._setdata(cached[feature.path])
+                reffeatures = [f for f in reffeatures
+                               if f.path not in cached]
+                ref = sha
+            refs = [ref + ":" + f.path for f in reffeatures]
+            start = 0
+            for chunk in chunkargs(refs, ["show", "--raw"],
+                                   maxcount=chunksize):
+                chunks.append((ref, reffeatures[start:start + len(chunk)]))
+                start += len(chunk)
+
+        def fetch(chunk):
+            ref, chunkfeatures = chunk
+            refs = [ref + ":" + f.path for f in chunkfeatures]
+            data = self.connector.existingfeaturesdata(refs)
+            found = dict((f.path, data[r]) for f, r
+                         in zip(chunkfeatures, refs) if data.get(r))
+            for feature in chunkfeatures:
+                if feature.path in found:
+                    feature._setdata(found[feature.path])
+            if self.featurecache is not None and found:
+                self.featurecache.putmany(ref, found)
+
+        parallelmap(fetch, chunks, workers)
+        return features
 
     def children(self, ref=geogig.HEAD, path=None, recursive=False):
         """
@@ -268,6 +496,13 @@ class Repository(object):
         """
         return self.connector.children(_resolveref(ref), path, recursive)
 
+    def iterchildren(self, ref=geogig.HEAD, path=None, recursive=False):
+        """
+        Returns an iterator over the Tree and Feature objects that the
+        children method returns, parsing them as geogig lists them
+        """
+        return self.connector.iterchildren(_resolveref(ref), path, recursive)
+
     @property
     def branches(self):
         """
@@ -322,12 +557,36 @@ class Repository(object):
         """Deletes the passed tag"""
         self.connector.deletetag(name)
 
-    def diff(self, refa=geogig.HEAD, refb=geogig.WORK_HEAD, path=None):
+    def diff(self, refa=geogig.HEAD, refb=geogig.WORK_HEAD, path=None,
+             withdata=False):
         """
         Returns a list of DiffEntry representing the changes between 2 commits.
-        If a path is passed, it only shows changes corresponding to that path
-        """
-        return self.connector.diff(_resolveref(refa), _resolveref(refb), path)
+        If a path is passed, it only shows changes corresponding to that path.
+        If withdata is True, the data of the old and new versions of all
+        changed features is fetched in batches and stored in the entries, so
+        calling their featurediff method does not run any other command
+        """
+        diffs = self.connector.diff(_resolveref(refa), _resolveref(refb), path)
+        if withdata and diffs:
+            refs = []
+            for d in diffs:
+                if d.oldref != geogig.NULL_ID:
+                    refs.append(d.oldcommitref + ":" + d.path)
+                if d.newref != geogig.NULL_ID:
+                    refs.append(d.newcommitref + ":" + d.path)
+            data = self.connector.existingfeaturesdata(refs)
+            for d in diffs:
+                d.setdata(data.get(d.oldcommitref + ":" + d.path),
+                          data.get(d.newcommitref + ":" + d.path))
+        return diffs
+
+    def iterdiff(self, refa=geogig.HEAD, refb=geogig.WORK_HEAD, path=None):
+        """
+        Returns an iterator over the DiffEntry objects that the diff method
+        returns, parsing them as geogig outputs them
+        """
+        return self.connector.iterdiff(_resolveref(refa), _resolveref(refb),
+                                       path)
 
     def difftreestats(self, refa=geogig.HEAD, refb=geogig.WORK_HEAD):
         """
@@ -355,6 +614,32 @@ class Repository(object):
         return self.connector.treediff(path, _resolveref(refa),
                                        _resolveref(refb))
 
+    def itertreediff(self, path, refa=geogig.HEAD, refb=geogig.WORK_HEAD,
+                     chunksize=DEFAULT_DIFF_CHUNK_SIZE):
+        """
+        Yields the features changed in a tree between the specified refs as
+        TreeDiffChunk objects, each of them with the changes of up to
+        chunksize features stored by attribute: an array of change types
+        and tables with the old and new values.
+        If chunksize is None, all changes are returned in a single chunk.
+        The output of geogig is read as it is produced, so only a chunk of
+        changes is held in memory at a time.
+        Requires numpy
+        """
+        checknumpy()
+        refa = _resolveref(refa)
+        refb = _resolveref(refb)
+        attribs = self.connector.difftypes(path, refa, refb)
+        convert = self.connector.valuefromstring
+        features = []
+        for feature in self.connector.iterdescribe(path, refa, refb):
+            features.append(feature)
+            if len(features) == chunksize:
+                yield TreeDiffChunk.fromraw(features, attribs, convert)
+                features = []
+        if features:
+            yield TreeDiffChunk.fromraw(features, attribs, convert)
+
     def unstaged(self):
         """
         Returns a list of diffEntry with the differences between staging area
@@ -461,6 +746,76 @@ class Repository(object):
         """
         return self.connector.blame(path)
 
+    def lastmodified(self, ref=geogig.HEAD, path=None):
+        """
+        Returns a dict with paths as keys and the last Commit that changed
+        each of them, as of the passed ref, as values.
+        If no path is passed, it contains all the trees of the ref, at any
+        depth. If a tree path is passed, it contains that tree and all the
+        features and trees under it.
+        If the path index has been built, all paths are resolved in a single
+        walk over the indexed history, newest first, that stops when all of
+        them have been found. Otherwise, the last commit of each path is
+        requested to geogig with a single rev-list call, so building the
+        index is recommended when features are requested.
+        Results are cached until the ref points to a different commit
+        """
+        sha = self.revparse(_resolveref(ref))
+        if self._lastmodified is None or self._lastmodified[0] != sha:
+            self._lastmodified = (sha, {})
+        cache = self._lastmodified[1]
+        if path not in cache:
+            cache[path] = self._findlastmodified(sha, path)
+        return dict(cache[path])
+
+    def treeauthors(self, ref=geogig.HEAD):
+        """
+        Returns a dict with the paths of all the trees of the passed ref as
+        keys and the name of the last person that edited each of them as
+        values
+        """
+        return dict((path, commit.authorname) for path, commit
+                    in self.lastmodified(ref).items())
+
+    def _findlastmodified(self, sha, path):
+        if path is None:
+            # recursive listings only contain features, so nested trees are
+            # taken from their paths
+            targets = set(tree.path for tree in self._trees(sha))
+            for featurepath, objectid in self.connector.iterfeatureids(sha):
+                tokens = featurepath.split("/")
+                targets.update("/".join(tokens[:i])
+                               for i in range(1, len(tokens)))
+        else:
+            targets = set([path.strip("/")])
+            for featurepath, objectid in self.connector.iterfeatureids(sha,
+                                                                       path):
+                tokens = featurepath.split("/")
+                targets.update("/".join(tokens[:i])
+                               for i in range(1, len(tokens) + 1))
+        found = {}
+        if not targets:
+            return found
+        if self._pathindex is None:
+            for target in sorted(targets):
+                for commit in self.connector.log(sha, path=target, n=1):
+                    found[target] = commit
+            return found
+        graph = self._commitgraph
+        graph.add(sha)
+        self._pathindex.update(graph)
+        for commitid in graph.iterancestors(sha):
+            changed = self._pathindex.paths(commitid)
+            matched = targets.intersection(changed)
+            if matched:
+                commit = graph.commit(commitid)
+                for changedpath in matched:
+                    found[changedpath] = commit
+                targets.difference_update(matched)
+                if not targets:
+                    break
+        return found
+
     def count(self, ref, path):
         """Returns the count of objects in a given path"""
         output = self.show(_resolveref(ref) + ":" + path)
@@ -476,13 +831,67 @@ class Repository(object):
         names as keys and tuples of (attribute_value, attribute_type_name)
         as values.
         Values are converted to appropriate types when possible, otherwise they
-        are stored as the string representation of the attribute
+        are stored as the string representation of the attribute.
+        If the repository has a feature cache, data is taken from it when
+        available
         """
-        data = self.connector.featuredata(_resolveref(ref), path)
+        ref = _resolveref(ref)
+        if self.featurecache is None:
+            data = self.connector.featuredata(ref, path)
+        else:
+            sha = self.revparse(ref)
+            data = self.featurecache.get(sha, path)
+            if data is None:
+                data = self.connector.featuredata(sha, path)
+                if data:
+                    self.featurecache.put(sha, path, data)
         if len(data) == 0:
             raise GeoGigException("The specified feature does not exist")
         return data
 
+    def featuretable(self, ref=geogig.HEAD, path=None, chunksize=None,
+                     workers=1):
+        """
+        Returns a FeatureTable with the attributes of all the features under
+        the passed ref and path, stored as a column for each attribute.
+        Feature data is requested in chunks as large as the command line
+        allows, or of the passed size, that can be fetched in parallel using
+        several workers.
+        Requires numpy
+        """
+        checknumpy()
+        ref = self.revparse(_resolveref(ref))
+        paths = [f.path for f in self.features(ref, path)]
+        refs = [ref + ":" + p for p in paths]
+        chunks = list(chunkargs(refs, ["show", "--raw"], maxcount=chunksize))
+
+        def fetch(repo, chunk):
+            return list(repo.connector.iterfeaturesraw(chunk))
+
+        prefix = len(ref) + 1
+        rows = ((name[prefix:], lines)
+                for chunk in self.parallel(fetch, chunks, workers)
+                for name, lines in chunk)
+        return FeatureTable.fromraw(rows, self.connector.valuefromstring)
+
+    def spatialindex(self, ref, path, workers=1):
+        """
+        Returns a SpatialIndex with the envelopes of the geometries of the
+        features in the passed path. The ref is resolved to a commit id, and
+        indexes are cached for each commit and path, so the geometries of a
+        tree are only fetched once.
+        Requires numpy
+        """
+        sha = self.revparse(_resolveref(ref))
+
+        def build():
+            table = self.featuretable(sha, path, workers=workers)
+            if table.geometryname() is None:
+                return SpatialIndex([], numpy.zeros((0, 4)))
+            return SpatialIndex(table.paths, table.geometries().envelopes())
+
+        return cachedindex((self.url, sha, path), build)
+
     def featuretype(self, ref, tree):
         """
         Returns the featuretype of a tree as a dict in the
@@ -490,24 +899,54 @@ class Repository(object):
         """
         return self.connector.featuretype(ref, tree)
 
-    def versions(self, path):
+    def versions(self, path, chunksize=None, skipunchanged=False,
+                 deltas=False):
         """
         Returns all versions os a given feature.
-        It returns a dict with Commit objects as keys, and feature data for
-        the corresponding commit as values.
+        It returns a list of tuples with Commit objects and feature data for
+        the corresponding commit, newest first.
         Feature data is another dict with attributes names as keys and tuples
         of (attribute_value, attribute_type_name) as values.
         Values are converted to appropriate types when possible,
-        otherwise they are stored as the string representation of the attribute
-        """
-        entries = self.log(geogig.HEAD, path=path)
-        refs = [entry.ref + ":" + path for entry in entries]
-        versions = []
-        if refs:
-            features = self.connector.featuresdata(refs)
-            for entry, ref in zip(entries, refs):
-                versions.append((entry, features[ref]))
-        return versions
+        otherwise they are stored as the string representation of the attribute.
+        See iterversions for the rest of parameters
+        """
+        return list(self.iterversions(path, chunksize, skipunchanged, deltas))
+
+    def iterversions(self, path, chunksize=None, skipunchanged=False,
+                     deltas=False):
+        """
+        Returns an iterator over the versions of a feature, as tuples of
+        (commit, data), newest first. The history of the feature is read as
+        it is consumed, and data is requested in chunks of the passed number
+        of commits, or as large as the command line allows.
+        Data is None for commits where the feature was deleted, which geogig
+        reports as a ref that does not resolve. Any other error is raised.
+        If skipunchanged is True, consecutive commits where the feature
+        object is the same are reported once, with the oldest of them,
+        which is the one that created that version.
+        If deltas is True, data is a dict with the attributes that changed
+        from the previous version, in the form returned by featurediff
+        """
+        log = self.iterlog(geogig.HEAD, path=path)
+        chunksize = chunksize or DEFAULT_VERSIONS_CHUNK_SIZE
+        pending = None
+        while True:
+            commits = list(islice(log, chunksize))
+            if not commits:
+                break
+            refs = [commit.commitid + ":" + path for commit in commits]
+            objects = self.connector.existingfeatureobjects(refs)
+            for commit, ref in zip(commits, refs):
+                objectid, lines = objects.get(ref, (None, None))
+                if pending is not None:
+                    if skipunchanged and pending[1] == objectid:
+                        pending = (commit, objectid, pending[2])
+                        continue
+                    yield _version(pending, lines, deltas, self.connector)
+                pending = (commit, objectid, lines)
+        if pending is not None:
+            yield _version(pending, None, deltas, self.connector)
 
     def featurediff(self, ref, ref2, path):
         """
@@ -522,6 +961,27 @@ class Repository(object):
         return self.connector.featurediff(_resolveref(ref),
                                           _resolveref(ref2), path)
 
+    def featurediffs(self, ref, ref2, paths):
+        """
+        Returns an OrderedDict with the passed feature paths as keys and
+        dicts of changed attributes, as returned by featurediff, as values.
+        The data of both versions of all features is fetched in batches,
+        instead of running two commands for each feature
+        """
+        return self.connector.featurediffs(self._commitref(ref),
+                                           self._commitref(ref2), paths)
+
+    def _commitref(self, ref):
+        """
+        Returns the id of the commit a ref points to, so command results
+        can be cached, or the ref itself if it is the working tree or the
+        staging area
+        """
+        ref = _resolveref(ref)
+        if ref in [geogig.WORK_HEAD, geogig.STAGE_HEAD]:
+            return ref
+        return self.revparse(ref)
+
     def reset(self, ref, mode=geogig.RESET_MODE_HARD, path=None):
         """Resets the current branch to the passed reference"""
         self.connector.reset(ref, mode, path)
@@ -539,23 +999,312 @@ class Repository(object):
         self.connector.exportpg(_resolveref(ref), path, table, database, user,
                                 password, schema, host, port, overwrite)
 
+    def exportall(self, ref=geogig.HEAD, target=None, trees=None,
+                  workers=DEFAULT_WORKERS, format=EXPORT_SHP, **kwargs):
+        """
+        Exports several trees at once, each of them through its own
+        connector session, using a pool of workers.
+
+        format can be EXPORT_SHP, EXPORT_SL or EXPORT_PG:
+
+        - For shapefiles, target is a folder, and each tree is exported to a
+          shapefile named after its path
+        - For SpatiaLite, target is the database file. Since all trees are
+          written to the same file, they are exported one at a time
+        - For PostGIS, target is the database name, and each tree is exported
+          to a table named after its path. The user, password, schema, host,
+          port and overwrite arguments are passed to exportpg
+
+        If no trees are passed, all trees at the root of the ref are
+        exported. The ref is resolved once, so all trees are exported from
+        the same commit.
+        Connectors that cannot run commands concurrently, such as the Py4J
+        one, export the trees one at a time.
+
+        A failure exporting a tree does not stop the others. Returns an
+        OrderedDict with tree paths as keys and tuples of
+        (seconds, exception) as values, with None as exception for the trees
+        that were exported
+        """
+        if format not in EXPORT_FORMATS:
+            raise GeoGigException("Unknown export format: " + str(format))
+        if not target:
+            raise GeoGigException("No export target was passed")
+        ref = self.revparse(_resolveref(ref))
+        if trees is None:
+            trees = [t.path for t in self._trees(ref)]
+        if format == EXPORT_SHP:
+            mkdir(target)
+        if format == EXPORT_SL or not self.connector.concurrent:
+            workers = 1
+
+        def export(path):
+            connector = self.connector.newsession()
+            connector.setRepository(self)
+            name = path.replace("/", "_")
+            start = time.time()
+            error = None
+            try:
+                if format == EXPORT_SHP:
+                    shapefile = os.path.join(target, name + ".shp")
+                    connector.exportshp(ref, path, shapefile)
+                elif format == EXPORT_SL:
+                    connector.exportsl(ref, path, target, kwargs.get("user"),
+                                       name)
+                else:
+                    connector.exportpg(ref, path, name, target,
+                                       kwargs.get("user"),
+                                       kwargs.get("password"),
+                                       kwargs.get("schema"),
+                                       kwargs.get("host"), kwargs.get("port"),
+                                       kwargs.get("overwrite", False))
+            except Exception as e:
+                logging.error("Error exporting %s: %s" % (path, e))
+                error = e
+            elapsed = time.time() - start
+            if error is None:
+                logging.info("Exported %s in %.2f s" % (path, elapsed))
+            return elapsed, error
+
+        results = parallelmap(export, trees, workers)
+        return OrderedDict(zip(trees, results))
+
+    def importall(self, files, message=None, workers=DEFAULT_WORKERS,
+                  idAttribute=None, force=False):
+        """
+        Imports a set of shapefiles and GeoJSON files, passed as a list of
+        files or as a folder, each of them into a tree named after the file.
+        Imported trees are added to the staging area and committed together
+        with the passed message. If message is False, they are not committed.
+
+        With several workers, files are split among them and each worker
+        imports its files into its own temporary repository. Trees are then
+        fetched from those repositories and checked out into this one.
+        With a single worker, or if the connector cannot run commands
+        concurrently, as happens with the Py4J one, files are imported
+        directly into this repository, one after another.
+
+        Returns an OrderedDict with files as keys and tuples of
+        (tree, number of features, seconds) as values
+        """
+        if isinstance(files, str):
+            folder = files
+            files = [os.path.join(folder, f) for f in sorted(os.listdir(folder))
+                     if os.path.splitext(f)[1].lower() in IMPORT_EXTENSIONS]
+        dests = [_filetree(f) for f in files]
+        if len(set(dests)) < len(dests):
+            raise GeoGigException("Several files would be imported into the "
+                                  "same tree")
+        if workers <= 1 or len(files) <= 1 or not self.connector.concurrent:
+            results = [_importfile(self, f, dest, idAttribute, force)
+                       for f, dest in zip(files, dests)]
+        else:
+            results = self._importstaged(files, dests, workers, idAttribute,
+                                         force)
+        if files:
+            self.add(dests)
+            if message is not False:
+                self.commit(message or "Imported %i files" % len(files))
+        return OrderedDict(zip(files, results))
+
+    def _importstaged(self, files, dests, workers, idAttribute, force):
+        groups = [list(range(i, len(files), workers))
+                  for i in range(min(workers, len(files)))]
+        config = {}
+        for param in [geogig.USER_NAME, geogig.USER_EMAIL]:
+            try:
+                config[param] = self.getconfig(param)
+            except GeoGigException:
+                pass
+        folders = [tempfile.mkdtemp() for group in groups]
+        try:
+            def stage(args):
+                folder, group = args
+                staging = Repository(folder, self.connector.newsession(),
+                                     init=True)
+                for param, value in config.items():
+                    if value:
+                        staging.config(param, value)
+                results = [_importfile(staging, files[i], dests[i],
+                                       idAttribute, force) for i in group]
+                staging.addandcommit("Imported %i files" % len(group))
+                return results
+
+            staged = parallelmap(stage, list(zip(folders, groups)), workers)
+            results = [None] * len(files)
+            for folder, group, groupresults in zip(folders, groups, staged):
+                remote = "import-" + os.path.basename(folder)
+                self.addremote(remote, folder)
+                try:
+                    self.fetch(remote)
+                    self.checkout("refs/remotes/%s/master" % remote,
+                                  [dests[i] for i in group])
+                finally:
+                    self.removeremote(remote)
+                for i, result in zip(group, groupresults):
+                    results[i] = result
+            return results
+        finally:
+            for folder in folders:
+                shutil.rmtree(folder, ignore_errors=True)
+
     def importgeojson(self, geojsonfile, add=False, dest=None,
-                      idAttribute=None, geomName=None, force=False):
+                      idAttribute=None, geomName=None, force=False,
+                      incremental=False):
+        """
+        Imports a GeoJSON file. If incremental is True, only the features
+        that have changed are written. See importincremental
+        """
+        if incremental:
+            dest = dest or _filetree(geojsonfile)
+            source = SourceLayer(geojsonfile, None, idAttribute,
+                                 geomName or "geometry")
+            return self.importincremental(
+                dest, lambda c, a: c.importgeojson(geojsonfile, a, dest,
+                                                   idAttribute, geomName,
+                                                   force),
+                source, add)
         self.connector.importgeojson(geojsonfile, add, dest,
                                      idAttribute, geomName, force)
 
     def importshp(self, shpfile, add=False, dest=None,
-                  idAttribute=None, force=False):
+                  idAttribute=None, force=False, incremental=False):
+        """
+        Imports a shapefile. If incremental is True, only the features that
+        have changed are written. See importincremental
+        """
+        if incremental:
+            dest = dest or _filetree(shpfile)
+            source = SourceLayer(shpfile, None, idAttribute, "the_geom")
+            return self.importincremental(
+                dest, lambda c, a: c.importshp(shpfile, a, dest,
+                                               idAttribute, force),
+                source, add)
         self.connector.importshp(shpfile, add, dest, idAttribute, force)
 
     def importpg(self, database, user=None, password=None, table=None,
                  schema=None, host=None, port=None, add=False, dest=None,
-                 force=False, idAttribute=None):
+                 force=False, idAttribute=None, incremental=False):
+        """
+        Imports a PostGIS table, or all tables if no table is passed.
+        If incremental is True, only the features that have changed are
+        written. See importincremental. Incremental imports need a table
+        """
+        if incremental:
+            if table is None:
+                raise GeoGigException("Incremental imports need a table")
+            dest = dest or table
+            params = [("dbname", database), ("user", user),
+                      ("password", password), ("host", host), ("port", port)]
+            connstring = "PG:" + " ".join("%s='%s'" % (k, v)
+                                          for k, v in params if v is not None)
+            layer = table if schema is None else schema + "." + table
+            source = SourceLayer(connstring, layer, idAttribute)
+            return self.importincremental(
+                dest, lambda c, a: c.importpg(database, user, password, table,
+                                              schema, host, port, a, dest,
+                                              force, idAttribute),
+                source, add)
         self.connector.importpg(database, user, password, table, schema,
                                 host, port, add, dest, force, idAttribute)
 
-    def importsl(self, database, table, add=False, dest=None):
-        self.connector.importsl(database, table, add, dest)
+    def importsl(self, database, table, add=False, dest=None,
+                 idAttribute=None, incremental=False):
+        """
+        Imports a SpatiaLite table. If incremental is True, only the
+        features that have changed are written. See importincremental
+        """
+        if incremental:
+            dest = dest or table
+            source = SourceLayer(database, table, idAttribute)
+            return self.importincremental(
+                dest, lambda c, a: c.importsl(database, table, a, dest,
+                                              idAttribute),
+                source, add)
+        self.connector.importsl(database, table, add, dest, idAttribute)
+
+    def featureids(self, ref=geogig.HEAD, path=None):
+        """
+        Returns a dict with the paths of all the features under the passed
+        ref and path as keys and their object ids as values.
+        Object ids are hashes of the feature contents, so two features with
+        the same id have the same attribute values
+        """
+        return dict(self.connector.iterfeatureids(_resolveref(ref), path))
+
+    def importdigests(self):
+        """
+        Returns the DigestStore where incremental imports keep the digests
+        of the imported source rows, in the .geogig folder of the repository
+        """
+        if self._importdigests is None:
+            self._importdigests = DigestStore(
+                os.path.join(self.url, ".geogig", DIGESTS_FILE))
+        return self._importdigests
+
+    def importincremental(self, dest, importfunc, source, add=False):
+        """
+        Imports data into the dest tree of the working tree, writing only
+        the features that have changed.
+
+        source is a SourceLayer with the rows to import. A digest of each row
+        is computed and compared with the one stored when the tree was last
+        imported, and only the rows whose digest has changed are inserted,
+        at <dest>/<id>. Features whose rows are no longer in the source are
+        removed, unless add is True.
+
+        The id of the tree after the import is stored with the digests, so
+        they are only used while the tree in the working tree is still the
+        one they describe. If it has changed since, for instance after a
+        reset, a checkout or other edits, the whole source is imported.
+
+        importfunc is called with a connector and the add flag, and must
+        import the whole source into the dest tree using them. It is used
+        instead if the tree does not exist, has not been imported
+        incrementally before, has changed since, or its feature type has
+        changed.
+
+        Returns a tuple with the number of (inserted, removed) features
+        """
+        store = self.importdigests()
+        schema = source.schemadigest()
+        previous = store.digests(dest)
+        treeid = self.connector.treeid(geogig.WORK_HEAD, dest)
+        insync = treeid is not None and store.treeid(dest) == treeid
+        if not insync or not previous or store.schema(dest) != schema:
+            digests = dict((fid, rowdigest(attributes))
+                           for fid, attributes in source)
+            importfunc(self.connector, add)
+            imported = len(digests)
+            if add and insync:
+                previous.update(digests)
+                digests = previous
+            store.replace(dest, schema, digests,
+                          self.connector.treeid(geogig.WORK_HEAD, dest))
+            return imported, 0
+        digests = {}
+
+        def changed():
+            for fid, attributes in source:
+                digest = rowdigest(attributes)
+                digests[fid] = digest
+                if previous.get(fid) != digest:
+                    yield dest + "/" + fid, attributes
+
+        inserted = self.insertfeatures(changed())
+        removed = [] if add else [dest + "/" + fid for fid in previous
+                                  if fid not in digests]
+        if removed:
+            self.removefeatures(removed)
+        logging.info("Incremental import into %s: %i inserted, "
+                     "%i removed, %i unchanged"
+                     % (dest, inserted, len(removed), len(digests) - inserted))
+        if add:
+            previous.update(digests)
+            digests = previous
+        store.replace(dest, schema, digests,
+                      self.connector.treeid(geogig.WORK_HEAD, dest))
+        return inserted, len(removed)
 
     def exportdiffs(self, commit1, commit2, path, filepath,
                     old=False, overwrite=False):
@@ -582,21 +1331,38 @@ class Repository(object):
         """
         self.connector.insertfeatures({path: attributes})
 
-    def insertfeatures(self, features):
+    def insertfeatures(self, features, batchsize=DEFAULT_INSERT_BATCH_SIZE):
         """
         Inserts a set of features into the working tree.
 
         Features are passed in a dict with paths as keys and attributes
-        as values.
+        as values, or as an iterable of (path, attributes) tuples, which is
+        consumed lazily and inserted in batches of the passed size.
         The attributes for each feature are passed in a dict with attribute
         names as keys and attribute values as values.
         There must be one an only one geometry attribute,
         with a Geometry object.
 
         It will overwrite any feature in the same path, so this can be used
-        to add new features or to modify existing ones
+        to add new features or to modify existing ones.
+        Returns the number of features inserted
+        """
+        return self.connector.insertfeatures(features, batchsize)
+
+    def edit(self, message=None):
+        """
+        Returns an EditTransaction to use in a with statement. Inserts,
+        modifications and removals done with it are buffered and sent
+        together when the block exits, and committed with the passed
+        message if there is one. If the block raises an exception, the
+        edits are discarded.
+
+            with repo.edit("Update parks") as tx:
+                tx.insert("parks/6", attributes)
+                tx.modify("parks/1", {"usage": "Private"})
+                tx.remove("parks/2")
         """
-        self.connector.insertfeatures(features)
+        return EditTransaction(self, message)
 
     def removefeatures(self, paths):
         """
@@ -618,6 +1384,11 @@ class Repository(object):
         commitish object.
         Returns None if no common ancestor exists for the passed references
         """
+        if self._commitgraph is not None:
+            commitid = self._commitgraph.commonancestor(
+                self.revparse(_resolveref(refa)),
+                self.revparse(_resolveref(refb)))
+            return None if commitid is None else Commitish(self, commitid)
         return self.connector.commonancestor(refa, refb)
 
     def merge(self, ref, nocommit=False, message=None):
@@ -667,6 +1438,10 @@ class Repository(object):
         """Removes a remote"""
         self.connector.removeremote(name)
 
+    def fetch(self, remote=geogig.ORIGIN):
+        """Fetches the branches of the specified remote"""
+        self.connector.fetch(remote)
+
     def ismerging(self):
         """
         Returns true if the repo is in the middle of a merge stopped due
@@ -796,6 +1571,28 @@ class Repository(object):
         self.connector.init(initParams)
 
 
+def _filetree(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _importfile(repo, filename, dest, idAttribute, force):
+    """
+    Imports a file into a tree of the working tree of the passed repo.
+    Returns a tuple of (tree, number of features, seconds)
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in IMPORT_EXTENSIONS:
+        raise GeoGigException("Cannot import file " + filename)
+    start = time.time()
+    getattr(repo, IMPORT_EXTENSIONS[ext])(filename, False, dest, idAttribute,
+                                          force=force)
+    elapsed = time.time() - start
+    rows = repo.count(geogig.WORK_HEAD, dest)
+    logging.info("Imported %i features from %s in %.2f s"
+                 % (rows, filename, elapsed))
+    return dest, rows, elapsed
+
+
 def isremoteurl(url):
     # This code snippet has been taken from the Django source code
     regex = re.compile(
@@ -807,3 +1604,19 @@ def isremoteurl(url):
         r'(?::\d+)?'  # optional port
         r'(?:/?|[/?]\S+)$', re.IGNORECASE)
     return url is not None and regex.search(url)
+
+
+def _version(version, previouslines, deltas, connector):
+    """
+    Returns the (commit, data) tuple for a version, as yielded by
+    iterversions, given a tuple of (commit, object id, lines) and the lines
+    of the previous version, None if it did not exist
+    """
+    commit, objectid, lines = version
+    data = connector.parseattribs(lines) if lines is not None else None
+    if deltas:
+        previous = None
+        if previouslines is not None:
+            previous = connector.parseattribs(previouslines)
+        data = _diffattributes(previous, data)
+    return commit, data
@@ -0,0 +1,50 @@
+# coding: utf-8
+
+import threading
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+class FeatureSchema(object):
+    """
+    The names and type names of the attributes of a feature, in order.
+
+    Schemas are interned, so all features with the same attributes share a
+    single instance and only store a tuple with their values
+    """
+
+    __slots__ = ("names", "types", "index")
+
+    def __init__(self, names, types):
+        self.names = names
+        self.types = types
+        self.index = dict((name, i) for i, name in enumerate(names))
+
+    @staticmethod
+    def get(names, types):
+        """Returns the shared schema for the passed names and types"""
+        key = (tuple(names), tuple(types))
+        schema = _schemas.get(key)
+        if schema is None:
+            with _lock:
+                schema = _schemas.setdefault(key, FeatureSchema(*key))
+        return schema
+
+    def __len__(self):
+        return len(self.names)
+
+    def __reduce__(self):
+        return (FeatureSchema.get, (self.names, self.types))
+
+
+def splitdata(data):
+    """
+    Takes feature data as a dict with attribute names as keys and tuples of
+    (value, type name) as values, and returns a tuple with the shared schema
+    and a tuple of values
+    """
+    names = tuple(data.keys())
+    values = tuple(v[0] for v in data.values())
+    types = tuple(v[1] for v in data.values())
+    return FeatureSchema.get(names, types), values
@@ -0,0 +1,278 @@
+# coding: utf-8
+
+import os
+import subprocess
+import sys
+import threading
+import logging
+import atexit
+import uuid
+from collections import deque
+
+from geogigpy import console
+from geogigpy.cliconnector import CLIConnector, ERROR_LINES
+from geogigpy.cache import DEFAULT_CACHE_SIZE
+from geogigpy.geogigexception import GeoGigException
+
+# The command used to start a console process. It must read commands from
+# stdin, one per line, and answer frame lines as described in _ShellSession.
+# The stock geogig console does not answer them, so the console shipped in
+# geogigpy.console is used by default
+SHELL_COMMAND = [sys.executable, "-m", "geogigpy.console"]
+
+DEFAULT_POOL_SIZE = 2
+
+FRAME_PREFIX = console.FRAME_PREFIX
+
+# Seconds to wait for a new console to answer its first frame line
+STARTUP_TIMEOUT = 60
+
+# The folder that contains the geogigpy package, added to the python path of
+# consoles so the default one can be started even if it is not installed
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(
+    console.__file__)))
+
+_pools = {}
+_poolslock = threading.Lock()
+
+
+def _quote(arg):
+    if (arg == "" or any(c.isspace() for c in arg)) \
+            and not (arg.startswith('"') and arg.endswith('"')):
+        return '"%s"' % arg.replace('"', '\\"')
+    return arg
+
+
+class _ShellSession(object):
+    """
+    A long-lived geogig console process bound to a repository folder.
+
+    Each command is written to the process stdin followed by a line with a
+    unique frame token. The console is expected to answer that line by
+    printing a line that starts with the token, optionally followed by the
+    exit status of the previous command. Everything printed before it is
+    the output of the command.
+
+    The stock geogig console does not answer frame lines, so the command
+    must start a console that does, such as geogigpy.console. A frame line
+    is sent when the session starts, and a GeoGigException is raised if it
+    is not answered within STARTUP_TIMEOUT seconds, instead of waiting
+    forever for the output of the first command
+    """
+
+    def __init__(self, command, cwd):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [_PACKAGE_PARENT] + [p for p in [env.get("PYTHONPATH")] if p])
+        self.proc = subprocess.Popen(command, cwd=cwd, env=env,
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT,
+                                     universal_newlines=True, bufsize=1)
+        self._count = 0
+        self._token = FRAME_PREFIX + uuid.uuid4().hex
+        self._handshake(command)
+
+    def _handshake(self, command):
+        """
+        Sends a first frame line and waits for the console to answer it,
+        skipping anything printed at startup, such as a banner
+        """
+        token = "%s-%i" % (self._token, self._count)
+        answered = []
+
+        def read():
+            for line in iter(self.proc.stdout.readline, ""):
+                if line.startswith(token):
+                    answered.append(line)
+                    return
+
+        try:
+            self.proc.stdin.write(token + "\n")
+            self.proc.stdin.flush()
+        except (IOError, OSError):
+            pass
+        reader = threading.Thread(target=read)
+        reader.daemon = True
+        reader.start()
+        reader.join(STARTUP_TIMEOUT)
+        if not answered:
+            if self.alive:
+                self.proc.kill()
+            self.proc.wait()
+            reader.join()
+            self.proc.stdout.close()
+            raise GeoGigException(
+                "The console started with '%s' did not answer the frame "
+                "line sent to it. The shell connector needs a console "
+                "that prints each line starting with %s that it receives, "
+                "followed by the exit status of the previous command, such "
+                "as geogigpy.console" % (" ".join(command), FRAME_PREFIX))
+
+    @property
+    def alive(self):
+        return self.proc.poll() is None
+
+    def iterrun(self, commands, addcolor=True):
+        """
+        Sends a command to the console and yields its output lines as they
+        arrive. If the consumer stops iterating, the rest of the output is
+        discarded, so the session can be used for the next command
+        """
+        commands = list(commands)
+        if addcolor:
+            commands.extend(["--color", "never"])
+        commandstr = " ".join(commands)
+        self._count += 1
+        token = "%s-%i" % (self._token, self._count)
+        try:
+            self.proc.stdin.write(" ".join(_quote(c) for c in commands)
+                                  + "\n" + token + "\n")
+            self.proc.stdin.flush()
+        except (IOError, OSError) as e:
+            raise GeoGigException("geogig console is not running: "
+                                  + str(e))
+        head = []
+        tail = deque(maxlen=ERROR_LINES)
+        lines = iter(self.proc.stdout.readline, "")
+        returncode = None
+        try:
+            for line in lines:
+                line = line.strip("\r\n")
+                if line.startswith(token):
+                    tokens = line[len(token):].split()
+                    returncode = int(tokens[0]) if tokens else 0
+                    break
+                if len(head) < 5:
+                    head.append(line)
+                tail.append(line)
+                yield line
+        finally:
+            if returncode is None:
+                for line in lines:
+                    if line.startswith(token):
+                        break
+                else:
+                    self.close()
+        if returncode is None:
+            raise GeoGigException("geogig console exited while running "
+                                  + commandstr + "\n" + "\n".join(tail))
+        if returncode:
+            logging.error("Error running " + commandstr + "\n"
+                          + " ".join(tail))
+            raise GeoGigException("\n".join(tail))
+        logging.info("Executed " + commandstr + "\n" + " ".join(head))
+
+    def close(self):
+        if self.alive:
+            try:
+                self.proc.stdin.close()
+            except (IOError, OSError):
+                pass
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        self.proc.stdout.close()
+
+
+class _SessionPool(object):
+    """A bounded pool of console sessions for a single repository"""
+
+    def __init__(self, command, cwd, size):
+        self.command = command
+        self.cwd = cwd
+        self.size = size
+        self._idle = []
+        self._opened = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                while self._idle:
+                    session = self._idle.pop()
+                    if session.alive:
+                        return session
+                    self._opened -= 1
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                self._cond.wait()
+        try:
+            return _ShellSession(self.command, self.cwd)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, session):
+        with self._cond:
+            if session.alive:
+                self._idle.append(session)
+            else:
+                self._opened -= 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for session in idle:
+            session.close()
+
+
+def _pool(command, url, size):
+    key = (tuple(command), url)
+    with _poolslock:
+        if key not in _pools:
+            _pools[key] = _SessionPool(command, url, size)
+        return _pools[key]
+
+
+def closeall():
+    """Closes all idle console sessions kept by shell connectors"""
+    with _poolslock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+atexit.register(closeall)
+
+
+class ShellConnector(CLIConnector):
+    """
+    A connector that keeps a pool of long-lived console processes for each
+    repository and feeds commands to them.
+    The console command must answer frame lines to delimit the output of
+    each command (see _ShellSession). By default, the console in
+    geogigpy.console is used, which runs each command with the geogig
+    executable. A console that keeps geogig loaded between commands and
+    answers frame lines can be passed instead, to avoid starting a new
+    geogig process for each command
+    """
+
+    def __init__(self, command=None, poolsize=DEFAULT_POOL_SIZE,
+                 cachesize=DEFAULT_CACHE_SIZE):
+        CLIConnector.__init__(self, cachesize)
+        self.command = list(command or SHELL_COMMAND)
+        self.poolsize = poolsize
+
+    def _iterexecute(self, commands):
+        self.commandslog.append(" ".join(commands))
+        pool = _pool(self.command, self.repo.url, self.poolsize)
+        session = pool.acquire()
+        try:
+            for line in session.iterrun(commands):
+                yield line
+        finally:
+            pool.release(session)
+
+    def newsession(self):
+        return ShellConnector(self.command, self.poolsize, self.cachesize)
+
+    def close(self):
+        """Closes the idle console sessions open for this repository"""
+        _pool(self.command, self.repo.url, self.poolsize).close()
@@ -0,0 +1,157 @@
+# coding: utf-8
+
+import math
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from geogigpy.geogigexception import GeoGigException
+
+# Number of indexes kept in memory by the index cache
+MAX_CACHED_INDEXES = 16
+
+# Features covering more cells than this are not registered in the grid,
+# but checked in every query
+MAX_FEATURE_CELLS = 64
+
+
+class SpatialIndex(object):
+
+    """
+    A grid index over the envelopes of a set of features.
+    Each feature is registered in the cells of a regular grid that its
+    envelope overlaps, so a query only has to check the features in the
+    cells that overlap the query box
+    """
+
+    def __init__(self, paths, envelopes, cellsize=None):
+        """
+        paths: a list with the paths of the features
+
+        envelopes: a (n, 4) array with the (minx, miny, maxx, maxy)
+        envelope of each feature. Features with NaN envelopes are skipped
+
+        cellsize: the size of the grid cells. If not passed, it is chosen
+        so there is about one feature per cell
+        """
+        if numpy is None:
+            raise GeoGigException("numpy is required for spatial indexes")
+        envelopes = numpy.asarray(envelopes, dtype=numpy.float64)
+        valid = ~numpy.isnan(envelopes).any(axis=1)
+        self.paths = numpy.empty(int(valid.sum()), dtype=object)
+        self.paths[:] = [p for p, v in zip(paths, valid) if v]
+        self.envelopes = envelopes[valid]
+        n = len(self.paths)
+        if n:
+            self.extent = (self.envelopes[:, :2].min(axis=0).tolist()
+                           + self.envelopes[:, 2:].max(axis=0).tolist())
+        else:
+            self.extent = [0.0, 0.0, 0.0, 0.0]
+        width = self.extent[2] - self.extent[0]
+        height = self.extent[3] - self.extent[1]
+        if cellsize is None:
+            area = width * height
+            if area:
+                cellsize = math.sqrt(area / n)
+            else:
+                cellsize = max(width, height) / max(n, 1)
+            cellsize = cellsize or 1.0
+            # skewed extents would otherwise need a huge number of cells
+            while (int(width / cellsize) + 1) * (int(height / cellsize) + 1) \
+                    > 4 * max(n, 1):
+                cellsize *= 2
+        self.cellsize = cellsize
+        self.cols = int(width / self.cellsize) + 1
+        self.rows = int(height / self.cellsize) + 1
+        self._build()
+
+    def _cellranges(self, envelopes):
+        origin = numpy.array(self.extent[:2] * 2)
+        cells = numpy.floor((envelopes - origin) / self.cellsize)
+        limits = numpy.array([self.cols, self.rows] * 2) - 1
+        return numpy.clip(cells, 0, limits).astype(numpy.int64)
+
+    def _build(self):
+        ranges = self._cellranges(self.envelopes)
+        spans = ((ranges[:, 2] - ranges[:, 0] + 1)
+                 * (ranges[:, 3] - ranges[:, 1] + 1))
+        single = numpy.flatnonzero(spans == 1)
+        cellids = [ranges[single, 1] * self.cols + ranges[single, 0]]
+        ids = [single]
+        multi = numpy.flatnonzero((spans > 1) & (spans <= MAX_FEATURE_CELLS))
+        for i in multi:
+            x0, y0, x1, y1 = ranges[i]
+            xs, ys = numpy.meshgrid(numpy.arange(x0, x1 + 1),
+                                    numpy.arange(y0, y1 + 1))
+            cellids.append((ys * self.cols + xs).ravel())
+            ids.append(numpy.full(xs.size, i, dtype=numpy.int64))
+        self.overflow = numpy.flatnonzero(spans > MAX_FEATURE_CELLS)
+        cellids = numpy.concatenate(cellids)
+        ids = numpy.concatenate(ids)
+        order = numpy.argsort(cellids, kind="stable")
+        self.ids = ids[order]
+        counts = numpy.bincount(cellids, minlength=self.cols * self.rows)
+        self.cellstarts = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=self.cellstarts[1:])
+
+    def __len__(self):
+        return len(self.paths)
+
+    def query(self, bbox):
+        """
+        Returns an array with the indices of the features whose envelope
+        intersects the passed (minx, miny, maxx, maxy) box, sorted
+        """
+        minx, miny, maxx, maxy = bbox
+        if (not len(self) or maxx < self.extent[0] or minx > self.extent[2]
+                or maxy < self.extent[1] or miny > self.extent[3]):
+            return numpy.zeros(0, dtype=numpy.int64)
+        x0, y0, x1, y1 = self._cellranges(numpy.array(bbox, dtype=float))
+        candidates = [self.overflow]
+        for y in range(y0, y1 + 1):
+            start = self.cellstarts[y * self.cols + x0]
+            end = self.cellstarts[y * self.cols + x1 + 1]
+            candidates.append(self.ids[start:end])
+        candidates = numpy.unique(numpy.concatenate(candidates))
+        envelopes = self.envelopes[candidates]
+        hits = ((envelopes[:, 0] <= maxx) & (envelopes[:, 2] >= minx)
+                & (envelopes[:, 1] <= maxy) & (envelopes[:, 3] >= miny))
+        return candidates[hits]
+
+    def pathsin(self, bbox):
+        """
+        Returns a list with the paths of the features whose envelope
+        intersects the passed (minx, miny, maxx, maxy) box
+        """
+        return self.paths[self.query(bbox)].tolist()
+
+
+_cache = OrderedDict()
+_cachelock = threading.Lock()
+
+
+def cachedindex(key, build):
+    """
+    Returns the index stored in the cache for the passed key, creating it
+    with the passed function if it is not there. Keys must contain a commit
+    id instead of a branch name or any other ref that can change
+    """
+    with _cachelock:
+        if key in _cache:
+            _cache[key] = _cache.pop(key)
+            return _cache[key]
+    index = build()
+    with _cachelock:
+        _cache[key] = index
+        while len(_cache) > MAX_CACHED_INDEXES:
+            _cache.popitem(last=False)
+    return index
+
+
+def clearcache():
+    with _cachelock:
+        _cache.clear()
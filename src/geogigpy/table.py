@@ -0,0 +1,197 @@
+# coding: utf-8
+
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from geogigpy import geogig
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.geometry import Geometry
+from geogigpy.wkt import decodeall
+
+NULL = "[NULL]"
+
+# numpy types used for the columns of numeric and boolean attributes, and
+# the values used to fill the null positions in them
+DTYPES = {geogig.TYPE_BYTE: ("int8", 0),
+          geogig.TYPE_SHORT: ("int16", 0),
+          geogig.TYPE_INTEGER: ("int32", 0),
+          geogig.TYPE_LONG: ("int64", 0),
+          geogig.TYPE_FLOAT: ("float32", "nan"),
+          geogig.TYPE_DOUBLE: ("float64", "nan"),
+          geogig.TYPE_BOOLEAN: ("bool", "false")}
+
+
+def checknumpy():
+    if numpy is None:
+        raise GeoGigException("numpy is required to create feature tables")
+
+
+def isgeometrytype(typename):
+    return typename in geogig.GEOMTYPES or len(typename.split(" ")) > 1
+
+
+def tocolumn(values, typename, convert):
+    """
+    Converts a list with the raw string values of an attribute into a
+    tuple of (column, mask) numpy arrays. The mask is True for null values.
+    Numeric and boolean values are converted all at once. If any of them
+    cannot be parsed, the column is created as an object array, converting
+    each value with the passed function, as features do
+    """
+    checknumpy()
+    raw = numpy.array(values, dtype=object)
+    mask = numpy.asarray(raw == NULL, dtype=bool).reshape(len(values))
+    if typename in DTYPES:
+        dtype, fill = DTYPES[typename]
+        filled = numpy.where(mask, fill, raw).astype(str)
+        try:
+            if typename == geogig.TYPE_BOOLEAN:
+                return numpy.char.lower(filled) == "true", mask
+            return filled.astype(dtype), mask
+        except (ValueError, OverflowError):
+            pass
+    column = numpy.empty(len(values), dtype=object)
+    if isgeometrytype(typename):
+        tokens = typename.split(" ")
+        crs = " ".join(tokens[1:]) if len(tokens) > 1 else None
+        for i, value in enumerate(values):
+            if not mask[i]:
+                column[i] = Geometry(value, crs)
+    elif typename in DTYPES:
+        for i, value in enumerate(values):
+            column[i] = convert(value, typename)
+    else:
+        column[:] = raw
+        column[mask] = None
+    return column, mask
+
+
+class FeatureTable(object):
+
+    """
+    The attributes of a set of features, stored as a column for each
+    attribute. Numeric and boolean attributes are stored in numpy arrays of
+    the corresponding type, and the rest in object arrays. Each column has a
+    mask that is True for the features where the attribute is null, or where
+    the feature does not have that attribute
+    """
+
+    def __init__(self, paths, types, columns, masks):
+        self.paths = paths
+        self.types = types
+        self.columns = columns
+        self.masks = masks
+        self._geometries = {}
+
+    @property
+    def names(self):
+        return list(self.columns.keys())
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def mask(self, name):
+        """Returns a boolean array that is True where the attribute is null"""
+        return self.masks[name]
+
+    def masked(self, name):
+        """Returns the column for an attribute as a numpy masked array"""
+        return numpy.ma.masked_array(self.columns[name], self.masks[name])
+
+    def select(self, rows):
+        """
+        Returns a new table with the selected rows. Rows can be passed as a
+        boolean array or as an array of indices
+        """
+        columns = OrderedDict((k, v[rows]) for k, v in self.columns.items())
+        masks = OrderedDict((k, v[rows]) for k, v in self.masks.items())
+        return FeatureTable(self.paths[rows], OrderedDict(self.types),
+                            columns, masks)
+
+    def row(self, i):
+        """
+        Returns the attributes of the feature in the passed row, as a dict
+        with attribute names as keys and attribute values as values
+        """
+        attributes = OrderedDict()
+        for name, column in self.columns.items():
+            value = column[i]
+            if self.masks[name][i]:
+                value = None
+            elif isinstance(value, numpy.generic):
+                value = value.item()
+            attributes[name] = value
+        return attributes
+
+    def geometryname(self):
+        """
+        Returns the name of the first geometry attribute, or None if there
+        is no geometry attribute
+        """
+        for name, typename in self.types.items():
+            if isgeometrytype(typename):
+                return name
+        return None
+
+    def geometries(self, name=None):
+        """
+        Returns a GeometryArrays object with the decoded geometries of the
+        passed attribute, or of the first geometry attribute if no name is
+        passed. Null geometries are decoded as empty ones.
+        Geometries are decoded all at once, and their envelopes are stored
+        in the corresponding Geometry objects
+        """
+        name = name or self.geometryname()
+        if name is None:
+            raise GeoGigException("Table has no geometry attribute")
+        if name not in self._geometries:
+            column = self.columns[name]
+            arrays = decodeall(column)
+            for geom, envelope in zip(column, arrays.envelopes().tolist()):
+                if geom is not None and not numpy.isnan(envelope[0]):
+                    geom._envelope = tuple(envelope)
+            self._geometries[name] = arrays
+        return self._geometries[name]
+
+    def __str__(self):
+        return "FeatureTable(%i features, %s)" % (len(self), self.names)
+
+    @staticmethod
+    def fromraw(rows, convert):
+        """
+        Creates a table from an iterable of (path, lines) tuples, where lines
+        contains the unparsed name, type and value lines of the feature, as
+        returned by the connector
+        """
+        checknumpy()
+        paths = []
+        types = OrderedDict()
+        values = OrderedDict()
+        for path, lines in rows:
+            attributes = {}
+            for i in range(0, len(lines) - 2, 3):
+                name = lines[i]
+                attributes[name] = lines[i + 2]
+                if name not in types:
+                    types[name] = lines[i + 1]
+                    values[name] = [NULL] * len(paths)
+            for name, column in values.items():
+                column.append(attributes.get(name, NULL))
+            paths.append(path)
+        columns = OrderedDict()
+        masks = OrderedDict()
+        for name, raw in values.items():
+            columns[name], masks[name] = tocolumn(raw, types[name], convert)
+        pathsarray = numpy.empty(len(paths), dtype=object)
+        pathsarray[:] = paths
+        return FeatureTable(pathsarray, types, columns, masks)
@@ -0,0 +1,144 @@
+# coding: utf-8
+
+from collections import OrderedDict
+
+from geogigpy import geogig
+from geogigpy.feature import Feature
+from geogigpy.geogigexception import GeoGigException
+
+INSERT = "insert"
+MODIFY = "modify"
+REMOVE = "remove"
+# Removal of a path inserted in the transaction, which may not exist yet
+REMOVE_INSERTED = "removeinserted"
+
+
+class EditTransaction(object):
+
+    """
+    A set of feature edits that are buffered and sent to the repository
+    together, using a single call for each of the insert, rm and add
+    commands, and optionally creating a commit with them.
+
+    It is meant to be used as a context manager, through Repository.edit().
+    Edits are sent when the block exits normally. If it raises an exception,
+    the buffered edits are discarded and the repository is not modified.
+
+    Several edits to the same path are merged, so only the last state of
+    each feature is sent
+    """
+
+    def __init__(self, repo, message=None):
+        self.repo = repo
+        self.message = message
+        self._edits = OrderedDict()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exctype, value, traceback):
+        if exctype is None:
+            self.flush()
+        else:
+            self.rollback()
+        return False
+
+    def __len__(self):
+        return len(self._edits)
+
+    def _checkopen(self):
+        if self._closed:
+            raise GeoGigException("The edit transaction is already closed")
+
+    def insert(self, path, attributes):
+        """
+        Inserts a feature with the passed attributes, replacing any feature
+        in the same path
+        """
+        self._checkopen()
+        self._edits.pop(path, None)
+        self._edits[path] = (INSERT, dict(attributes))
+
+    def modify(self, path, attributes):
+        """
+        Changes the passed attributes of an existing feature, keeping the
+        rest of them. Current attributes of modified features are fetched
+        when the transaction is flushed
+        """
+        self._checkopen()
+        op, current = self._edits.pop(path, (MODIFY, {}))
+        if op in [REMOVE, REMOVE_INSERTED]:
+            self._edits[path] = (op, current)
+            raise GeoGigException("Cannot modify removed feature " + path)
+        current.update(attributes)
+        self._edits[path] = (op, current)
+
+    def remove(self, path):
+        """
+        Removes a feature. If it was inserted in this transaction, the
+        insert is discarded, and the feature is only removed if it already
+        existed in the working tree
+        """
+        self._checkopen()
+        op, current = self._edits.pop(path, (None, None))
+        if op in [INSERT, REMOVE_INSERTED]:
+            self._edits[path] = (REMOVE_INSERTED, None)
+        else:
+            self._edits[path] = (REMOVE, None)
+
+    def rollback(self):
+        """Discards all buffered edits and closes the transaction"""
+        self._edits.clear()
+        self._closed = True
+
+    def flush(self):
+        """
+        Sends the buffered edits to the repository, adds them to the staging
+        area and, if the transaction has a commit message, commits them.
+        Closes the transaction if all edits are sent. If sending them fails,
+        the transaction is left open, so it can be flushed again or rolled
+        back
+        """
+        self._checkopen()
+        if not self._edits:
+            self._closed = True
+            return
+        inserts = OrderedDict()
+        modified = []
+        removed = []
+        inserted = []
+        for path, (op, attributes) in self._edits.items():
+            if op == REMOVE:
+                removed.append(path)
+            elif op == REMOVE_INSERTED:
+                inserted.append(path)
+            else:
+                inserts[path] = attributes
+                if op == MODIFY:
+                    modified.append(path)
+        if modified:
+            features = [Feature(self.repo, geogig.WORK_HEAD, path)
+                        for path in modified]
+            self.repo.prefetch(features)
+            for feature in features:
+                if feature._values is None:
+                    raise GeoGigException("Cannot modify missing feature "
+                                          + feature.path)
+                attributes = feature.attributes
+                attributes.update(inserts[feature.path])
+                inserts[feature.path] = attributes
+        if inserted:
+            refs = [geogig.WORK_HEAD + ":" + path for path in inserted]
+            existing = self.repo.connector.existingfeaturesdata(refs)
+            removed.extend(path for path, ref in zip(inserted, refs)
+                           if ref in existing)
+        if inserts:
+            self.repo.insertfeatures(inserts)
+            self.repo.add(list(inserts.keys()))
+        if removed:
+            self.repo.removefeatures(removed)
+        self._edits.clear()
+        if self.message is not None:
+            self.repo.commit(self.message)
+        self._closed = True
@@ -6,6 +6,8 @@ class Tree(object):
 
     ROOT = None
 
+    __slots__ = ("repo", "ref", "path", "size")
+
     def __init__(self, repo, ref, path=ROOT, size=None):
         self.repo = repo
         self.ref = ref
@@ -20,6 +22,13 @@ class Tree(object):
     def features(self):
         return self.repo.features(self.ref, self.path)
 
+    def featuresin(self, bbox):
+        """
+        Returns the features in this tree whose envelope intersects the
+        passed (minx, miny, maxx, maxy) bbox
+        """
+        return self.repo.features(self.ref, self.path, bbox=bbox)
+
     @property
     def featuretype(self):
         return self.repo.featuretype(self.ref, self.path)
@@ -0,0 +1,106 @@
+# coding: utf-8
+
+from collections import OrderedDict
+
+from geogigpy.diff import ATTRIBUTE_DIFF_MODIFIED, ATTRIBUTE_DIFF_ADDED,\
+    ATTRIBUTE_DIFF_REMOVED, ATTRIBUTE_DIFF_UNCHANGED
+from geogigpy.table import FeatureTable, NULL, checknumpy, numpy, tocolumn
+
+# Number of changed features in each chunk returned by itertreediff
+DEFAULT_DIFF_CHUNK_SIZE = 10000
+
+# Type used for attributes that are not in the feature types of the tree
+DEFAULT_ATTRIBUTE_TYPE = "STRING"
+
+
+class TreeDiffChunk(object):
+
+    """
+    The changes of a set of features between two versions of a tree, stored
+    by attribute.
+
+    codes has an array for each attribute with the change type codes
+    (ATTRIBUTE_DIFF_MODIFIED, ATTRIBUTE_DIFF_ADDED, ATTRIBUTE_DIFF_REMOVED or
+    ATTRIBUTE_DIFF_UNCHANGED) of all features, or an empty string if the
+    feature has no change for the attribute.
+    old and new are FeatureTable objects with the old and new values. Added
+    attributes are null in the old table, and removed ones in the new table
+    """
+
+    def __init__(self, paths, codes, old, new):
+        self.paths = paths
+        self.codes = codes
+        self.old = old
+        self.new = new
+
+    @property
+    def attributes(self):
+        return self.old.types
+
+    def __len__(self):
+        return len(self.paths)
+
+    def changed(self, name):
+        """
+        Returns a boolean array that is True for the features where the
+        passed attribute has changed
+        """
+        codes = self.codes[name]
+        return (codes != ATTRIBUTE_DIFF_UNCHANGED) & (codes != "")
+
+    def changedpaths(self, name):
+        """Returns the paths of the features where an attribute has changed"""
+        return self.paths[self.changed(name)].tolist()
+
+    @staticmethod
+    def fromraw(features, attribs, convert):
+        """
+        Creates a chunk from a list of (path, changes) tuples, as yielded by
+        the connector, with changes being a list of unparsed (change type,
+        attribute, value, new value) tuples. attribs is a dict with the
+        types of the attributes
+        """
+        checknumpy()
+        types = OrderedDict(attribs)
+        n = len(features)
+        codes = OrderedDict()
+        oldvalues = OrderedDict()
+        newvalues = OrderedDict()
+
+        def addattribute(name):
+            types.setdefault(name, DEFAULT_ATTRIBUTE_TYPE)
+            codes[name] = [""] * n
+            oldvalues[name] = [NULL] * n
+            newvalues[name] = [NULL] * n
+
+        for name in types:
+            addattribute(name)
+        for i, (path, changes) in enumerate(features):
+            for changetype, name, value, value2 in changes:
+                if name not in codes:
+                    addattribute(name)
+                codes[name][i] = changetype
+                if changetype == ATTRIBUTE_DIFF_MODIFIED:
+                    oldvalues[name][i] = value
+                    newvalues[name][i] = value2
+                elif changetype == ATTRIBUTE_DIFF_ADDED:
+                    newvalues[name][i] = value
+                elif changetype == ATTRIBUTE_DIFF_REMOVED:
+                    oldvalues[name][i] = value
+                else:
+                    oldvalues[name][i] = value
+                    newvalues[name][i] = value
+        paths = numpy.empty(n, dtype=object)
+        paths[:] = [path for path, changes in features]
+        tables = []
+        for values in [oldvalues, newvalues]:
+            columns = OrderedDict()
+            masks = OrderedDict()
+            for name, raw in values.items():
+                columns[name], masks[name] = tocolumn(raw, types[name],
+                                                      convert)
+            tables.append(FeatureTable(paths, OrderedDict(types), columns,
+                                       masks))
+        codes = OrderedDict((k, numpy.array(v, dtype="U1"))
+                            for k, v in codes.items())
+        return TreeDiffChunk(paths, codes, tables[0], tables[1])
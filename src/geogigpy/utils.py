@@ -1,8 +1,24 @@
 # coding: utf-8
 
 import os
+import re
 import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+SHA_MATCHER = re.compile(r"\b([a-f0-9]{40})\b")
+
+# Commands are run through a shell, which gets the whole command line as a
+# single argument, so on Linux it cannot be longer than MAX_ARG_STRLEN
+POSIX_ARG_MAX = 128 * 1024
+
+# cmd.exe does not accept command lines longer than 8191 characters
+WINDOWS_ARG_MAX = 8191
+
+# Space left for the geogig launcher, which adds its own arguments
+ARG_MARGIN = 4096
+
+_argmax = None
 
 
 def mkdir(newdir):
@@ -42,3 +58,64 @@ def prettydate(d):
     local = d + offset
     s += local.strftime(' [%x %H:%M]')
     return s
+
+
+def parallelmap(func, items, workers):
+    """
+    Calls func for each of the passed items using a pool with the specified
+    number of threads. Returns a list with the results, in the same order
+    as the items. If any of the calls raises an exception, it is re-raised
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+def argmax():
+    """
+    Returns the maximum length of a command line in this platform, taking
+    into account the size of the environment
+    """
+    global _argmax
+    if _argmax is None:
+        if os.name == "nt":
+            limit = WINDOWS_ARG_MAX
+        else:
+            try:
+                limit = os.sysconf("SC_ARG_MAX")
+            except (AttributeError, ValueError, OSError):
+                limit = -1
+            if limit <= 0:
+                limit = POSIX_ARG_MAX
+            limit -= sum(len(k) + len(v) + 2 for k, v in os.environ.items())
+            limit = min(limit, POSIX_ARG_MAX)
+        _argmax = max(limit - ARG_MARGIN, 1024)
+    return _argmax
+
+
+def chunkargs(args, command=(), limit=None, maxcount=None):
+    """
+    Splits a list of arguments into lists that can each be appended to the
+    passed command without exceeding the maximum command line length, or
+    the passed limit. Chunks can also be limited to a number of arguments.
+    An argument that does not fit in a command line on its own is returned
+    in its own chunk
+    """
+    limit = limit or argmax()
+    base = sum(len(c) + 3 for c in command)
+    chunk = []
+    size = base
+    for arg in args:
+        # each argument might need quotes and a separator
+        argsize = len(arg) + 3
+        if chunk and (size + argsize > limit
+                      or (maxcount is not None and len(chunk) >= maxcount)):
+            yield chunk
+            chunk = []
+            size = base
+        chunk.append(arg)
+        size += argsize
+    if chunk:
+        yield chunk
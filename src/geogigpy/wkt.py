@@ -0,0 +1,189 @@
+# coding: utf-8
+
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from geogigpy import geogig
+from geogigpy.geogigexception import GeoGigException
+
+_PARENS = re.compile(r"[()]")
+
+# The nesting depth of the parentheses enclosing each part of a geometry
+_PARTDEPTH = {geogig.TYPE_POINT: 1,
+              geogig.TYPE_LINESTRING: 1,
+              geogig.TYPE_POLYGON: 1,
+              geogig.TYPE_MULTIPOINT: 2,
+              geogig.TYPE_MULTILINESTRING: 2,
+              geogig.TYPE_MULTIPOLYGON: 2}
+
+
+def _checknumpy():
+    if numpy is None:
+        raise GeoGigException("numpy is required to decode geometries")
+
+
+def _structure(wkt):
+    """
+    Splits a WKT string into its geometry type, the text of its rings and
+    the number of rings in each of its parts, without parsing coordinates.
+    A ring is any innermost list of coordinates: a point, a linestring or
+    a polygon ring
+    """
+    wkt = wkt.strip()
+    start = wkt.find("(")
+    head = (wkt if start == -1 else wkt[:start]).split()
+    geomtype = head[0].upper() if head else ""
+    if geomtype not in _PARTDEPTH:
+        raise GeoGigException("Cannot decode geometry: " + wkt[:50])
+    if start == -1:
+        # EMPTY geometries
+        return geomtype, [], []
+    partdepth = _PARTDEPTH[geomtype]
+    rings = []
+    parts = []
+    depth = 0
+    innermost = False
+    for match in _PARENS.finditer(wkt, start):
+        if match.group() == "(":
+            depth += 1
+            ringstart = match.end()
+            innermost = True
+            if depth == partdepth:
+                partstart = len(rings)
+        else:
+            if innermost:
+                rings.append(wkt[ringstart:match.start()])
+                innermost = False
+            if depth == partdepth:
+                parts.append(len(rings) - partstart)
+            depth -= 1
+    if geomtype == geogig.TYPE_MULTIPOINT and not parts and rings:
+        # points not enclosed in parentheses: MULTIPOINT (1 2, 3 4)
+        rings = rings[0].split(",")
+        parts = [1] * len(rings)
+    return geomtype, rings, parts
+
+
+class GeometryArrays(object):
+
+    """
+    A set of decoded geometries, stored as a flat array of coordinates
+    with one row per vertex, and offset arrays describing their structure.
+    Offsets follow the usual layout where the items of element i are those
+    between offsets[i] and offsets[i + 1]:
+
+    - geomoffsets: the parts of each geometry
+    - partoffsets: the rings of each part
+    - ringoffsets: the coordinates of each ring
+
+    Points and linestrings have a single part with a single ring, polygons
+    have a single part with one or more rings, and multigeometries have a
+    part for each point, linestring or polygon
+    """
+
+    __slots__ = ("types", "coords", "geomoffsets", "partoffsets",
+                 "ringoffsets", "_envelopes")
+
+    def __init__(self, types, coords, geomoffsets, partoffsets, ringoffsets):
+        self.types = types
+        self.coords = coords
+        self.geomoffsets = geomoffsets
+        self.partoffsets = partoffsets
+        self.ringoffsets = ringoffsets
+        self._envelopes = None
+
+    def __len__(self):
+        return len(self.types)
+
+    def coordoffsets(self):
+        """Returns the offsets of the coordinates of each geometry"""
+        return self.ringoffsets[self.partoffsets[self.geomoffsets]]
+
+    def vertexcounts(self):
+        """Returns an array with the number of vertices of each geometry"""
+        return numpy.diff(self.coordoffsets())
+
+    def coordinates(self, i):
+        """Returns the coordinates of the geometry at the passed index"""
+        offsets = self.coordoffsets()
+        return self.coords[offsets[i]:offsets[i + 1]]
+
+    def envelopes(self):
+        """
+        Returns an array with a (minx, miny, maxx, maxy) row for each
+        geometry. Rows of empty geometries are filled with NaN.
+        Envelopes are computed once and then cached
+        """
+        if self._envelopes is None:
+            offsets = self.coordoffsets()
+            envelopes = numpy.full((len(self), 4), numpy.nan)
+            nonempty = numpy.flatnonzero(numpy.diff(offsets))
+            if len(nonempty):
+                xy = self.coords[:, :2]
+                starts = offsets[nonempty]
+                envelopes[nonempty, :2] = numpy.minimum.reduceat(xy, starts)
+                envelopes[nonempty, 2:] = numpy.maximum.reduceat(xy, starts)
+            self._envelopes = envelopes
+        return self._envelopes
+
+    def extent(self):
+        """
+        Returns the (minx, miny, maxx, maxy) envelope of all the geometries,
+        or None if they are all empty
+        """
+        if not len(self.coords):
+            return None
+        xy = self.coords[:, :2]
+        return tuple(xy.min(axis=0).tolist() + xy.max(axis=0).tolist())
+
+
+def decodeall(geometries):
+    """
+    Decodes a list of geometries, passed as Geometry objects or WKT strings,
+    into a GeometryArrays object. None values are decoded as empty
+    geometries with no type.
+    Coordinates of all the geometries are parsed at once. All of them must
+    have the same number of dimensions, which is checked for each ring
+    """
+    _checknumpy()
+    types = []
+    rings = []
+    partsizes = []
+    geomsizes = []
+    for geometry in geometries:
+        if geometry is None:
+            types.append(None)
+            geomsizes.append(0)
+            continue
+        geomtype, georings, parts = _structure(str(geometry))
+        types.append(geomtype)
+        rings.extend(georings)
+        partsizes.extend(parts)
+        geomsizes.append(len(parts))
+    ringsizes = [ring.count(",") + 1 if ring.strip() else 0 for ring in rings]
+    values = numpy.array(" ".join(rings).replace(",", " ").split(),
+                         dtype=numpy.float64)
+    ncoords = sum(ringsizes)
+    ringdims = set(len(ring.split(",", 1)[0].split())
+                   for ring, size in zip(rings, ringsizes) if size)
+    dims = ringdims.pop() if ringdims else 2
+    if ringdims or len(values) != ncoords * dims:
+        raise GeoGigException("Geometries have mixed coordinate dimensions")
+    coords = values.reshape(ncoords, dims)
+    return GeometryArrays(types, coords, _offsets(geomsizes),
+                          _offsets(partsizes), _offsets(ringsizes))
+
+
+def decode(geometry):
+    """Decodes a single geometry into a GeometryArrays object"""
+    return decodeall([geometry])
+
+
+def _offsets(sizes):
+    offsets = numpy.zeros(len(sizes) + 1, dtype=numpy.int64)
+    numpy.cumsum(sizes, out=offsets[1:])
+    return offsets
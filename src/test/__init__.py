@@ -9,6 +9,26 @@ from test.featuretest import GeogigFeatureTest
 from test.commitishtest import GeogigCommitishTest
 from test.committest import GeogigCommitTest
 from test.difftest import GeogigDiffTest
+from test.shellconnectortest import GeogigShellConnectorTest
+from test.cachetest import GeogigCacheTest
+from test.featurecachetest import GeogigFeatureCacheTest
+from test.metadatatest import GeogigMetadataTest
+from test.commitgraphtest import GeogigCommitGraphTest
+from test.memorytest import GeogigMemoryTest
+from test.tabletest import GeogigTableTest
+from test.wkttest import GeogigWktTest
+from test.spatialindextest import GeogigSpatialIndexTest
+from test.inserttest import GeogigInsertTest
+from test.transactiontest import GeogigTransactionTest
+from test.utilstest import GeogigUtilsTest
+from test.treedifftest import GeogigTreeDiffTest
+from test.featurediffstest import GeogigFeatureDiffsTest
+from test.versionstest import GeogigVersionsTest
+from test.pathindextest import GeogigPathIndexTest
+from test.lastmodifiedtest import GeogigLastModifiedTest
+from test.incrementaltest import GeogigIncrementalTest
+from test.connectortest import GeogigConnectorTest
+from test.prefetchtest import GeogigPrefetchTest
 
 
 def suite():
@@ -18,4 +38,24 @@ def suite():
     suite.addTests(unittest.makeSuite(GeogigCommitishTest, 'test'))
     suite.addTests(unittest.makeSuite(GeogigCommitTest, 'test'))
     suite.addTests(unittest.makeSuite(GeogigDiffTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigShellConnectorTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigCacheTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigFeatureCacheTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigMetadataTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigCommitGraphTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigMemoryTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigTableTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigWktTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigSpatialIndexTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigInsertTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigTransactionTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigUtilsTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigTreeDiffTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigFeatureDiffsTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigVersionsTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigPathIndexTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigLastModifiedTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigIncrementalTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigConnectorTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigPrefetchTest, 'test'))
     return suite
@@ -0,0 +1,42 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy.cache import ResultCache, iscacheable
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+class GeogigCacheTest(unittest.TestCase):
+
+    def testIsCacheable(self):
+        self.assertTrue(iscacheable(["show", "--raw", SHA + ":parks/1"]))
+        self.assertTrue(iscacheable(["ls-tree", SHA, "-v", "-r"]))
+        self.assertTrue(iscacheable(["diff-tree", SHA, SHA, "--", "parks"]))
+        self.assertTrue(iscacheable(["cat", SHA]))
+        self.assertFalse(iscacheable(["show", "HEAD"]))
+        self.assertFalse(iscacheable(["diff-tree", SHA, "WORK_HEAD"]))
+        self.assertFalse(iscacheable(["show", SHA + "~1"]))
+        self.assertFalse(iscacheable(["rev-list", SHA]))
+        self.assertFalse(iscacheable(["ls-tree", "-v"]))
+
+    def testHitsAndMisses(self):
+        cache = ResultCache()
+        self.assertEqual(None, cache.get(["cat", SHA]))
+        cache.put(["cat", SHA], ["line"])
+        self.assertEqual(("line",), cache.get(["cat", SHA]))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def testEviction(self):
+        cache = ResultCache(maxsize=10)
+        cache.put(["cat", "a"], ["1234"])
+        cache.put(["cat", "b"], ["1234"])
+        cache.get(["cat", "a"])
+        cache.put(["cat", "c"], ["1234"])
+        self.assertEqual(2, len(cache))
+        self.assertEqual(None, cache.get(["cat", "b"]))
+        self.assertTrue(cache.get(["cat", "a"]) is not None)
+        cache.put(["cat", "d"], ["12345678901"])
+        self.assertEqual(None, cache.get(["cat", "d"]))
+        self.assertTrue(cache.size <= 10)
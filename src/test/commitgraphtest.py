@@ -0,0 +1,127 @@
+# coding: utf-8
+
+import unittest
+import os
+import time
+import datetime
+
+from geogigpy import geogig
+from geogigpy.commit import Commit
+from geogigpy.commitgraph import CommitGraph
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.utils import mkdir
+
+#   a - b - c - e    (master)
+#        \     /
+#         - d -      (branch)
+HISTORY = [("e", ["c", "d"]), ("d", ["b"]), ("c", ["b"]),
+           ("b", ["a"]), ("a", [])]
+
+
+def _id(name):
+    return name * 40
+
+
+class _FakeConnector(object):
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.walked = []
+
+    def revparse(self, rev):
+        refs = {geogig.HEAD: _id("e"), geogig.MASTER: _id("e"),
+                "branch": _id("d")}
+        return refs[rev]
+
+    def iterlog(self, tip):
+        date = datetime.datetime(2014, 1, 1)
+        reachable = set(tip[0])
+        for name, parents in HISTORY:
+            if name not in reachable:
+                continue
+            reachable.update(parents)
+            self.walked.append(name)
+            yield Commit(self.repo, _id(name), _id("t"),
+                         [_id(p) for p in parents], "message " + name,
+                         "user", date, "user", date)
+
+
+class _FakeRepo(object):
+
+    _commitgraph = None
+
+    def __init__(self):
+        self.url = "fakerepo"
+        self.connector = _FakeConnector(self)
+        self.branches = {geogig.MASTER: _id("e"), "branch": _id("d")}
+
+
+class GeogigCommitGraphTest(unittest.TestCase):
+
+    def getTempPath(self):
+        folder = os.path.join(os.path.dirname(__file__), "temp")
+        mkdir(folder)
+        return os.path.join(folder, str(time.time()) + ".json")
+
+    def testWalkStopsAtKnownCommits(self):
+        repo = _FakeRepo()
+        graph = CommitGraph(repo)
+        self.assertEqual(3, graph.add(_id("d")))
+        repo.connector.walked = []
+        self.assertEqual(2, graph.update())
+        self.assertEqual(["e", "d", "c"], repo.connector.walked)
+        self.assertEqual(5, len(graph))
+
+    def testNavigation(self):
+        graph = CommitGraph(_FakeRepo())
+        self.assertEqual(_id("c"), graph.resolve("HEAD~1"))
+        self.assertEqual(_id("c"), graph.resolve("HEAD^"))
+        self.assertEqual(_id("d"), graph.resolve("HEAD^2"))
+        self.assertEqual(_id("a"), graph.resolve("HEAD^2~2"))
+        self.assertEqual(_id("e"), graph.resolve(_id("e") + "^0"))
+        self.assertRaises(GeoGigException, graph.resolve, "HEAD~4")
+        self.assertEqual([_id("c"), _id("d")], graph.parents(_id("e")))
+        self.assertEqual(sorted([_id("c"), _id("d")]),
+                         sorted(graph.children(_id("b"))))
+        self.assertEqual("message c", graph.commit(_id("c")).message)
+
+    def testAncestry(self):
+        graph = CommitGraph(_FakeRepo())
+        graph.update()
+        self.assertEqual(4, graph.generation(_id("e")))
+        self.assertEqual(_id("b"), graph.commonancestor(_id("c"), _id("d")))
+        self.assertEqual(_id("d"), graph.commonancestor(_id("e"), _id("d")))
+        self.assertTrue(graph.isancestor(_id("a"), _id("e")))
+        self.assertFalse(graph.isancestor(_id("c"), _id("d")))
+
+    def testIterAncestors(self):
+        graph = CommitGraph(_FakeRepo())
+        graph.update()
+        ancestors = graph.iterancestors(_id("e"))
+        self.assertEqual(_id("e"), next(ancestors))
+        self.assertEqual([_id("c"), _id("d"), _id("b"), _id("a")],
+                         list(ancestors))
+        self.assertEqual([_id("d"), _id("b"), _id("a")],
+                         list(graph.iterancestors(_id("d"))))
+
+    def testAheadBehind(self):
+        graph = CommitGraph(_FakeRepo())
+        counts = graph.aheadbehind([(_id("e"), _id("d")),
+                                    (_id("c"), _id("d")),
+                                    (_id("a"), _id("e"))])
+        self.assertEqual([(2, 0), (1, 1), (0, 4)], counts)
+
+    def testSaveAndLoad(self):
+        repo = _FakeRepo()
+        graph = CommitGraph(repo)
+        graph.update()
+        filename = self.getTempPath()
+        graph.save(filename)
+        loaded = CommitGraph.load(repo, filename)
+        self.assertEqual(5, len(loaded))
+        self.assertEqual(4, loaded.generation(_id("e")))
+        commit = loaded.commit(_id("e"))
+        self.assertEqual(datetime.datetime(2014, 1, 1), commit.authordate)
+        repo.connector.walked = []
+        self.assertEqual(0, loaded.update())
+        self.assertEqual([], repo.connector.walked)
@@ -0,0 +1,61 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.repo import Repository
+from geogigpy.py4jconnector import Py4JCLIConnector
+from geogigpy.geogigserverconnector import GeoGigServerConnector
+
+
+class _SerialConnector(CLIConnector):
+    """A connector that cannot run commands concurrently, recording the
+    commands instead of running them"""
+
+    concurrent = False
+
+    def setRepository(self, repo):
+        self.repo = repo
+
+    def checkisrepo(self):
+        pass
+
+    def _iterexecute(self, commands):
+        self.commandslog.append(" ".join(commands))
+        if commands[0] == "show":
+            return iter(["TREE ID:  " + "a" * 40, "SIZE:  3"])
+        return iter([])
+
+    def newsession(self):
+        raise AssertionError("No sessions should be created")
+
+
+class GeogigConnectorTest(unittest.TestCase):
+
+    def testCLINewSession(self):
+        connector = CLIConnector(cachesize=10)
+        session = connector.newsession()
+        self.assertTrue(isinstance(session, CLIConnector))
+        self.assertEqual(10, session.cachesize)
+        self.assertTrue(session.cache is not connector.cache)
+        self.assertTrue(session.concurrent)
+        self.assertEqual(0, CLIConnector(cachesize=0).newsession().cachesize)
+
+    def testPy4JNewSession(self):
+        session = Py4JCLIConnector(cachesize=10).newsession()
+        self.assertTrue(isinstance(session, Py4JCLIConnector))
+        self.assertEqual(10, session.cachesize)
+        self.assertFalse(session.concurrent)
+
+    def testServerNewSession(self):
+        credentials = ("user", "password")
+        session = GeoGigServerConnector(credentials).newsession()
+        self.assertEqual(credentials, session.credentials)
+
+    def testImportAllWithoutConcurrency(self):
+        repo = Repository("repo", _SerialConnector())
+        results = repo.importall(["a.shp", "b.geojson"], workers=2)
+        self.assertEqual([("a", 3), ("b", 3)],
+                         [r[:2] for r in results.values()])
+        imports = [c for c in repo.connector.commandslog if "import" in c]
+        self.assertEqual(2, len(imports))
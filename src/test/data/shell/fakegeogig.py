@@ -0,0 +1,61 @@
+# coding: utf-8
+
+"""
+A minimal stand-in for the geogig console, used to test the shell connector.
+It reads one command per line and answers frame lines with the exit status
+of the previous command.
+If arguments are passed, it runs them as a single command and exits with its
+status instead, as the geogig executable does.
+"""
+
+import os
+import sys
+import shlex
+import itertools
+
+HEAD_ID = "a" * 40
+
+_counter = itertools.count()
+
+
+def execute(args):
+    if args == ["rev-parse", "HEAD"]:
+        print(HEAD_ID)
+    elif args == ["pid"]:
+        print(os.getpid())
+    elif args == ["cwd"]:
+        print(os.getcwd())
+    elif args[:1] == ["show"]:
+        print("show " + str(next(_counter)))
+    elif args[:2] == ["shp", "export"] and not args[2].endswith(":wrong"):
+        with open(args[3], "w") as f:
+            f.write(args[2])
+    elif args[:1] == ["echo"]:
+        for arg in args[1:]:
+            print(arg)
+    else:
+        print("'%s' is not a geogig command" % " ".join(args))
+        return 1
+    return 0
+
+
+def main():
+    if len(sys.argv) > 1:
+        args = sys.argv[1:]
+        if args[-2:] == ["--color", "never"]:
+            args = args[:-2]
+        sys.exit(execute(args))
+    status = 0
+    for line in iter(sys.stdin.readline, ""):
+        line = line.strip("\r\n")
+        if line.startswith("#geogigpy-"):
+            print(line + " " + str(status))
+        else:
+            args = shlex.split(line)
+            if args[-2:] == ["--color", "never"]:
+                args = args[:-2]
+            status = execute(args)
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+# coding: utf-8
+
+import hashlib
+from collections import namedtuple, OrderedDict
+
+from geogigpy import geogig
+from geogigpy.cliconnector import CLIConnector, MISSING_OBJECT_ERROR
+from geogigpy.commit import Commit
+from geogigpy.feature import Feature
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.tree import Tree
+
+_Diff = namedtuple("_Diff", ["path"])
+
+
+class FakeConnector(CLIConnector):
+    """
+    A connector that serves a repository kept in memory instead of running
+    geogig, for tests that do not need a real repository.
+
+    features is a dict with feature refs (<ref>:<path>) as keys and feature
+    data, as returned by featuresdata, as values. Requesting a missing
+    feature fails as it does in geogig. Inserted and removed features are
+    written to WORK_HEAD.
+
+    history is a list of (commit id, author, changed paths) tuples, newest
+    first, with each commit being the parent of the previous one. Commits
+    in the log can be filtered by the paths they change.
+
+    Calls are recorded in calls, as tuples with the name of the geogig
+    command and its arguments, and the ids of the commits yielded by iterlog
+    in visited
+    """
+
+    def __init__(self, features=None, history=None):
+        CLIConnector.__init__(self)
+        self.features = dict(features or {})
+        self.history = list(history or [])
+        self.calls = []
+        self.visited = []
+        self.repo = None
+
+    def setRepository(self, repo):
+        self.repo = repo
+
+    def checkisrepo(self):
+        pass
+
+    def ncalls(self, command):
+        """Returns the number of recorded calls to a geogig command"""
+        return len([c for c in self.calls if c[0] == command])
+
+    def _paths(self, ref, path=None):
+        prefix = ref + ":" + ("" if path is None else path + "/")
+        return sorted(r[len(ref) + 1:] for r in self.features
+                      if r.startswith(prefix))
+
+    def objectid(self, ref):
+        """
+        Returns an id for the feature or tree with the passed ref, which
+        changes with its contents, or NULL_ID if it does not exist
+        """
+        if ref in self.features:
+            contents = sorted(self.features[ref].items())
+        else:
+            treeref, sep, path = ref.partition(":")
+            paths = self._paths(treeref, path or None)
+            if not paths:
+                return geogig.NULL_ID
+            contents = [(p, self.objectid(treeref + ":" + p)) for p in paths]
+        return hashlib.sha1(repr(contents).encode("utf-8")).hexdigest()
+
+    def treeid(self, ref, path):
+        objectid = self.objectid(ref + ":" + path)
+        return None if objectid == geogig.NULL_ID else objectid
+
+    def _existing(self, refs):
+        self.calls.append(("show", list(refs)))
+        for ref in refs:
+            if ref not in self.features:
+                raise GeoGigException(ref + ": refspec " + MISSING_OBJECT_ERROR
+                                      + ".")
+        return refs
+
+    def revparse(self, rev):
+        if rev in [geogig.HEAD, geogig.MASTER] and self.history:
+            return self.history[0][0]
+        return rev
+
+    def branches(self):
+        return {geogig.MASTER: self.history[0][0]} if self.history else {}
+
+    def iterlog(self, tip, sincecommit=None, until=None, since=None,
+                path=None, n=None):
+        self.calls.append(("rev-list", tip, path))
+        commits = [c[0] for c in self.history]
+        start = commits.index(tip) if tip in commits else 0
+        filters = path if isinstance(path, list) else [path]
+        count = 0
+        for i in range(start, len(self.history)):
+            if n is not None and count == n:
+                return
+            commitid, author, paths = self.history[i]
+            if path and not any(p == f or p.startswith(f + "/")
+                                for p in paths for f in filters):
+                continue
+            self.visited.append(commitid)
+            count += 1
+            yield Commit(self.repo, commitid, None, commits[i + 1:i + 2],
+                         "", author, None, author, None)
+
+    def iterdiff(self, refa, refb, path=None):
+        """Yields the paths changed by the commit refb in the history"""
+        self.calls.append(("diff-tree", refa, refb))
+        changed = dict((c[0], c[2]) for c in self.history)[refb]
+        return iter([_Diff(p) for p in changed if path is None
+                     or p == path or p.startswith(path + "/")])
+
+    def iterfeatureids(self, ref=geogig.HEAD, path=None):
+        self.calls.append(("ls-tree", ref))
+        return iter([(p, self.objectid(ref + ":" + p))
+                     for p in self._paths(ref, path)])
+
+    def children(self, ref=geogig.HEAD, path=None, recursive=False):
+        base = "" if path is None else path + "/"
+        children = OrderedDict()
+        for p in self._paths(ref, path):
+            name = p[len(base):].split("/")[0]
+            if recursive or "/" not in p[len(base):]:
+                children[p] = Feature(self.repo, ref, p)
+            else:
+                children[base + name] = Tree(self.repo, ref, base + name)
+        return list(children.values())
+
+    def featuresdata(self, refs):
+        return dict((r, self.features[r]) for r in self._existing(refs))
+
+    def featureobjects(self, refs):
+        objects = {}
+        for ref in self._existing(refs):
+            lines = []
+            for name, (value, typename) in self.features[ref].items():
+                lines.extend([name, typename, str(value)])
+            objects[ref] = (self.objectid(ref), lines)
+        return objects
+
+    def featuretype(self, ref, tree, ordered=True):
+        paths = self._paths(ref, tree)
+        if not paths:
+            raise GeoGigException("Tree not found: " + tree)
+        data = self.features[ref + ":" + paths[0]]
+        return OrderedDict((name, typename)
+                           for name, (value, typename) in data.items())
+
+    def iterrun(self, commands):
+        """
+        Runs diff-tree for the paths after '--', comparing the contents of
+        the features. Other commands are not supported
+        """
+        self.calls.append(tuple(commands))
+        if commands[0] != "diff-tree" or "--" not in commands:
+            raise GeoGigException("Unsupported command: "
+                                  + " ".join(commands))
+        ref, ref2 = commands[1], commands[2]
+        for path in commands[commands.index("--") + 1:]:
+            ids = [self.objectid(r + ":" + path) for r in [ref, ref2]]
+            if ids[0] != ids[1]:
+                yield " ".join([path] + ids)
+
+    def insertfeatures(self, features, batchsize=None):
+        if isinstance(features, dict):
+            features = features.items()
+        inserted = OrderedDict(features)
+        self.calls.append(("insert", inserted))
+        for path, attributes in inserted.items():
+            self.write(path, attributes)
+        return len(inserted)
+
+    def write(self, path, attributes):
+        """
+        Writes a feature to WORK_HEAD without recording the call. Attributes
+        are passed as a dict with attribute names as keys and attribute
+        values as values
+        """
+        self.features[geogig.WORK_HEAD + ":" + path] = OrderedDict(
+            (name, (value, type(value).__name__))
+            for name, value in attributes.items())
+
+    def removepaths(self, paths, recursive=False):
+        paths = list(paths)
+        self.calls.append(("rm", paths))
+        for path in paths:
+            self.features.pop(geogig.WORK_HEAD + ":" + path, None)
+            if recursive:
+                for p in self._paths(geogig.WORK_HEAD, path):
+                    del self.features[geogig.WORK_HEAD + ":" + p]
+
+    def add(self, paths=()):
+        self.calls.append(("add", list(paths)))
+
+    def commit(self, message, paths=()):
+        self.calls.append(("commit", message))
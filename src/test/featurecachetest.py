@@ -0,0 +1,49 @@
+# coding: utf-8
+
+import unittest
+import os
+import time
+from collections import OrderedDict
+
+from geogigpy.featurecache import FeatureCache
+from geogigpy.geometry import Geometry
+from geogigpy.utils import mkdir
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+class GeogigFeatureCacheTest(unittest.TestCase):
+
+    def getTempPath(self):
+        folder = os.path.join(os.path.dirname(__file__), "temp")
+        mkdir(folder)
+        return os.path.join(folder, str(time.time()) + ".sqlite")
+
+    def getData(self):
+        data = OrderedDict()
+        data["name"] = ("a park", "STRING")
+        data["area"] = (15246.59765625, "DOUBLE")
+        data["the_geom"] = (Geometry("POINT (1 2)", "EPSG:4326"),
+                            "POINT EPSG:4326")
+        return data
+
+    def testPutAndGet(self):
+        cache = FeatureCache(self.getTempPath())
+        self.assertEqual(None, cache.get(SHA, "parks/1"))
+        cache.put(SHA, "parks/1", self.getData())
+        data = cache.get(SHA, "parks/1")
+        self.assertEqual(["name", "area", "the_geom"], list(data.keys()))
+        self.assertEqual(15246.59765625, data["area"][0])
+        self.assertEqual("POINT (1 2)", data["the_geom"][0].geom)
+        self.assertEqual(None, cache.get("f" * 40, "parks/1"))
+
+    def testSharedFile(self):
+        filename = self.getTempPath()
+        cache = FeatureCache(filename)
+        cache.putmany(SHA, {"parks/1": self.getData(),
+                            "parks/2": self.getData()})
+        other = FeatureCache(filename)
+        data = other.getmany(SHA, ["parks/1", "parks/2", "parks/3"])
+        self.assertEqual(["parks/1", "parks/2"], sorted(data.keys()))
+        other.clear()
+        self.assertEqual(None, cache.get(SHA, "parks/1"))
@@ -0,0 +1,51 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy.geogigexception import GeoGigException
+from test.fakeconnector import FakeConnector
+
+
+class GeogigFeatureDiffsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.connector = FakeConnector({
+            "a:parks/1": {"name": ("park", "STRING"), "area": (1.0, "DOUBLE")},
+            "b:parks/1": {"name": ("park", "STRING"), "area": (2.0, "DOUBLE")},
+            "a:parks/2": {"name": ("old", "STRING")},
+            "b:parks/3": {"name": ("new", "STRING")},
+            "a:parks/4": {"name": ("same", "STRING")},
+            "b:parks/4": {"name": ("same", "STRING")}})
+
+    def testFeatureDiffs(self):
+        diffs = self.connector.featurediffs("a", "b",
+                                            ["parks/1", "parks/2", "parks/3"])
+        self.assertEqual(["parks/1", "parks/2", "parks/3"], list(diffs))
+        self.assertEqual({"area": (1.0, 2.0)}, diffs["parks/1"])
+        self.assertEqual({"name": ("old", None)}, diffs["parks/2"])
+        self.assertEqual({"name": (None, "new")}, diffs["parks/3"])
+
+    def testMissingFeaturesAreIsolated(self):
+        refs = ["a:parks/1", "a:parks/9", "b:parks/1", "b:parks/3"]
+        data = self.connector.existingfeaturesdata(refs)
+        self.assertEqual(set(["a:parks/1", "b:parks/1", "b:parks/3"]),
+                         set(data))
+        self.assertEqual(5, self.connector.ncalls("show"))
+
+    def testOnlyExistingVersionsAreRequested(self):
+        diffs = self.connector.featurediffs("a", "b", ["parks/2", "parks/3",
+                                                       "parks/4"])
+        self.assertEqual({}, diffs["parks/4"])
+        self.assertEqual(1, self.connector.ncalls("show"))
+        self.assertEqual(1, self.connector.ncalls("diff-tree"))
+
+    def testOtherErrorsAreRaised(self):
+        def fail(refs):
+            raise GeoGigException("Connection refused")
+        self.connector.featuresdata = fail
+        self.assertRaises(GeoGigException,
+                          self.connector.existingfeaturesdata, ["a:parks/1"])
+
+    def testMissingInBothRefs(self):
+        diffs = self.connector.featurediffs("a", "b", ["parks/9"])
+        self.assertEqual({}, diffs["parks/9"])
@@ -81,6 +81,13 @@ class GeogigFeatureTest(unittest.TestCase):
         geom = feature.geom
         self.assertTrue(isinstance(geom, Geometry))
 
+    def testGeomEnvelope(self):
+        feature = Feature(self.repo, geogig.HEAD, "parks/5")
+        geom = feature.geom
+        self.assertTrue(geom.vertexcount > 0)
+        minx, miny, maxx, maxy = geom.envelope
+        self.assertTrue(minx <= maxx and miny <= maxy)
+
     def testGeomFieldName(self):
         feature = Feature(self.repo, geogig.HEAD, "parks/5")
         name = feature.geomfieldname
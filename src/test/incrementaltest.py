@@ -0,0 +1,106 @@
+# coding: utf-8
+
+import os
+import time
+import unittest
+
+from geogigpy.incremental import DigestStore, rowdigest
+from geogigpy.repo import Repository
+from geogigpy.utils import mkdir
+from test.fakeconnector import FakeConnector
+
+
+class _FakeSource(object):
+
+    def __init__(self, rows, schema="schema"):
+        self.rows = rows
+        self.schema = schema
+
+    def schemadigest(self):
+        return self.schema
+
+    def __iter__(self):
+        for fid, attributes in self.rows:
+            yield fid, dict(attributes)
+
+
+class GeogigIncrementalTest(unittest.TestCase):
+
+    def getTempPath(self):
+        folder = os.path.join(os.path.dirname(__file__), "temp",
+                              str(time.time()))
+        mkdir(os.path.join(folder, ".geogig"))
+        return folder
+
+    def getRepo(self):
+        return Repository(self.getTempPath(), FakeConnector())
+
+    def importfunc(self, connector, add):
+        connector.calls.append(("import", add))
+        connector.write("parks/imported", {"id": 0})
+
+    def testRowDigest(self):
+        self.assertEqual(rowdigest({"a": 1, "b": "x"}),
+                         rowdigest({"b": "x", "a": 1}))
+        self.assertNotEqual(rowdigest({"a": 1, "b": "x"}),
+                            rowdigest({"a": 1, "b": None}))
+
+    def testDigestStore(self):
+        store = DigestStore(os.path.join(self.getTempPath(), "d.sqlite"))
+        self.assertEqual({}, store.digests("parks"))
+        self.assertEqual(None, store.schema("parks"))
+        store.replace("parks", "s", {"1": "a", "2": "b"})
+        self.assertEqual({"1": "a", "2": "b"}, store.digests("parks"))
+        self.assertEqual("s", store.schema("parks"))
+        self.assertEqual(None, store.treeid("parks"))
+        store.replace("parks", "s", {"1": "c"}, "t")
+        self.assertEqual({"1": "c"}, store.digests("parks"))
+        self.assertEqual("t", store.treeid("parks"))
+        store.remove("parks")
+        self.assertEqual(None, store.treeid("parks"))
+
+    def testFirstImportIsFull(self):
+        repo = self.getRepo()
+        source = _FakeSource([("1", {"id": 1}), ("2", {"id": 2})])
+        self.assertEqual((2, 0), repo.importincremental(
+            "parks", self.importfunc, source, add=True))
+        self.assertEqual([("import", True)], repo.connector.calls)
+
+    def testOnlyChangedRowsAreWritten(self):
+        repo = self.getRepo()
+        rows = [("1", {"id": 1, "name": "a"}), ("2", {"id": 2, "name": "b"}),
+                ("3", {"id": 3, "name": "c"})]
+        repo.importincremental("parks", self.importfunc, _FakeSource(rows))
+        rows = [("1", {"id": 1, "name": "a"}), ("2", {"id": 2, "name": None}),
+                ("4", {"id": 4, "name": "d"})]
+        repo.connector.calls = []
+        self.assertEqual((2, 1), repo.importincremental(
+            "parks", self.importfunc, _FakeSource(rows)))
+        calls = repo.connector.calls
+        self.assertEqual(["insert", "rm"], [c[0] for c in calls])
+        self.assertEqual(["parks/2", "parks/4"], list(calls[0][1]))
+        self.assertEqual(["parks/3"], calls[1][1])
+        repo.connector.calls = []
+        self.assertEqual((0, 0), repo.importincremental(
+            "parks", self.importfunc, _FakeSource(rows)))
+
+    def testSchemaChangeImportsEverything(self):
+        repo = self.getRepo()
+        rows = [("1", {"id": 1})]
+        repo.importincremental("parks", self.importfunc, _FakeSource(rows))
+        repo.connector.calls = []
+        repo.importincremental("parks", self.importfunc,
+                               _FakeSource(rows, "other"))
+        self.assertEqual([("import", False)], repo.connector.calls)
+
+    def testChangedTreeImportsEverything(self):
+        repo = self.getRepo()
+        rows = [("1", {"id": 1})]
+        repo.importincremental("parks", self.importfunc, _FakeSource(rows))
+        repo.connector.write("parks/9", {"id": 9})
+        repo.connector.calls = []
+        self.assertEqual((1, 0), repo.importincremental(
+            "parks", self.importfunc, _FakeSource(rows)))
+        self.assertEqual([("import", False)], repo.connector.calls)
+        self.assertEqual((0, 0), repo.importincremental(
+            "parks", self.importfunc, _FakeSource(rows)))
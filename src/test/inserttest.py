@@ -0,0 +1,69 @@
+# coding: utf-8
+
+import os
+import unittest
+
+from geogigpy.cliconnector import CLIConnector, DEFAULT_INSERT_BATCH_SIZE
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.geometry import Geometry
+
+
+class _RecordingConnector(CLIConnector):
+    """A connector that keeps the insert files instead of running geogig"""
+
+    def __init__(self):
+        CLIConnector.__init__(self)
+        self.files = []
+        self.contents = []
+
+    def run(self, commands):
+        self.files.append(commands[-1])
+        with open(commands[-1]) as f:
+            self.contents.append(f.read())
+        return []
+
+
+def _features(n):
+    for i in range(n):
+        yield "parks/%i" % i, {"name": "park %i" % i, "area": 2.0,
+                               "owner": None,
+                               "the_geom": Geometry("POINT (%i 0)" % i, None)}
+
+
+class GeogigInsertTest(unittest.TestCase):
+
+    def testBatches(self):
+        connector = _RecordingConnector()
+        self.assertEqual(25, connector.insertfeatures(_features(25), 10))
+        self.assertEqual(3, len(connector.contents))
+        self.assertEqual(10, connector.contents[0].count("\n\n"))
+        self.assertEqual(5, connector.contents[2].count("\n\n"))
+        self.assertFalse(any(os.path.exists(f) for f in connector.files))
+
+    def testFileFormat(self):
+        connector = _RecordingConnector()
+        connector.insertfeatures(dict(_features(1)))
+        lines = connector.contents[0].split("\n")
+        self.assertEqual("parks/0", lines[0])
+        self.assertTrue("area\t2" in lines)
+        self.assertTrue("the_geom\tPOINT (0 0)" in lines)
+        self.assertFalse(any(l.startswith("owner") for l in lines))
+
+    def testExactBatchesAndEmpty(self):
+        connector = _RecordingConnector()
+        self.assertEqual(20, connector.insertfeatures(_features(20), 10))
+        self.assertEqual(2, len(connector.contents))
+        self.assertEqual(0, connector.insertfeatures([]))
+        self.assertEqual(2, len(connector.contents))
+
+    def testDefaultBatchSize(self):
+        connector = _RecordingConnector()
+        n = DEFAULT_INSERT_BATCH_SIZE + 1
+        self.assertEqual(n, connector.insertfeatures(_features(n), None))
+        self.assertEqual(2, len(connector.contents))
+
+    def testInvalidBatchSize(self):
+        connector = _RecordingConnector()
+        self.assertRaises(GeoGigException, connector.insertfeatures,
+                          _features(1), 0)
+        self.assertFalse(connector.files)
@@ -0,0 +1,70 @@
+# coding: utf-8
+
+import unittest
+import os
+import time
+
+from geogigpy.repo import Repository
+from geogigpy.utils import mkdir
+from test.fakeconnector import FakeConnector
+
+
+class GeogigLastModifiedTest(unittest.TestCase):
+
+    history = [("c4", "ann", ["parks/2"]),
+               ("c3", "bob", ["roads/1"]),
+               ("c2", "bob", ["parks/1"]),
+               ("c1", "cid", ["parks/1", "parks/2"])]
+
+    def getTempPath(self):
+        folder = os.path.join(os.path.dirname(__file__), "temp")
+        mkdir(folder)
+        return os.path.join(folder, str(time.time()) + ".sqlite")
+
+    def getRepo(self, history=None):
+        history = history or self.history
+        tip, root = history[0][0], history[-1][0]
+        refs = [root + ":" + path for path in history[-1][2]]
+        refs.extend(tip + ":" + path
+                    for path in set(p for c in history for p in c[2]))
+        features = dict((ref, {}) for ref in refs)
+        return Repository("repo", FakeConnector(features, history))
+
+    def testTreeAuthors(self):
+        repo = self.getRepo()
+        self.assertEqual({"parks": "ann", "roads": "bob"}, repo.treeauthors())
+        self.assertEqual(["c4", "c3"], repo.connector.visited)
+        self.assertEqual(2, repo.connector.ncalls("rev-list"))
+
+    def testNestedTrees(self):
+        history = [("c3", "ann", ["parks/big/1"]),
+                   ("c2", "bob", ["parks/small/1"]),
+                   ("c1", "cid", ["parks/big/1", "roads/1"])]
+        authors = self.getRepo(history).treeauthors()
+        self.assertEqual({"parks": "ann", "parks/big": "ann",
+                          "parks/small": "bob", "roads": "cid"}, authors)
+
+    def testFeatures(self):
+        repo = self.getRepo()
+        commits = repo.lastmodified(path="parks")
+        self.assertEqual("c4", commits["parks"].commitid)
+        self.assertEqual("c2", commits["parks/1"].commitid)
+        self.assertEqual("c4", commits["parks/2"].commitid)
+        self.assertEqual(3, repo.connector.ncalls("rev-list"))
+
+    def testCached(self):
+        repo = self.getRepo()
+        repo.lastmodified()
+        repo.connector.visited = []
+        repo.lastmodified()
+        self.assertEqual([], repo.connector.visited)
+
+    def testIndexed(self):
+        repo = self.getRepo()
+        repo.pathindex(self.getTempPath())
+        commits = repo.lastmodified(path="parks")
+        self.assertEqual("c4", commits["parks"].commitid)
+        self.assertEqual("c2", commits["parks/1"].commitid)
+        self.assertEqual("c4", commits["parks/2"].commitid)
+        self.assertEqual("bob", repo.treeauthors()["roads"])
+        self.assertEqual({"parks": "ann", "roads": "bob"}, repo.treeauthors())
@@ -0,0 +1,98 @@
+# coding: utf-8
+
+import sys
+import tracemalloc
+import unittest
+from collections import OrderedDict
+
+from geogigpy.feature import Feature
+from geogigpy.commit import Commit
+from geogigpy.geometry import Geometry
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+class _DictFeature(object):
+    """A feature storing its data in dicts, as features used to do"""
+
+    def __init__(self, repo, ref, path):
+        self.repo = repo
+        self.ref = ref
+        self.path = path
+        self._attributes = None
+        self._featuretype = None
+
+    def _setdata(self, data):
+        self._attributes = OrderedDict((k, v[0]) for k, v in data.items())
+        self._featuretype = OrderedDict((k, v[1]) for k, v in data.items())
+
+
+def _data(i):
+    return OrderedDict([("name", ("feature %i" % i, "STRING")),
+                        ("count", (i, "INTEGER")),
+                        ("area", (i / 2.0, "DOUBLE")),
+                        ("geom", (Geometry("POINT (%i %i)" % (i, i), None),
+                                  "POINT"))])
+
+
+def measure(factory, n):
+    """Returns the bytes allocated to create n objects with a factory"""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        objects = [factory(i) for i in range(n)]
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del objects
+    return size
+
+
+def dictfeature(i):
+    feature = _DictFeature(None, SHA, "parks/%i" % i)
+    feature._setdata(_data(i))
+    return feature
+
+
+def slotfeature(i):
+    feature = Feature(None, SHA, "parks/%i" % i)
+    feature._setdata(_data(i))
+    return feature
+
+
+def commit(i):
+    return Commit(None, SHA, SHA, [SHA], "message %i" % i, "author",
+                  None, "committer", None)
+
+
+class GeogigMemoryTest(unittest.TestCase):
+
+    def testFeatureDataIsShared(self):
+        a = slotfeature(1)
+        b = slotfeature(2)
+        self.assertTrue(a._schema is b._schema)
+        self.assertEqual(("feature 1", 1, 0.5), a._values[:3])
+        self.assertEqual(1, a.value("count"))
+        self.assertEqual(["name", "count", "area", "geom"],
+                         list(a.attributes.keys()))
+        self.assertEqual("INTEGER", a.featuretype()["count"])
+        self.assertEqual("geom", a.geomfieldname)
+
+    def testNoInstanceDict(self):
+        for obj in [slotfeature(1), commit(1), Geometry("POINT (0 0)", None)]:
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def testFeaturesUseLessMemory(self):
+        n = 10000
+        self.assertLess(measure(slotfeature, n), measure(dictfeature, n) / 2)
+
+
+if __name__ == "__main__":
+    # prints the memory used by 1M objects of each kind
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for name, factory in [("dict features", dictfeature),
+                          ("features", slotfeature),
+                          ("commits", commit)]:
+        size = measure(factory, n)
+        print("%s: %i bytes (%.1f bytes per object)"
+              % (name, size, size / float(n)))
@@ -0,0 +1,80 @@
+# coding: utf-8
+
+import unittest
+import os
+import time
+
+from geogigpy.metadata import RepositoryMetadata
+from geogigpy.utils import mkdir
+
+MASTER_ID = "a" * 40
+BRANCH_ID = "b" * 40
+TAG_ID = "c" * 40
+
+CONFIG = """[user]
+name = user
+email = "user@email.com"
+[remote "origin"]
+url = file:/path/to/origin
+fetch = +refs/heads/*:refs/remotes/origin/*
+"""
+
+
+class GeogigMetadataTest(unittest.TestCase):
+
+    def getTempPath(self):
+        return os.path.join(os.path.dirname(__file__), "temp",
+                            str(time.time())).replace('\\', '/')
+
+    def write(self, path, content):
+        mkdir(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(content)
+
+    def getRepoFolder(self):
+        url = self.getTempPath()
+        folder = os.path.join(url, ".geogig")
+        self.write(os.path.join(folder, "HEAD"), "ref: refs/heads/master\n")
+        self.write(os.path.join(folder, "refs", "heads", "master"),
+                   MASTER_ID + "\n")
+        self.write(os.path.join(folder, "refs", "heads", "dev", "branch"),
+                   BRANCH_ID + "\n")
+        self.write(os.path.join(folder, "refs", "tags", "v1"), TAG_ID)
+        self.write(os.path.join(folder, "config"), CONFIG)
+        return url
+
+    def testRef(self):
+        metadata = RepositoryMetadata(self.getRepoFolder())
+        self.assertEqual(MASTER_ID, metadata.ref("HEAD"))
+        self.assertEqual(MASTER_ID, metadata.ref("master"))
+        self.assertEqual(MASTER_ID, metadata.ref("refs/heads/master"))
+        self.assertEqual(BRANCH_ID, metadata.ref("dev/branch"))
+        self.assertEqual(TAG_ID, metadata.ref("v1"))
+        self.assertEqual(None, metadata.ref("wrongref"))
+        self.assertEqual(None, metadata.ref("config"))
+
+    def testRefsAndConfig(self):
+        metadata = RepositoryMetadata(self.getRepoFolder())
+        self.assertEqual({"master": MASTER_ID, "dev/branch": BRANCH_ID},
+                         metadata.branches())
+        self.assertEqual({"v1": TAG_ID}, metadata.tags())
+        self.assertEqual({"origin": "file:/path/to/origin"},
+                         metadata.remotes())
+        self.assertEqual("user@email.com", metadata.config("user.email"))
+        self.assertEqual(None, metadata.config("user.wrongparam"))
+
+    def testChangesAreDetected(self):
+        url = self.getRepoFolder()
+        metadata = RepositoryMetadata(url)
+        self.assertEqual(MASTER_ID, metadata.ref("HEAD"))
+        self.write(os.path.join(url, ".geogig", "HEAD"),
+                   "ref: refs/heads/dev/branch\n")
+        self.assertEqual(BRANCH_ID, metadata.ref("HEAD"))
+
+    def testNoRefsFolder(self):
+        url = self.getTempPath()
+        mkdir(os.path.join(url, ".geogig"))
+        metadata = RepositoryMetadata(url)
+        self.assertEqual(None, metadata.ref("master"))
+        self.assertEqual(None, metadata.branches())
+        self.assertEqual(None, metadata.remotes())
@@ -0,0 +1,69 @@
+# coding: utf-8
+
+import unittest
+import os
+import time
+
+from geogigpy.pathindex import PathIndex
+from geogigpy.utils import mkdir
+from test.fakeconnector import FakeConnector
+
+
+class _FakeGraph(object):
+
+    def __init__(self, parents, connector):
+        self.parents_ = parents
+        self.repo = self
+        self.connector = connector
+
+    def __iter__(self):
+        return iter(list(self.parents_))
+
+    def __len__(self):
+        return len(self.parents_)
+
+    def parents(self, commitid):
+        return self.parents_[commitid]
+
+
+class GeogigPathIndexTest(unittest.TestCase):
+
+    def getTempPath(self):
+        folder = os.path.join(os.path.dirname(__file__), "temp")
+        mkdir(folder)
+        return os.path.join(folder, str(time.time()) + ".sqlite")
+
+    def getGraph(self):
+        parents = {"c1": [], "c2": ["c1"], "c3": ["c2"]}
+        features = {"c1:parks/1": {}, "c1:parks/2": {}}
+        history = [("c3", "user", ["roads/1"]), ("c2", "user", ["parks/2"]),
+                   ("c1", "user", ["parks/1", "parks/2"])]
+        return _FakeGraph(parents, FakeConnector(features, history))
+
+    def testBuild(self):
+        graph = self.getGraph()
+        index = PathIndex(self.getTempPath())
+        self.assertEqual(3, index.update(graph))
+        self.assertEqual(set(["c1"]), index.commits("parks/1"))
+        self.assertEqual(set(["c1", "c2"]), index.commits("parks/2"))
+        self.assertEqual(set(["c1", "c2"]), index.commits("parks"))
+        self.assertEqual(set(["c1", "c3"]),
+                         index.commits(["parks/1", "roads"]))
+        self.assertEqual(["roads", "roads/1"], index.paths("c3"))
+        self.assertTrue(("ls-tree", "c1") in graph.connector.calls)
+        self.assertTrue(("diff-tree", "c1", "c2") in graph.connector.calls)
+
+    def testIncrementalUpdate(self):
+        filename = self.getTempPath()
+        graph = self.getGraph()
+        PathIndex(filename).update(graph)
+        graph.parents_["c4"] = ["c3"]
+        graph.connector.history.insert(0, ("c4", "user", ["roads/2"]))
+        graph.connector.calls = []
+        index = PathIndex(filename)
+        self.assertEqual(1, index.update(graph))
+        self.assertEqual([("diff-tree", "c3", "c4")], graph.connector.calls)
+        self.assertEqual(set(["c3", "c4"]), index.commits("roads"))
+        self.assertEqual(0, index.update(graph))
+        self.assertEqual(4, len(index))
+        self.assertTrue("c4" in index)
@@ -0,0 +1,35 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy import geogig
+from geogigpy.feature import Feature
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.repo import Repository
+from test.fakeconnector import FakeConnector
+
+
+class GeogigPrefetchTest(unittest.TestCase):
+
+    def getRepo(self):
+        features = {"HEAD:parks/1": {"name": ("first", "STRING")},
+                    "HEAD:parks/3": {"name": ("third", "STRING")}}
+        return Repository("repo", FakeConnector(features))
+
+    def testMissingFeaturesAreLeftUntouched(self):
+        repo = self.getRepo()
+        features = [Feature(repo, geogig.HEAD, "parks/%i" % i)
+                    for i in range(1, 4)]
+        repo.prefetch(features, chunksize=2)
+        self.assertEqual("first", features[0].attributes["name"])
+        self.assertIsNone(features[1]._values)
+        self.assertEqual("third", features[2].attributes["name"])
+
+    def testOtherErrorsAreRaised(self):
+        repo = self.getRepo()
+
+        def fail(refs):
+            raise GeoGigException("Connection refused")
+        repo.connector.featuresdata = fail
+        self.assertRaises(GeoGigException, repo.prefetch,
+                          [Feature(repo, geogig.HEAD, "parks/1")])
@@ -13,6 +13,8 @@ from geogigpy.geogigexception import GeoGigException, GeoGigConflictException
 from geogigpy.commitish import Commitish
 from geogigpy.diff import TYPE_MODIFIED
 from geogigpy.feature import Feature
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.featurecache import FeatureCache
 from test.testrepo import testRepo
 
 
@@ -62,6 +64,13 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEqual("user", commits[0].authorname)
         # TODO: add more
 
+    def testIterLog(self):
+        commits = list(self.repo.iterlog())
+        self.assertEqual(4, len(commits))
+        self.assertEqual("message_4", commits[0].message)
+        first = next(iter(self.repo.iterlog("conflicted")))
+        self.assertEqual("message_5", first.message)
+
     def testLogInBranch(self):
         entries = self.repo.log("conflicted")
         self.assertEqual(4, len(entries))
@@ -86,6 +95,43 @@ class GeogigRepositoryTest(unittest.TestCase):
         log = repo.log()
         self.assertFalse(log)
 
+    def testCommitGraph(self):
+        repo = self.getClonedRepo()
+        graph = repo.commitgraph()
+        self.assertEqual(6, len(graph))
+        log = repo.log()
+        self.assertEqual(log[2].commitid, repo.revparse("HEAD~2"))
+        repo.connector.commandslog = []
+        self.assertEqual(log[1].commitid, log[0].parent.commitid)
+        ancestor = repo.commonancestor("conflicted", "unconflicted")
+        self.assertEqual(log[1].commitid, ancestor.id)
+        self.assertFalse(repo.connector.commandslog)
+
+    def testPathIndex(self):
+        repo = self.getClonedRepo()
+        expected = [c.commitid for c in repo.log(path="parks/5")]
+        repo.pathindex(self.getTempPath() + ".sqlite")
+        repo.connector.commandslog = []
+        log = repo.log(path="parks/5")
+        self.assertEqual(expected, [c.commitid for c in log])
+        self.assertFalse([c for c in repo.connector.commandslog
+                          if "rev-list" in c])
+        parks = [c.commitid for c in repo.log(path="parks")]
+        self.assertTrue(set(expected) <= set(parks))
+
+    def testLastModified(self):
+        repo = self.getClonedRepo()
+        expected = repo.log(path="parks")[0]
+        commits = repo.lastmodified(path="parks")
+        self.assertEqual(expected.commitid, commits["parks"].commitid)
+        self.assertEqual(repo.log(path="parks/5")[0].commitid,
+                         commits["parks/5"].commitid)
+        self.assertEqual(expected.authorname, repo.treeauthors()["parks"])
+        repo.pathindex(self.getTempPath() + ".sqlite")
+        repo._lastmodified = None
+        self.assertEqual(expected.commitid,
+                         repo.lastmodified(path="parks")["parks"].commitid)
+
     def testTreesAtHead(self):
         trees = self.repo.trees
         self.assertEqual(1, len(trees))
@@ -109,11 +155,50 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEqual("parks/5", feature.path)
         self.assertEqual("HEAD", feature.ref)
 
+    def testFeaturesHydrated(self):
+        features = self.repo.features(path="parks", hydrate=True)
+        self.assertEqual(5, len(features))
+        self.assertTrue(all(f._values is not None for f in features))
+        self.assertEqual("Public", self.repo.feature(
+            geogig.HEAD, "parks/1").attributes["usage"])
+
+    def testPrefetch(self):
+        features = [Feature(self.repo, geogig.HEAD, "parks/%i" % i)
+                    for i in range(1, 6)]
+        self.repo.prefetch(features, chunksize=2, workers=2)
+        attrs = Feature(self.repo, geogig.HEAD, "parks/3").attributes
+        self.assertEqual(attrs["name"], features[2].attributes["name"])
+
+    def testPrefetchMissingFeature(self):
+        features = [Feature(self.repo, geogig.HEAD, "parks/1"),
+                    Feature(self.repo, geogig.HEAD, "parks/missing")]
+        self.repo.prefetch(features)
+        self.assertTrue(features[0]._values is not None)
+        self.assertTrue(features[1]._values is None)
+
+    def testFeatureTable(self):
+        table = self.repo.featuretable(geogig.HEAD, "parks", chunksize=2)
+        self.assertEqual(5, len(table))
+        self.assertTrue("the_geom" in table)
+        i = list(table.paths).index("parks/1")
+        attrs = self.repo.feature(geogig.HEAD, "parks/1").attributes
+        self.assertEqual(attrs["usage"], table.row(i)["usage"])
+        self.assertAlmostEqual(attrs["area"], table["area"][i])
+
     def testChildren(self):
         children = self.repo.children()
         self.assertEqual(1, len(children))
         # TODO improve this test
 
+    def testIterChildren(self):
+        features = list(self.repo.iterchildren(path="parks"))
+        self.assertEqual(5, len(features))
+        self.assertEqual("parks/5", features[0].path)
+
+    def testIterDiff(self):
+        diffs = list(self.repo.iterdiff("HEAD", "HEAD~3"))
+        self.assertEqual(2, len(diffs))
+
     def testDiff(self):
         repo = self.getClonedRepo()
         diffs = repo.diff("master", Commitish(self.repo, "master").parent.ref)
@@ -121,6 +206,16 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEqual("parks/5", diffs[0].path)
         self.assertEqual(TYPE_MODIFIED, diffs[0].type())
 
+    def testTreeDiff(self):
+        attribs, features = self.repo.treediff("parks", "HEAD~3", "HEAD")
+        chunks = list(self.repo.itertreediff("parks", "HEAD~3", "HEAD",
+                                             chunksize=1))
+        self.assertEqual(len(features), len(chunks))
+        self.assertEqual(list(attribs.keys()), chunks[0].old.names)
+        for changes, chunk in zip(features, chunks):
+            codes = [chunk.codes[name][0] for name in attribs]
+            self.assertEqual([c[0] for c in changes], codes)
+
     def testDiffWithPath(self):
         repo = self.getClonedRepo()
         diffs = repo.diff("HEAD", "HEAD~3")
@@ -141,6 +236,45 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertTrue("the_geom" in data)
         self.assertTrue(isinstance(data["the_geom"][0], Geometry))
 
+    def testFeatureCache(self):
+        cachefile = self.getTempRepoPath() + ".sqlite"
+        repo = Repository(self.repo.url, featurecache=FeatureCache(cachefile))
+        self.assertEqual(5, repo.featurecache.warm(repo, geogig.HEAD, "parks"))
+        self.assertEqual(0, repo.featurecache.warm(repo, geogig.HEAD, "parks"))
+        repo.connector.commandslog = []
+        data = repo.featuredata(geogig.HEAD, "parks/1")
+        self.assertEqual("Public", data["usage"][0])
+        self.assertFalse([c for c in repo.connector.commandslog
+                          if c.startswith("show")])
+        cache = FeatureCache(cachefile)
+        self.assertEqual(data["name"][0],
+                         cache.get(repo.revparse(geogig.HEAD),
+                                   "parks/1")["name"][0])
+
+    def testFeatureCacheFollowsRefs(self):
+        cachefile = self.getTempRepoPath() + ".sqlite"
+        clone = self.getClonedRepo()
+        repo = Repository(clone.url, featurecache=FeatureCache(cachefile))
+        attrs = Feature(repo, geogig.WORK_HEAD, "parks/1").attributes
+        attrs["area"] = 1234.5
+        repo.insertfeature("parks/1", attrs)
+        data = repo.featuredata(geogig.WORK_HEAD, "parks/1")
+        self.assertEqual(1234.5, data["area"][0])
+
+    def testParallel(self):
+        paths = ["parks/1", "parks/2", "parks/3"]
+        data = self.repo.parallel(
+            lambda repo, path: repo.featuredata(geogig.HEAD, path), paths)
+        self.assertEqual(3, len(data))
+        expected = self.repo.featuredata(geogig.HEAD, "parks/2")
+        self.assertEqual(expected["name"][0], data[1]["name"][0])
+
+    def testCLIConnectorKeepsWorkingDirectory(self):
+        cwd = os.getcwd()
+        repo = Repository(self.repo.url, CLIConnector())
+        repo.log()
+        self.assertEqual(cwd, os.getcwd())
+
     def testFeatureDataNonExistentFeature(self):
         return
         try:
@@ -201,6 +335,16 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEqual(3, len(branches))
         self.assertFalse("anewbranch" in branches)
 
+    def testBranchesWithoutRunningGeogig(self):
+        repo = self.getClonedRepo()
+        repo.connector.commandslog = []
+        branches = repo.branches
+        self.assertEqual(3, len(branches))
+        self.assertEqual(repo.log()[0].commitid, branches["master"])
+        self.assertEqual(branches["conflicted"], repo.revparse("conflicted"))
+        self.assertFalse([c for c in repo.connector.commandslog
+                          if not c.startswith("rev-list")])
+
     def testBlame(self):
         feature = self.repo.feature(geogig.HEAD, "parks/5")
         blame = self.repo.blame("parks/5")
@@ -213,11 +357,33 @@ class GeogigRepositoryTest(unittest.TestCase):
         versions = self.repo.versions("parks/5")
         self.assertEqual(2, len(versions))
 
+    def testVersionDeltas(self):
+        versions = self.repo.versions("parks/5", deltas=True)
+        self.assertEqual(self.repo.featurediff(versions[1][0].commitid,
+                                               versions[0][0].commitid,
+                                               "parks/5"), versions[0][1])
+
     def testFeatureDiff(self):
         diff = self.repo.featurediff(geogig.HEAD, geogig.HEAD + "~1", "parks/5")
         self.assertEqual(2, len(diff))
         self.assertTrue("area" in diff)
 
+    def testFeatureDiffs(self):
+        diffs = self.repo.featurediffs(geogig.HEAD, geogig.HEAD + "~1",
+                                       ["parks/5", "parks/1", "parks/missing"])
+        self.assertEqual(self.repo.featurediff(geogig.HEAD, geogig.HEAD + "~1",
+                                               "parks/5"), diffs["parks/5"])
+        self.assertEqual({}, diffs["parks/1"])
+        self.assertEqual({}, diffs["parks/missing"])
+
+    def testDiffWithData(self):
+        diffs = self.repo.diff(geogig.HEAD + "~1", geogig.HEAD, withdata=True)
+        for d in diffs:
+            self.assertTrue(d.hasdata)
+            self.assertEqual(self.repo.featurediff(d.oldcommitref,
+                                                   d.newcommitref, d.path),
+                             d.featurediff())
+
     def testCreateReadAndDeleteTag(self):
         repo = self.getClonedRepo()
         tags = repo.tags
@@ -246,6 +412,39 @@ class GeogigRepositoryTest(unittest.TestCase):
         newattrs = Feature(repo, geogig.WORK_HEAD, nfeats).attributes
         self.assertAlmostEqual(attrs["area"], newattrs["area"], 5)
 
+    def testInsertFeatures(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        features = (("parks/new%i" % i, attrs) for i in range(5))
+        self.assertEqual(5, repo.insertfeatures(features, batchsize=2))
+        for i in range(5):
+            feature = Feature(repo, geogig.WORK_HEAD, "parks/new%i" % i)
+            self.assertTrue(feature.exists())
+
+    def testEdit(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        with repo.edit("edited") as tx:
+            tx.insert("parks/new", attrs)
+            tx.modify("parks/1", {"area": 1234.5})
+            tx.remove("parks/2")
+        self.assertEqual("edited", repo.log()[0].message)
+        self.assertTrue(Feature(repo, geogig.HEAD, "parks/new").exists())
+        self.assertFalse(Feature(repo, geogig.HEAD, "parks/2").exists())
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        self.assertEqual(1234.5, attrs["area"])
+
+    def testExportAll(self):
+        folder = self.getTempRepoPath()
+        results = self.repo.exportall(geogig.HEAD, folder, workers=2)
+        self.assertEqual(["parks"], list(results.keys()))
+        self.assertEqual(None, results["parks"][1])
+        self.assertTrue(os.path.exists(os.path.join(folder, "parks.shp")))
+        results = self.repo.exportall(geogig.HEAD, folder,
+                                      trees=["parks", "wrong"])
+        self.assertEqual(None, results["parks"][1])
+        self.assertTrue(isinstance(results["wrong"][1], GeoGigException))
+
     def testRemoveFeature(self):
         repo = self.getClonedRepo()
         repo.removefeatures(["parks/1"])
@@ -570,3 +769,12 @@ class GeogigRepositoryTest(unittest.TestCase):
         ahead, behind = repo.synced()
         self.assertEqual(1, ahead)
         self.assertEqual(0, behind)
+
+    def testAheadBehind(self):
+        repo = self.getClonedRepo()
+        path = os.path.join(os.path.dirname(__file__),
+                            "data", "shp", "1", "parks.shp")
+        repo.importshp(path)
+        repo.addandcommit("message")
+        counts = repo.aheadbehind()
+        self.assertEqual((1, 0), counts[geogig.MASTER])
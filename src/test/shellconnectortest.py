@@ -0,0 +1,144 @@
+# coding: utf-8
+
+import unittest
+import os
+import sys
+import time
+
+from geogigpy.repo import Repository
+from geogigpy import shellconnector
+from geogigpy.shellconnector import ShellConnector
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.utils import mkdir
+from geogigpy.cache import DEFAULT_CACHE_SIZE
+
+
+class GeogigShellConnectorTest(unittest.TestCase):
+
+    fakegeogig = [sys.executable,
+                  os.path.join(os.path.dirname(__file__),
+                               "data", "shell", "fakegeogig.py")]
+
+    def getTempPath(self):
+        return os.path.join(os.path.dirname(__file__), "temp",
+                            str(time.time())).replace('\\', '/')
+
+    def getRepo(self, poolsize=2, cachesize=DEFAULT_CACHE_SIZE):
+        path = self.getTempPath()
+        mkdir(os.path.join(path, ".geogig"))
+        connector = ShellConnector(self.fakegeogig, poolsize, cachesize)
+        return Repository(path, connector)
+
+    def testRun(self):
+        repo = self.getRepo()
+        self.assertEqual("a" * 40, repo.connector.revparse("HEAD"))
+        output = repo.connector.run(["echo", "first", "second line"])
+        self.assertEqual(["first", "second line"], output)
+        repo.connector.close()
+
+    def testIterRunStoppedEarly(self):
+        repo = self.getRepo(poolsize=1)
+        lines = repo.connector.iterrun(["echo", "first", "second", "third"])
+        self.assertEqual("first", next(lines))
+        lines.close()
+        self.assertEqual(["ok"], repo.connector.run(["echo", "ok"]))
+        repo.connector.close()
+
+    def testImmutableResultsAreCached(self):
+        repo = self.getRepo()
+        output = repo.connector.run(["show", "--raw", "b" * 40])
+        self.assertEqual(output, repo.connector.run(["show", "--raw",
+                                                     "b" * 40]))
+        self.assertEqual(1, repo.connector.cache.hits)
+        self.assertEqual(1, len(repo.connector.commandslog))
+        self.assertNotEqual(output, repo.connector.run(["show", "HEAD"]))
+        repo.connector.close()
+
+    def testSessionIsReused(self):
+        repo = self.getRepo(poolsize=1)
+        pid = repo.connector.run(["pid"])
+        self.assertEqual(pid, repo.connector.run(["pid"]))
+        repo.connector.close()
+
+    def testRunsInRepositoryFolder(self):
+        repo = self.getRepo()
+        cwd = repo.connector.run(["cwd"])[0]
+        self.assertEqual(os.path.realpath(repo.url), os.path.realpath(cwd))
+        repo.connector.close()
+
+    def testNewSession(self):
+        repo = self.getRepo(poolsize=3, cachesize=10)
+        session = repo.connector.newsession()
+        self.assertEqual(self.fakegeogig, session.command)
+        self.assertEqual(3, session.poolsize)
+        self.assertEqual(10, session.cachesize)
+        self.assertTrue(session.cache is not repo.connector.cache)
+        repo.connector.close()
+
+    def testExportAllNeedsTarget(self):
+        repo = self.getRepo()
+        self.assertRaises(GeoGigException, repo.exportall, "a" * 40, None,
+                          ["roads"])
+        repo.connector.close()
+
+    def testExportAll(self):
+        repo = self.getRepo()
+        folder = self.getTempPath()
+        results = repo.exportall("a" * 40, folder, ["roads", "wrong",
+                                                    "parks/big"], workers=2)
+        self.assertEqual(["roads", "wrong", "parks/big"], list(results))
+        self.assertEqual(None, results["roads"][1])
+        self.assertTrue(isinstance(results["wrong"][1], GeoGigException))
+        with open(os.path.join(folder, "parks_big.shp")) as f:
+            self.assertEqual("a" * 40 + ":parks/big", f.read())
+        repo.connector.close()
+
+    def testConsoleWithoutFraming(self):
+        path = self.getTempPath()
+        mkdir(os.path.join(path, ".geogig"))
+        silent = [sys.executable, "-c",
+                  "import sys\nfor line in sys.stdin: pass"]
+        repo = Repository(path, ShellConnector(silent, 1))
+        timeout = shellconnector.STARTUP_TIMEOUT
+        shellconnector.STARTUP_TIMEOUT = 1
+        try:
+            self.assertRaises(GeoGigException, repo.connector.run, ["pid"])
+        finally:
+            shellconnector.STARTUP_TIMEOUT = timeout
+        repo.connector.close()
+
+    @unittest.skipIf(os.name == 'nt', "the fake geogig is a shell script")
+    def testDefaultConsole(self):
+        folder = self.getTempPath()
+        mkdir(folder)
+        script = os.path.join(folder, "geogig")
+        with open(script, "w") as f:
+            f.write('#!/bin/sh\nexec "%s" "%s" "$@"\n'
+                    % tuple(self.fakegeogig))
+        os.chmod(script, 0o755)
+        path = os.environ["PATH"]
+        os.environ["PATH"] = folder + os.pathsep + path
+        try:
+            path = self.getTempPath()
+            mkdir(os.path.join(path, ".geogig"))
+            repo = Repository(path, ShellConnector(poolsize=1))
+            self.assertEqual("a" * 40, repo.connector.revparse("HEAD"))
+            self.assertEqual(["first", "second line"],
+                             repo.connector.run(["echo", "first",
+                                                 "second line"]))
+            self.assertRaises(GeoGigException, repo.connector.run,
+                              ["wrongcommand"])
+            self.assertEqual(["ok"], repo.connector.run(["echo", "ok"]))
+            repo.connector.close()
+        finally:
+            os.environ["PATH"] = path
+
+    def testError(self):
+        repo = self.getRepo()
+        try:
+            repo.connector.run(["wrongcommand"])
+            self.fail()
+        except GeoGigException as e:
+            self.assertTrue("not a geogig command" in e.args[0])
+        self.assertEqual(["ok"], repo.connector.run(["echo", "ok"]))
+        repo.connector.close()
@@ -0,0 +1,58 @@
+# coding: utf-8
+
+import unittest
+
+import numpy
+
+from geogigpy.spatialindex import SpatialIndex, cachedindex, clearcache
+
+
+class GeogigSpatialIndexTest(unittest.TestCase):
+
+    def bruteforce(self, envelopes, bbox):
+        minx, miny, maxx, maxy = bbox
+        return [i for i, e in enumerate(envelopes)
+                if e[0] <= maxx and e[2] >= minx
+                and e[1] <= maxy and e[3] >= miny]
+
+    def testQueryMatchesBruteForce(self):
+        random = numpy.random.RandomState(0)
+        mins = random.uniform(0, 100, (1000, 2))
+        sizes = random.exponential(2, (1000, 2))
+        sizes[:5] = 80
+        envelopes = numpy.hstack([mins, mins + sizes])
+        paths = ["layer/%i" % i for i in range(1000)]
+        index = SpatialIndex(paths, envelopes)
+        self.assertEqual(1000, len(index))
+        for bbox in [(10, 10, 20, 20), (0, 0, 1, 1), (50, 50, 50, 50),
+                     (-10, -10, 200, 200), (99, 0, 300, 2)]:
+            self.assertEqual(self.bruteforce(envelopes, bbox),
+                             index.query(bbox).tolist())
+        self.assertEqual([], index.pathsin((500, 500, 600, 600)))
+
+    def testNullEnvelopes(self):
+        envelopes = [[0, 0, 1, 1], [numpy.nan] * 4, [2, 2, 3, 3]]
+        index = SpatialIndex(["a", "b", "c"], envelopes)
+        self.assertEqual(2, len(index))
+        self.assertEqual(["a", "c"], index.pathsin((0, 0, 5, 5)))
+
+    def testPoints(self):
+        envelopes = [[x, 0, x, 0] for x in range(10)]
+        index = SpatialIndex([str(x) for x in range(10)], envelopes)
+        self.assertEqual(["3", "4"], index.pathsin((2.5, -1, 4, 1)))
+
+    def testEmpty(self):
+        index = SpatialIndex([], numpy.zeros((0, 4)))
+        self.assertEqual([], index.pathsin((0, 0, 1, 1)))
+
+    def testCache(self):
+        clearcache()
+        built = []
+
+        def build():
+            built.append(1)
+            return SpatialIndex(["a"], [[0, 0, 1, 1]])
+
+        first = cachedindex(("repo", "sha", "layer"), build)
+        self.assertTrue(first is cachedindex(("repo", "sha", "layer"), build))
+        self.assertEqual(1, len(built))
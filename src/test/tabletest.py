@@ -0,0 +1,81 @@
+# coding: utf-8
+
+import unittest
+
+import numpy
+
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.geometry import Geometry
+from geogigpy.table import FeatureTable
+
+ROWS = [("parks/1", ["name", "STRING", "Central",
+                     "count", "INTEGER", "12",
+                     "area", "DOUBLE", "1.5",
+                     "open", "BOOLEAN", "true",
+                     "the_geom", "POINT EPSG:4326", "POINT (1 2)"]),
+        ("parks/2", ["name", "STRING", "[NULL]",
+                     "count", "INTEGER", "[NULL]",
+                     "area", "DOUBLE", "2.5",
+                     "open", "BOOLEAN", "false",
+                     "the_geom", "POINT EPSG:4326", "[NULL]"]),
+        ("parks/3", ["name", "STRING", "North",
+                     "count", "INTEGER", "7",
+                     "extra", "LONG", "3"])]
+
+
+class GeogigTableTest(unittest.TestCase):
+
+    def table(self, rows=ROWS):
+        return FeatureTable.fromraw(rows, CLIConnector().valuefromstring)
+
+    def testColumnTypes(self):
+        table = self.table()
+        self.assertEqual(3, len(table))
+        self.assertEqual(["name", "count", "area", "open", "the_geom",
+                          "extra"], table.names)
+        self.assertEqual(numpy.int32, table["count"].dtype)
+        self.assertEqual(numpy.float64, table["area"].dtype)
+        self.assertEqual(numpy.bool_, table["open"].dtype)
+        self.assertEqual(object, table["name"].dtype)
+        self.assertEqual([12, 0, 7], list(table["count"]))
+        self.assertEqual([True, False, False], list(table["open"]))
+        geom = table["the_geom"][0]
+        self.assertTrue(isinstance(geom, Geometry))
+        self.assertEqual("EPSG:4326", geom.crs)
+
+    def testNullMasks(self):
+        table = self.table()
+        self.assertEqual([False, True, False], list(table.mask("count")))
+        self.assertEqual([False, False, True], list(table.mask("area")))
+        self.assertEqual([True, True, False], list(table.mask("extra")))
+        self.assertEqual(None, table["name"][1])
+        self.assertEqual(19, table.masked("count").sum())
+        self.assertEqual({"name": None, "count": None, "area": 2.5,
+                          "open": False, "the_geom": None, "extra": None},
+                         dict(table.row(1)))
+
+    def testSelect(self):
+        table = self.table()
+        selected = table.select(table["count"] > 10)
+        self.assertEqual(["parks/1"], list(selected.paths))
+        self.assertEqual(["Central"], list(selected["name"]))
+
+    def testInvalidValues(self):
+        rows = [("a", ["count", "INTEGER", "12"]),
+                ("b", ["count", "INTEGER", "wrong"])]
+        table = self.table(rows)
+        self.assertEqual(object, table["count"].dtype)
+        self.assertEqual([12, "wrong"], list(table["count"]))
+
+    def testGeometries(self):
+        table = self.table()
+        self.assertEqual("the_geom", table.geometryname())
+        arrays = table.geometries()
+        self.assertEqual([1, 0, 0], arrays.vertexcounts().tolist())
+        self.assertTrue(arrays is table.geometries("the_geom"))
+        self.assertEqual((1, 2, 1, 2), table["the_geom"][0]._envelope)
+
+    def testEmpty(self):
+        table = self.table([])
+        self.assertEqual(0, len(table))
+        self.assertEqual([], table.names)
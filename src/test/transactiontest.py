@@ -0,0 +1,106 @@
+# coding: utf-8
+
+import unittest
+from collections import OrderedDict
+
+from geogigpy import geogig
+from geogigpy.repo import Repository
+from geogigpy.transaction import EditTransaction
+from geogigpy.geogigexception import GeoGigException
+from test.fakeconnector import FakeConnector
+
+
+def _edits(repo):
+    """Returns the calls that wrote to the repository, skipping reads"""
+    return [c for c in repo.connector.calls if c[0] != "show"]
+
+
+class GeogigTransactionTest(unittest.TestCase):
+
+    def getRepo(self, features=None):
+        features = dict((geogig.WORK_HEAD + ":" + path, data)
+                        for path, data in (features or {}).items())
+        return Repository("repo", FakeConnector(features))
+
+    def testCoalescing(self):
+        repo = self.getRepo()
+        with EditTransaction(repo, "message") as tx:
+            tx.insert("parks/1", {"name": "a"})
+            tx.insert("parks/1", {"name": "b"})
+            tx.modify("parks/1", {"area": 1})
+            tx.insert("parks/2", {"name": "c"})
+            tx.remove("parks/2")
+            tx.remove("parks/3")
+            tx.insert("parks/3", {"name": "d"})
+            self.assertEqual(3, len(tx))
+            self.assertEqual([], _edits(repo))
+        self.assertEqual([("insert", {"parks/1": {"name": "b", "area": 1},
+                                      "parks/3": {"name": "d"}}),
+                          ("add", ["parks/1", "parks/3"]),
+                          ("commit", "message")], _edits(repo))
+
+    def testRemoveInsertedExisting(self):
+        repo = self.getRepo({"parks/1": OrderedDict()})
+        with EditTransaction(repo) as tx:
+            tx.insert("parks/1", {"name": "a"})
+            tx.insert("parks/2", {"name": "b"})
+            tx.remove("parks/1")
+            tx.remove("parks/2")
+        self.assertEqual([("rm", ["parks/1"])], _edits(repo))
+
+    def testFailedFlushKeepsTransactionOpen(self):
+        repo = self.getRepo()
+        tx = EditTransaction(repo, "message")
+        tx.insert("parks/1", {"name": "a"})
+        insertfeatures = repo.connector.insertfeatures
+
+        def fail(features, batchsize=None):
+            raise GeoGigException("Insert failed")
+        repo.connector.insertfeatures = fail
+        self.assertRaises(GeoGigException, tx.flush)
+        self.assertEqual(1, len(tx))
+        repo.connector.insertfeatures = insertfeatures
+        tx.flush()
+        self.assertEqual(("commit", "message"), _edits(repo)[-1])
+        self.assertRaises(GeoGigException, tx.insert, "parks/2", {})
+
+    def testModify(self):
+        data = {"parks/1": OrderedDict([("name", ("a", "STRING")),
+                                        ("area", (1.0, "DOUBLE"))])}
+        repo = self.getRepo(data)
+        with EditTransaction(repo) as tx:
+            tx.modify("parks/1", {"area": 2.0})
+            tx.modify("parks/1", {"name": "b"})
+        self.assertEqual([("insert", {"parks/1": {"name": "b", "area": 2.0}}),
+                          ("add", ["parks/1"])], _edits(repo))
+
+    def testModifyMissing(self):
+        repo = self.getRepo()
+        tx = EditTransaction(repo)
+        tx.modify("parks/1", {"area": 2.0})
+        try:
+            tx.flush()
+            self.fail()
+        except GeoGigException as e:
+            self.assertEqual("Cannot modify missing feature parks/1",
+                             e.args[0])
+        tx = EditTransaction(repo)
+        tx.remove("parks/1")
+        self.assertRaises(GeoGigException, tx.modify, "parks/1", {})
+
+    def testRollback(self):
+        repo = self.getRepo()
+        try:
+            with EditTransaction(repo, "message") as tx:
+                tx.insert("parks/1", {"name": "a"})
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual([], _edits(repo))
+        self.assertRaises(GeoGigException, tx.insert, "parks/1", {})
+
+    def testEmpty(self):
+        repo = self.getRepo()
+        with EditTransaction(repo, "message"):
+            pass
+        self.assertEqual([], _edits(repo))
@@ -0,0 +1,64 @@
+# coding: utf-8
+
+import unittest
+from collections import OrderedDict
+
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.treediff import TreeDiffChunk
+
+OUTPUT = ["parks/1",
+          "M area", "1.5", "2.5",
+          "U name", "Central",
+          "",
+          "parks/2",
+          "A area", "3.0",
+          "A name", "",
+          "",
+          "parks/3",
+          "R area", "4.0",
+          "R name", "North"]
+
+ATTRIBS = OrderedDict([("name", "STRING"), ("area", "DOUBLE")])
+
+
+class _DescribeConnector(CLIConnector):
+    """A connector that returns a fixed diff-tree --describe output"""
+
+    def iterrun(self, commands):
+        return iter(OUTPUT)
+
+    def difftypes(self, path, refa, refb):
+        return ATTRIBS
+
+
+class GeogigTreeDiffTest(unittest.TestCase):
+
+    def testIterDescribe(self):
+        features = list(_DescribeConnector().iterdescribe("parks", "a", "b"))
+        self.assertEqual(["parks/1", "parks/2", "parks/3"],
+                         [path for path, changes in features])
+        self.assertEqual([("M", "area", "1.5", "2.5"),
+                          ("U", "name", "Central", None)], features[0][1])
+        self.assertEqual(("A", "name", "", None), features[1][1][1])
+
+    def testTreeDiff(self):
+        attribs, features = _DescribeConnector().treediff("parks", "a", "b")
+        self.assertEqual(ATTRIBS, attribs)
+        self.assertEqual([("U", "Central"), ("M", 1.5, 2.5)], features[0])
+        self.assertEqual([("R", "North"), ("R", 4.0)], features[2])
+
+    def testChunk(self):
+        connector = _DescribeConnector()
+        features = list(connector.iterdescribe("parks", "a", "b"))
+        chunk = TreeDiffChunk.fromraw(features, ATTRIBS,
+                                      connector.valuefromstring)
+        self.assertEqual(3, len(chunk))
+        self.assertEqual(["U", "A", "R"], chunk.codes["name"].tolist())
+        self.assertEqual(["parks/1", "parks/2", "parks/3"],
+                         chunk.changedpaths("area"))
+        self.assertEqual(["parks/2", "parks/3"], chunk.changedpaths("name"))
+        self.assertEqual([1.5, 4.0], chunk.old["area"][[0, 2]].tolist())
+        self.assertEqual([False, True, False], chunk.old.mask("area").tolist())
+        self.assertEqual([2.5, 3.0], chunk.new["area"][:2].tolist())
+        self.assertEqual([False, False, True], chunk.new.mask("area").tolist())
+        self.assertEqual("Central", chunk.new["name"][0])
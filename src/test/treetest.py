@@ -40,3 +40,11 @@ class GeogigTreeTest(unittest.TestCase):
         self.assertEqual("DOUBLE", ftype["perimeter"])
         self.assertEqual("STRING", ftype["name"])
         self.assertEqual("MULTIPOLYGON", ftype["the_geom"])
+
+    def testFeaturesIn(self):
+        tree = Tree(self.repo, geogig.HEAD, "parks")
+        envelope = tree.features[0].geom.envelope
+        features = tree.featuresin(envelope)
+        self.assertTrue(tree.features[0].path in [f.path for f in features])
+        self.assertEqual(5, len(tree.featuresin((-1e10, -1e10, 1e10, 1e10))))
+        self.assertEqual([], tree.featuresin((1e10, 1e10, 2e10, 2e10)))
@@ -0,0 +1,54 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.utils import argmax, chunkargs
+
+
+class _RecordingConnector(CLIConnector):
+
+    def __init__(self):
+        CLIConnector.__init__(self)
+        self.commands = []
+
+    def run(self, commands):
+        self.commands.append(commands)
+        return []
+
+
+class GeogigUtilsTest(unittest.TestCase):
+
+    def testArgMax(self):
+        self.assertTrue(1024 <= argmax() <= 128 * 1024)
+
+    def testChunkArgs(self):
+        args = ["parks/%05i" % i for i in range(1000)]
+        chunks = list(chunkargs(args, ["add"], limit=1000))
+        self.assertEqual(args, [a for chunk in chunks for a in chunk])
+        for chunk in chunks:
+            self.assertTrue(len(" ".join(["add"] + chunk)) <= 1000)
+        self.assertEqual(len(chunks), len(list(chunkargs(args, ["add"],
+                                                         limit=1000))))
+        self.assertTrue(all(len(chunk) <= 7 for chunk
+                            in chunkargs(args, maxcount=7)))
+        self.assertEqual([], list(chunkargs([])))
+
+    def testLongArgument(self):
+        chunks = list(chunkargs(["a" * 50, "b", "c"], limit=20))
+        self.assertEqual([["a" * 50], ["b", "c"]], chunks)
+
+    def testMultiPathCommands(self):
+        connector = _RecordingConnector()
+        paths = ["parks/%i" % i for i in range(50000)]
+        connector.add(paths)
+        self.assertTrue(1 < len(connector.commands) < 50)
+        self.assertEqual(paths, [p for c in connector.commands for p in c[1:]])
+        connector.commands = []
+        connector.removepaths(paths, True)
+        self.assertEqual(["rm", "-r"], connector.commands[0][:2])
+        self.assertEqual(50000, len(paths))
+        connector.commands = []
+        connector.checkout("master", paths)
+        self.assertEqual(["checkout", "master", "-p"],
+                         connector.commands[-1][:3])
@@ -0,0 +1,61 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy.geogigexception import GeoGigException
+from geogigpy.repo import Repository
+from test.fakeconnector import FakeConnector
+
+
+class GeogigVersionsTest(unittest.TestCase):
+
+    # the name of parks/1 in each commit, newest first. None means the
+    # feature was deleted in that commit
+    names = [("c5", "second"),
+             ("c4", "second"),
+             ("c3", None),
+             ("c2", "first"),
+             ("c1", "first")]
+
+    def getRepo(self):
+        features = dict((c + ":parks/1", {"name": (name, "STRING")})
+                        for c, name in self.names if name is not None)
+        history = [(c, "user", ["parks/1"]) for c, name in self.names]
+        return Repository("repo", FakeConnector(features, history))
+
+    def testSkipUnchanged(self):
+        versions = self.getRepo().versions("parks/1", skipunchanged=True)
+        self.assertEqual(["c4", "c3", "c1"],
+                         [c.commitid for c, data in versions])
+        self.assertEqual("second", versions[0][1]["name"][0])
+        self.assertIsNone(versions[1][1])
+        self.assertEqual("first", versions[2][1]["name"][0])
+
+    def testAllVersions(self):
+        versions = self.getRepo().versions("parks/1")
+        self.assertEqual(5, len(versions))
+        self.assertEqual(versions[0][1], versions[1][1])
+
+    def testDeltas(self):
+        versions = self.getRepo().versions("parks/1", skipunchanged=True,
+                                           deltas=True)
+        self.assertEqual({"name": (None, "second")}, versions[0][1])
+        self.assertEqual({"name": ("first", None)}, versions[1][1])
+        self.assertEqual({"name": (None, "first")}, versions[2][1])
+
+    def testChunks(self):
+        repo = self.getRepo()
+        versions = list(repo.iterversions("parks/1", chunksize=2,
+                                          skipunchanged=True))
+        self.assertEqual(3, len(versions))
+        requested = [c[1] for c in repo.connector.calls if c[0] == "show"]
+        self.assertEqual(["c5:parks/1", "c4:parks/1"], requested[0])
+        self.assertTrue(all(len(refs) <= 2 for refs in requested))
+
+    def testErrorsAreRaised(self):
+        repo = self.getRepo()
+
+        def fail(refs):
+            raise GeoGigException("Connection refused")
+        repo.connector.featureobjects = fail
+        self.assertRaises(GeoGigException, repo.versions, "parks/1")
@@ -0,0 +1,73 @@
+# coding: utf-8
+
+import unittest
+
+from geogigpy.geometry import Geometry
+from geogigpy.wkt import decode, decodeall
+from geogigpy.geogigexception import GeoGigException
+
+
+class GeogigWktTest(unittest.TestCase):
+
+    def testPoint(self):
+        arrays = decode("POINT (1 2)")
+        self.assertEqual([[1, 2]], arrays.coords.tolist())
+        self.assertEqual(["POINT"], arrays.types)
+        self.assertEqual((1, 2, 1, 2), arrays.extent())
+
+    def testPolygonRings(self):
+        wkt = ("POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0), "
+               "(2 2, 3 2, 3 3, 2 2))")
+        arrays = decode(wkt)
+        self.assertEqual([0, 1], arrays.geomoffsets.tolist())
+        self.assertEqual([0, 2], arrays.partoffsets.tolist())
+        self.assertEqual([0, 5, 9], arrays.ringoffsets.tolist())
+        self.assertEqual([[0, 0, 10, 10]], arrays.envelopes().tolist())
+
+    def testMultiGeometries(self):
+        arrays = decode("MULTIPOLYGON (((0 0, 1 0, 1 1, 0 0)), "
+                        "((5 5, 6 5, 6 6, 5 5), (5.5 5.5, 5.6 5.5, 5.5 5.5)))")
+        self.assertEqual([0, 1, 3], arrays.partoffsets.tolist())
+        self.assertEqual([0, 4, 8, 11], arrays.ringoffsets.tolist())
+        arrays = decode("MULTIPOINT (1 2, 3 4)")
+        self.assertEqual([0, 1, 2], arrays.partoffsets.tolist())
+        arrays = decode("MULTIPOINT ((1 2), (3 4))")
+        self.assertEqual([0, 1, 2], arrays.partoffsets.tolist())
+        self.assertEqual([[1, 2], [3, 4]], arrays.coords.tolist())
+        arrays = decode("MULTILINESTRING ((0 0, 1 1), (2 2, 3 3, 4 4))")
+        self.assertEqual([0, 2, 5], arrays.ringoffsets.tolist())
+
+    def testDecodeAll(self):
+        geoms = [Geometry("POINT (1 2)", None), None,
+                 "LINESTRING (0 0, -1 5, 3 3)", "POINT EMPTY"]
+        arrays = decodeall(geoms)
+        self.assertEqual(4, len(arrays))
+        self.assertEqual([1, 0, 3, 0], arrays.vertexcounts().tolist())
+        envelopes = arrays.envelopes()
+        self.assertEqual([-1, 0, 3, 5], envelopes[2].tolist())
+        self.assertTrue(all(v != v for v in envelopes[1]))
+        self.assertEqual([[0, 0], [-1, 5], [3, 3]],
+                         arrays.coordinates(2).tolist())
+
+    def testThreeDimensions(self):
+        arrays = decode("LINESTRING (0 0 1, 1 1 2)")
+        self.assertEqual((2, 3), arrays.coords.shape)
+        self.assertEqual((0, 0, 1, 1), arrays.extent())
+
+    def testMixedDimensions(self):
+        self.assertRaises(GeoGigException, decodeall,
+                          ["POINT ZM (1 2 3 4)", "POINT (5 6)"])
+        self.assertRaises(GeoGigException, decodeall,
+                          ["LINESTRING (0 0, 1 1)", "POINT Z (1 2 3)"])
+        self.assertRaises(GeoGigException, decode,
+                          "LINESTRING (0 0 1, 1 1)")
+
+    def testGeometry(self):
+        geom = Geometry("LINESTRING (0 0, 2 1)", "EPSG:4326")
+        self.assertEqual("LINESTRING", geom.geomtype)
+        self.assertEqual(2, geom.vertexcount)
+        self.assertEqual((0, 0, 2, 1), geom.envelope)
+        self.assertTrue(geom.decode() is geom.decode())
+
+    def testWrongGeometry(self):
+        self.assertRaises(GeoGigException, decode, "CIRCLE (0 0, 1)")
@@ -1,5 +1,6 @@
 # coding: utf-8
 
+import json
 import os
 import time
 import unittest
@@ -100,3 +101,53 @@ class GeogigWorkflowTest(unittest.TestCase):
         feature = cloneb.feature(geogig.HEAD, "landuse/1")
         attribs = feature.attributes
         self.assertEqual(attribs["LANDCOVER"], "urban")
+
+    def testImportAll(self):
+        folder = os.path.join(os.path.dirname(__file__), "data", "shp",
+                              "landuse")
+        for workers in [1, 2]:
+            repo = Repository(self.getTempFolderPath(), init=True)
+            summary = repo.importall(folder, "imported", workers=workers)
+            self.assertEqual(4, len(summary))
+            trees = sorted(t.path for t in repo.trees)
+            self.assertEqual(["landuse", "landuse2", "landuse3", "landuse4"],
+                             trees)
+            for filename, (tree, rows, seconds) in summary.items():
+                self.assertEqual(rows, repo.count(geogig.HEAD, tree))
+            log = repo.log()
+            self.assertEqual(1, len(log))
+            self.assertEqual("imported", log[0].message)
+            self.assertFalse(repo.remotes)
+
+    def testIncrementalImport(self):
+        repo = Repository(self.getTempFolderPath(), init=True)
+        geojsonfile = os.path.join(os.path.dirname(__file__),
+                                   "data", "geojson", "landuse.geojson")
+        with open(geojsonfile) as f:
+            data = json.load(f)
+        n = len(data["features"])
+        inserted, removed = repo.importgeojson(geojsonfile, False, "landuse",
+                                               "fid", incremental=True)
+        self.assertEqual((n, 0), (inserted, removed))
+        self.assertEqual((0, 0), repo.importgeojson(
+            geojsonfile, False, "landuse", "fid", incremental=True))
+        data["features"][0]["properties"]["LANDCOVER"] = "changed"
+        fid = data["features"][1]["properties"]["fid"]
+        del data["features"][1]
+        changedfile = os.path.join(self.getTempFolderPath() + ".geojson")
+        with open(changedfile, "w") as f:
+            json.dump(data, f)
+        self.assertEqual((1, 1), repo.importgeojson(
+            changedfile, False, "landuse", "fid", incremental=True))
+        paths = repo.featureids(geogig.WORK_HEAD, "landuse")
+        self.assertEqual(n - 1, len(paths))
+        self.assertFalse("landuse/" + fid in paths)
+        changed = data["features"][0]["properties"]["fid"]
+        feature = repo.feature(geogig.WORK_HEAD, "landuse/" + changed)
+        self.assertEqual("changed", feature.attributes["LANDCOVER"])
+        # a tree edited by other means is imported again as a whole
+        repo.removefeatures(["landuse/" + changed])
+        self.assertEqual((n - 1, 0), repo.importgeojson(
+            changedfile, False, "landuse", "fid", incremental=True))
+        self.assertTrue("landuse/" + changed
+                        in repo.featureids(geogig.WORK_HEAD, "landuse"))